@@ -0,0 +1,200 @@
+"""Headless benchmark: run every algorithm over a grid of sizes, inputs and seeds.
+
+    python benchmark.py --sizes 100,1000,10000 --seeds 3 --output results.csv
+
+Each (algorithm, size, distribution, seed) cell runs in a process pool and
+reports the algorithm's own counters (comparisons or bucket writes,
+swaps/assignments, passes, auxiliary cells, probes and the distinct 64-byte
+cache lines those probes touched) plus wall time and peak traced memory.
+Results go to CSV or JSON depending on the output file extension (CSV on
+stdout if no output is given).
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import (
+    DISTRIBUTIONS, DISTRIBUTION_SORTS, QUADRATIC_SORTS, SEARCH_ALGORITHMS, SORTING_ALGORITHMS,
+    aux_cells, generate, search_input, search_metrics, sort_metrics,
+)
+
+FIELDS = [
+    "kind", "algorithm", "size", "distribution", "seed", "steps", "comparisons",
+    "bucket_writes", "swaps", "passes", "aux_cells", "probes", "cache_lines", "queries", "hits",
+    "wall_ms", "peak_kib", "error",
+]
+
+
+def make_input(size, distribution, seed):
+    # values span 0..4n so the searches see both hits and misses
+    return generate(distribution, size, seed, low=0, high=4 * size).tolist()
+
+
+def _measure(run, memory):
+    """Time run() and, if asked, rerun it under tracemalloc for the peak."""
+    start = time.perf_counter()
+    result = run()
+    wall_ms = (time.perf_counter() - start) * 1000
+    peak_kib = ""
+    if memory:
+        tracemalloc.start()
+        run()
+        peak_kib = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result, round(wall_ms, 3), peak_kib
+
+
+def run_sort(algorithm, size, distribution, seed, memory):
+    data = make_input(size, distribution, seed)
+    metrics, wall_ms, peak_kib = _measure(
+        lambda: sort_metrics(SORTING_ALGORITHMS[algorithm](list(data)), algorithm), memory)
+    row = {
+        "steps": metrics["steps"],
+        "swaps": metrics["swaps"],
+        "aux_cells": aux_cells(algorithm, data),
+        "wall_ms": wall_ms,
+        "peak_kib": peak_kib,
+    }
+    # distribution sorts count bucket writes where comparison sorts count comparisons
+    if algorithm in DISTRIBUTION_SORTS:
+        row.update(comparisons=0, bucket_writes=metrics["comparisons"], passes=metrics["passes"])
+    else:
+        row.update(comparisons=metrics["comparisons"], bucket_writes=0)
+    return row
+
+
+def run_search(algorithm, size, distribution, seed, memory, queries):
+    data = make_input(size, distribution, seed)
+    # run on plain lists like the sorts do, so wall times stay comparable
+    data = search_input(algorithm, data)
+    if not isinstance(data, list):
+        data = data.tolist()
+    rng = random.Random(seed + 1)
+    # half the targets are present, half are drawn from the whole value range
+    targets = [rng.choice(data) if k % 2 == 0 else rng.randint(0, 4 * size) for k in range(queries)]
+
+    def run():
+        steps = probes = lines = hits = 0
+        for target in targets:
+            metrics = search_metrics(SEARCH_ALGORITHMS[algorithm](data, target))
+            steps += metrics["steps"]
+            probes += metrics["probes"]
+            lines += metrics["cache_lines"]
+            hits += metrics["found_index"] != -1
+        return steps, probes, lines, hits
+
+    (steps, probes, lines, hits), wall_ms, peak_kib = _measure(run, memory)
+    return {"steps": steps, "probes": probes, "cache_lines": lines, "queries": queries,
+            "hits": hits, "wall_ms": wall_ms, "peak_kib": peak_kib}
+
+
+def run_cell(cell):
+    """Worker entry point: run one grid cell and return its result row."""
+    row = dict.fromkeys(FIELDS, "")
+    row.update(kind=cell["kind"], algorithm=cell["algorithm"], size=cell["size"],
+               distribution=cell["distribution"], seed=cell["seed"])
+    try:
+        if cell["kind"] == "sort":
+            row.update(run_sort(cell["algorithm"], cell["size"], cell["distribution"],
+                                cell["seed"], cell["memory"]))
+        else:
+            row.update(run_search(cell["algorithm"], cell["size"], cell["distribution"],
+                                  cell["seed"], cell["memory"], cell["queries"]))
+    except RecursionError:
+        row["error"] = "RecursionError"
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def build_grid(args):
+    cells = []
+    grid = [("sort", name) for name in args.sorts] + [("search", name) for name in args.searches]
+    for kind, algorithm in grid:
+        for size in args.sizes:
+            if kind == "sort" and algorithm in QUADRATIC_SORTS and size > args.quadratic_limit:
+                continue
+            for distribution in args.distributions:
+                for seed in range(args.seeds):
+                    cells.append({"kind": kind, "algorithm": algorithm, "size": size,
+                                  "distribution": distribution, "seed": seed,
+                                  "memory": not args.no_memory, "queries": args.queries})
+    return cells
+
+
+def write_results(rows, output):
+    if output and output.endswith(".json"):
+        with open(output, "w") as f:
+            json.dump(rows, f, indent=1)
+        return
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if output:
+            f.close()
+
+
+def _names(text, registry):
+    if text == "all":
+        return list(registry)
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in registry]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown algorithm(s): {', '.join(unknown)}")
+    return names
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sorts", default="all", type=lambda t: _names(t, SORTING_ALGORITHMS),
+                        help="comma-separated sorting algorithms, 'all' or ''")
+    parser.add_argument("--searches", default="all", type=lambda t: _names(t, SEARCH_ALGORITHMS),
+                        help="comma-separated search algorithms, 'all' or ''")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        type=lambda t: [int(x) for x in t.split(",")])
+    parser.add_argument("--distributions", default="random,sorted,reversed,nearly-sorted",
+                        type=lambda t: [x.strip() for x in t.split(",")])
+    parser.add_argument("--seeds", type=int, default=3, help="number of seeds per cell")
+    parser.add_argument("--queries", type=int, default=200, help="search targets per cell")
+    parser.add_argument("--quadratic-limit", type=int, default=5000,
+                        help="skip O(n^2) sorts above this size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc rerun used for peak memory")
+    parser.add_argument("--output", "-o", help="write .csv or .json here instead of stdout")
+    args = parser.parse_args(argv)
+    for distribution in args.distributions:
+        if distribution not in DISTRIBUTIONS:
+            parser.error(f"unknown distribution {distribution!r}; "
+                         f"choose from {', '.join(DISTRIBUTIONS)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cells = build_grid(args)
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_cell, cell) for cell in cells]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows.append(future.result())
+            print(f"\r{done}/{len(cells)} cells", end="", file=sys.stderr)
+    print(f"\rfinished {len(cells)} cells in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    order = {(c["kind"], c["algorithm"]): k for k, c in enumerate(cells)}
+    rows.sort(key=lambda r: (order[(r["kind"], r["algorithm"])], r["size"], r["distribution"],
+                             r["seed"]))
+    write_results(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Lets plain `pytest` from the repository root import the engine package."""
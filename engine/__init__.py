@@ -0,0 +1,35 @@
+"""Qt-free algorithm engine: step generators, traces and metrics.
+
+Nothing in this package imports PyQt5 or matplotlib, so traces can be
+generated and measured from scripts and batch jobs without a display.
+"""
+from .trace import (
+    OP_COMPARE, OP_SWAP, OP_WRITE, OP_MARK, OP_DONE, OP_PROBE, OP_FOUND, STEPS_VERSION,
+    apply_step, step_highlight, StepStream,
+)
+from .tracebuf import TraceBuffer, SORT_COLUMNS, SEARCH_COLUMNS
+from .sorting import (
+    SORTING_ALGORITHMS, QUADRATIC_SORTS, DISTRIBUTION_SORTS, PIVOT_STRATEGIES, aux_cells,
+    counter_labels,
+)
+from .searching import (
+    SEARCH_ALGORITHMS, SEARCH_LAYOUTS, UNSORTED_SEARCHES, binary_search_steps, eytzinger_layout,
+    linear_search_steps, search_input,
+)
+from .metrics import (
+    LINE_BYTES, sort_metrics, search_metrics, trace_search_metrics, trace_passes, pivot_quality,
+)
+from .lod import ColumnSummary, column_envelope
+from .playback import (
+    MAX_RATE_POSITION, FrameBudget, FrameProfiler, finish_places, frame_interval_ms, slider_rate,
+)
+from .worker import BackgroundStream
+from .timeline import KEYFRAME_MAX_INTERVAL, KEYFRAME_MIN_INTERVAL, Timeline
+from .tracefile import (
+    CACHE_MAX_BYTES, CACHE_MIN_STEPS, TraceFile, TraceFileError, TraceWriter, cache_path, prune_cache,
+    save_trace,
+)
+from .workloads import DISTRIBUTIONS, generate
+from .arrays import BINARY_DTYPES, iter_text_chunks, map_binary, parse_values, sorted_copy
+from .batch import BATCH_SEARCHES, batch_search, probe_summary
+from .profiling import BackgroundProfile, format_ns, profile_lines, profile_run
@@ -0,0 +1,77 @@
+"""Vectorized loading of integer arrays from text, CSV and raw binary files."""
+import os
+import warnings
+
+import numpy as np
+
+# File extensions read as raw little-endian binary integers
+BINARY_DTYPES = {".i32": np.int32, ".i64": np.int64}
+
+
+def parse_values(text):
+    """Parse integers separated by commas and/or whitespace into an int64 array."""
+    text = text.replace(",", " ").strip()
+    if not text:
+        return np.empty(0, dtype=np.int64)
+    with warnings.catch_warnings():
+        # numpy only warns when it stops at a token that is not an integer
+        warnings.simplefilter("error")
+        try:
+            values = np.fromstring(text, dtype=np.int64, sep=" ")
+        except (ValueError, DeprecationWarning):
+            raise ValueError("Array values must be integers separated by commas or spaces.") from None
+    # numpy clips out-of-range numbers to the int64 limits without a warning
+    info = np.iinfo(np.int64)
+    extremes = np.flatnonzero((values == info.max) | (values == info.min))
+    if len(extremes):
+        tokens = text.split()
+        for k in extremes:
+            if not info.min <= int(tokens[k]) <= info.max:
+                raise ValueError(f"Array value {tokens[k]} does not fit in a 64-bit integer.")
+    return values
+
+
+def map_binary(path, dtype):
+    """Memory-map a raw binary file of dtype integers (read-only, nothing is copied)."""
+    dtype = np.dtype(dtype)
+    size = os.path.getsize(path)
+    if size % dtype.itemsize:
+        raise ValueError(f"{os.path.basename(path)} is {size} bytes, not a whole number of {dtype} values")
+    if size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def iter_text_chunks(path, chunk_bytes=1 << 21):
+    """Parse a text/CSV file of integers chunk by chunk.
+
+    Yields (values, fraction_read) so a caller can spread a large file over
+    several timer ticks; chunks are cut at the last separator so no number
+    is split in two.
+    """
+    total = os.path.getsize(path) or 1
+    done = 0
+    tail = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_bytes)
+            done += len(block)
+            if not block:
+                values = parse_values(tail.decode("ascii", "replace"))
+                yield values, 1.0
+                return
+            block = tail + block
+            cut = max(block.rfind(b","), block.rfind(b"\n"), block.rfind(b" "), block.rfind(b"\t"))
+            if cut < 0:
+                tail = block
+                continue
+            tail = block[cut + 1:]
+            yield parse_values(block[:cut].decode("ascii", "replace")), done / total
+
+
+def sorted_copy(arr):
+    """Sorted version of arr: arr itself if it is already non-decreasing, else np.sort."""
+    arr = np.asarray(arr)
+    if len(arr) < 2 or bool(np.all(arr[1:] >= arr[:-1])):
+        return arr
+    return np.sort(arr)
@@ -0,0 +1,337 @@
+"""Vectorized multi-target search: many queries in one NumPy pass.
+
+Each batch function returns (index, probes, lines) arrays with one entry
+per target, matching what the step generator in engine.searching reports
+for that target on its own (found index or -1, final probe count, and the
+distinct cache lines its probes touched; see search_metrics), so any
+single query can be replayed step by step afterwards.
+"""
+import math
+
+import numpy as np
+
+from .metrics import LINE_BYTES
+
+# Queries handled per vectorized pass, bounding the per-probe bookkeeping
+BATCH_CHUNK = 1 << 16
+
+
+def batch_linear(arr, targets, itemsize=8):
+    """Linear search for every target: one pass over arr finds each first occurrence."""
+    arr = np.asarray(arr)
+    n = len(arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    keys = np.unique(targets)
+    first = np.full(len(keys), n, dtype=np.int64)
+    if len(keys) and n:
+        pos = np.minimum(np.searchsorted(keys, arr), len(keys) - 1)
+        where = np.flatnonzero(keys[pos] == arr)
+        np.minimum.at(first, pos[where], where)
+    found = first[np.searchsorted(keys, targets)] if len(keys) else first
+    found = np.where(found < n, found, -1)
+    # a hit at i probes i + 1 elements, a miss probes all n; both sweep lines 0..last
+    probes = np.where(found >= 0, found + 1, n)
+    lines = np.where(probes > 0, (probes - 1) * itemsize // LINE_BYTES + 1, 0)
+    return found, probes, lines
+
+
+def _distinct_lines(touched, q):
+    """Per-query count of distinct lines in a list of (query indices, lines) probes.
+
+    Works on the (query, line) pairs themselves, so memory follows the number
+    of probes rather than rounds x queries.
+    """
+    if not touched:
+        return np.zeros(q, dtype=np.int64)
+    idx = np.concatenate([i for i, _ in touched])
+    lines = np.concatenate([l for _, l in touched])
+    if not len(idx):
+        return np.zeros(q, dtype=np.int64)
+    width = int(lines.max()) + 1
+    pairs = np.sort(idx * width + lines)
+    first = np.r_[True, pairs[1:] != pairs[:-1]]
+    return np.bincount(pairs[first] // width, minlength=q).astype(np.int64)
+
+
+def batch_binary(sorted_arr, targets, itemsize=8):
+    """Binary search for every target, stepping all queries' windows together."""
+    arr = np.asarray(sorted_arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    low = np.zeros(q, dtype=np.int64)
+    high = np.full(q, len(arr) - 1, dtype=np.int64)
+    found = np.full(q, -1, dtype=np.int64)
+    probes = np.zeros(q, dtype=np.int64)
+    touched = []
+    active = low <= high
+    while active.any():
+        idx = np.flatnonzero(active)
+        mid = (low[idx] + high[idx]) // 2
+        probes[idx] += 1
+        touched.append((idx, mid * itemsize // LINE_BYTES))
+        value = arr[mid]
+        hit = value == targets[idx]
+        found[idx[hit]] = mid[hit]
+        go_right = value < targets[idx]
+        low[idx[go_right]] = mid[go_right] + 1
+        go_left = ~hit & ~go_right
+        high[idx[go_left]] = mid[go_left] - 1
+        active[idx[hit]] = False
+        active &= low <= high
+    return found, probes, _distinct_lines(touched, q)
+
+
+def batch_jump(sorted_arr, targets, itemsize=8):
+    """Jump search for every target, in closed form rather than step by step.
+
+    The block ends it probes are a fixed sorted subsequence of arr, so the
+    block a target lands in and the element its linear scan stops at are
+    both one searchsorted; probes and lines follow from those positions.
+    """
+    arr = np.asarray(sorted_arr)
+    n = len(arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    if n == 0:
+        return np.full(q, -1, dtype=np.int64), np.zeros(q, dtype=np.int64), np.zeros(q, dtype=np.int64)
+    jump = max(1, math.isqrt(n))
+    ends = np.arange(jump - 1, n, jump, dtype=np.int64)
+    if ends[-1] != n - 1:
+        ends = np.append(ends, n - 1)
+    end_lines = ends * itemsize // LINE_BYTES
+    # distinct lines among the first k + 1 block ends (their lines never decrease)
+    end_distinct = np.cumsum(np.r_[True, end_lines[1:] != end_lines[:-1]])
+    # first block whose last element reaches the target; len(ends) if none does
+    block = np.searchsorted(arr[ends], targets, side="left")
+    missed = block == len(ends)
+    block = np.minimum(block, len(ends) - 1)
+    start = np.where(block > 0, ends[block - 1] + 1, 0)
+    # the scan stops at the first element >= target, which lies inside the block
+    stop = np.minimum(np.searchsorted(arr, targets, side="left"), n - 1)
+    hit = ~missed & (arr[stop] == targets)
+    found = np.where(hit, stop, -1)
+    probes = np.where(missed, len(ends), block + 1 + stop - start + 1)
+    # scanned lines are contiguous; only the ends just before and at the block can share them
+    first, last = start * itemsize // LINE_BYTES, stop * itemsize // LINE_BYTES
+    before = np.where(block > 0, end_lines[block - 1], -1)
+    at = end_lines[block]
+    shared = (before == first).astype(np.int64) + (at == last) - ((before == at) & (before == first))
+    lines = np.where(missed, end_distinct[-1], end_distinct[block] + last - first + 1 - shared)
+    return found, probes, lines
+
+
+def batch_exponential(sorted_arr, targets, itemsize=8):
+    """Exponential search for every target: all queries double their bounds, then binary search, together."""
+    arr = np.asarray(sorted_arr)
+    n = len(arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    found = np.full(q, -1, dtype=np.int64)
+    probes = np.zeros(q, dtype=np.int64)
+    touched = []
+    bound = np.ones(q, dtype=np.int64)
+    active = bound < n
+    while active.any():
+        idx = np.flatnonzero(active)
+        b = bound[idx]
+        probes[idx] += 1
+        touched.append((idx, b * itemsize // LINE_BYTES))
+        value = arr[b]
+        hit = value == targets[idx]
+        found[idx[hit]] = b[hit]
+        grow = value < targets[idx]
+        bound[idx[grow]] *= 2
+        active[idx[~grow]] = False
+        active &= bound < n
+    low = bound // 2
+    high = np.minimum(bound, n - 1)
+    active = (found < 0) & (low <= high)
+    while active.any():
+        idx = np.flatnonzero(active)
+        mid = (low[idx] + high[idx]) // 2
+        probes[idx] += 1
+        touched.append((idx, mid * itemsize // LINE_BYTES))
+        value = arr[mid]
+        hit = value == targets[idx]
+        found[idx[hit]] = mid[hit]
+        go_right = value < targets[idx]
+        low[idx[go_right]] = mid[go_right] + 1
+        go_left = ~hit & ~go_right
+        high[idx[go_left]] = mid[go_left] - 1
+        active[idx[hit]] = False
+        active &= low <= high
+    return found, probes, _distinct_lines(touched, q)
+
+
+def _interpolate(low, high, lo_val, hi_val, targets):
+    """low + (target - lo_val) * (high - low) // (hi_val - lo_val), exactly, for hi_val > lo_val."""
+    # int64 is exact unless the spread or the product could pass 2**63; those rows use Python ints
+    spread = hi_val.astype(float) - lo_val
+    risky = (spread >= 2.0 ** 62) | ((targets.astype(float) - lo_val) * (high - low) >= 2.0 ** 62)
+    safe = ~risky
+    pos = np.empty(len(low), dtype=np.int64)
+    pos[safe] = low[safe] + (targets[safe] - lo_val[safe]) * (high[safe] - low[safe]) // (
+        hi_val[safe] - lo_val[safe])
+    for k in np.flatnonzero(risky):
+        t, a, b = int(targets[k]), int(lo_val[k]), int(hi_val[k])
+        pos[k] = int(low[k]) + (t - a) * (int(high[k]) - int(low[k])) // (b - a)
+    return pos
+
+
+def batch_interpolation(sorted_arr, targets, itemsize=8):
+    """Interpolation search for every target, narrowing all queries' windows together."""
+    arr = np.asarray(sorted_arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    low = np.zeros(q, dtype=np.int64)
+    high = np.full(q, len(arr) - 1, dtype=np.int64)
+    found = np.full(q, -1, dtype=np.int64)
+    probes = np.zeros(q, dtype=np.int64)
+    touched = []
+    active = low <= high
+    while active.any():
+        idx = np.flatnonzero(active)
+        lo_val = arr[low[idx]].astype(np.int64)
+        hi_val = arr[high[idx]].astype(np.int64)
+        t = targets[idx]
+        inside = (lo_val <= t) & (t <= hi_val)
+        active[idx[~inside]] = False
+        idx, lo_val, hi_val, t = idx[inside], lo_val[inside], hi_val[inside], t[inside]
+        if not len(idx):
+            break
+        pos = low[idx].copy()
+        spread = hi_val != lo_val
+        pos[spread] = _interpolate(low[idx][spread], high[idx][spread], lo_val[spread], hi_val[spread],
+                                   t[spread])
+        probes[idx] += 1
+        touched.append((idx, pos * itemsize // LINE_BYTES))
+        value = arr[pos]
+        hit = value == t
+        found[idx[hit]] = pos[hit]
+        go_right = value < t
+        low[idx[go_right]] = pos[go_right] + 1
+        go_left = ~hit & ~go_right
+        high[idx[go_left]] = pos[go_left] - 1
+        active[idx[hit]] = False
+        active &= low <= high
+    return found, probes, _distinct_lines(touched, q)
+
+
+def batch_ternary(sorted_arr, targets, itemsize=8):
+    """Ternary search for every target; each round probes both thirds' split points."""
+    arr = np.asarray(sorted_arr)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    low = np.zeros(q, dtype=np.int64)
+    high = np.full(q, len(arr) - 1, dtype=np.int64)
+    found = np.full(q, -1, dtype=np.int64)
+    probes = np.zeros(q, dtype=np.int64)
+    touched = []
+    active = low <= high
+    while active.any():
+        idx = np.flatnonzero(active)
+        third = (high[idx] - low[idx]) // 3
+        m1 = low[idx] + third
+        m2 = high[idx] - third
+        t = targets[idx]
+        probes[idx] += 1
+        touched.append((idx, m1 * itemsize // LINE_BYTES))
+        v1 = arr[m1]
+        hit1 = v1 == t
+        found[idx[hit1]] = m1[hit1]
+        # the second point is probed only when the first missed
+        rest = ~hit1
+        probes[idx[rest]] += 1
+        touched.append((idx[rest], m2[rest] * itemsize // LINE_BYTES))
+        v2 = arr[m2]
+        hit2 = rest & (v2 == t)
+        found[idx[hit2]] = m2[hit2]
+        miss = rest & ~hit2
+        left = miss & (t < v1)
+        right = miss & ~left & (t > v2)
+        middle = miss & ~left & ~right
+        high[idx[left]] = m1[left] - 1
+        low[idx[right]] = m2[right] + 1
+        low[idx[middle]] = m1[middle] + 1
+        high[idx[middle]] = m2[middle] - 1
+        active[idx[hit1 | hit2]] = False
+        active &= low <= high
+    return found, probes, _distinct_lines(touched, q)
+
+
+def batch_eytzinger(layout, targets, itemsize=8):
+    """Branchless Eytzinger search for every target; every query descends in lockstep."""
+    layout = np.asarray(layout)
+    n = len(layout)
+    targets = np.asarray(targets, dtype=np.int64)
+    q = len(targets)
+    k = np.ones(q, dtype=np.int64)
+    probes = np.zeros(q, dtype=np.int64)
+    touched = []
+    active = k <= n
+    while active.any():
+        idx = np.flatnonzero(active)
+        probes[idx] += 1
+        touched.append((idx, (k[idx] - 1) * itemsize // LINE_BYTES))
+        k[idx] = 2 * k[idx] + (layout[k[idx] - 1] < targets[idx])
+        active = k <= n
+    # strip trailing right turns and the last left turn, as in eytzinger_search_steps
+    lowest_zero = ~k & (k + 1)
+    k = k // (2 * lowest_zero)
+    found = np.full(q, -1, dtype=np.int64)
+    idx = np.flatnonzero(k > 0)
+    probes[idx] += 1
+    touched.append((idx, (k[idx] - 1) * itemsize // LINE_BYTES))
+    hit = layout[k[idx] - 1] == targets[idx]
+    found[idx[hit]] = k[idx[hit]] - 1
+    return found, probes, _distinct_lines(touched, q)
+
+
+# Display name -> vectorized batch function, one for every search in
+# engine.searching.SEARCH_ALGORITHMS.
+BATCH_SEARCHES = {
+    "Linear Search": batch_linear,
+    "Binary Search": batch_binary,
+    "Jump Search": batch_jump,
+    "Exponential Search": batch_exponential,
+    "Interpolation Search": batch_interpolation,
+    "Ternary Search": batch_ternary,
+    "Eytzinger Binary Search": batch_eytzinger,
+}
+
+
+def batch_search(name, data, targets, itemsize=8):
+    """Run the named search for every target over data (see search_input)."""
+    targets = np.asarray(targets, dtype=np.int64)
+    parts = [BATCH_SEARCHES[name](data, targets[start:start + BATCH_CHUNK], itemsize)
+             for start in range(0, max(len(targets), 1), BATCH_CHUNK)]
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def probe_summary(found, probes, lines=None, bins=20):
+    """Hit rate and probe-count distribution (min/mean/p50/p99/max + histogram).
+
+    With per-query cache-line counts, their mean and p99 are included too.
+    """
+    probes = np.asarray(probes)
+    if not len(probes):
+        return None
+    hist_max = int(probes.max())
+    edges = np.linspace(0, hist_max + 1, min(bins, hist_max + 1) + 1)
+    counts, edges = np.histogram(probes, bins=edges)
+    hits = int(np.count_nonzero(np.asarray(found) >= 0))
+    summary = {
+        "queries": len(probes),
+        "hits": hits,
+        "hit_rate": hits / len(probes),
+        "min": int(probes.min()),
+        "mean": float(probes.mean()),
+        "p50": float(np.percentile(probes, 50)),
+        "p99": float(np.percentile(probes, 99)),
+        "max": hist_max,
+        "histogram": (counts, edges),
+    }
+    if lines is not None:
+        summary["lines_mean"] = float(np.mean(lines))
+        summary["lines_p99"] = float(np.percentile(lines, 99))
+    return summary
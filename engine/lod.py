@@ -0,0 +1,54 @@
+"""Level-of-detail summaries for drawing arrays wider than the screen."""
+import numpy as np
+
+
+class ColumnSummary:
+    """Min/max of an array per pixel column.
+
+    Element i falls in column i * columns // n. refresh() recomputes only the
+    columns containing the given indices, so a step costs O(n / columns).
+    """
+
+    def __init__(self, data, columns):
+        self.n = len(data)
+        self.columns = max(1, min(columns, self.n))
+        self.mins = [0] * self.columns
+        self.maxs = [0] * self.columns
+        for c in range(self.columns):
+            self._recompute(data, c)
+
+    def column_of(self, i):
+        return i * self.columns // self.n
+
+    def bounds(self, c):
+        """Return the [start, stop) element range covered by column c."""
+        start = -(-c * self.n // self.columns)
+        stop = -(-(c + 1) * self.n // self.columns)
+        return start, stop
+
+    def refresh(self, data, indices):
+        """Recompute the columns touched by indices and return them as a set."""
+        touched = {self.column_of(i) for i in indices}
+        for c in touched:
+            self._recompute(data, c)
+        return touched
+
+    def _recompute(self, data, c):
+        start, stop = self.bounds(c)
+        chunk = data[start:stop]
+        self.mins[c] = min(chunk)
+        self.maxs[c] = max(chunk)
+
+
+def column_envelope(data, columns):
+    """Vectorized per-column (starts, mins, maxs) for a whole NumPy array.
+
+    Uses the same column split as ColumnSummary, but computes every column
+    at once with reduceat, so a 10^7-element (or memory-mapped) array costs
+    one pass in C instead of a Python loop.
+    """
+    data = np.asarray(data)
+    n = len(data)
+    columns = max(1, min(columns, n))
+    starts = -(-np.arange(columns, dtype=np.int64) * n // columns)
+    return starts, np.minimum.reduceat(data, starts), np.maximum.reduceat(data, starts)
@@ -0,0 +1,89 @@
+"""Counters derived from sorting and searching traces."""
+import numpy as np
+
+from .sorting import DISTRIBUTION_SORTS
+from .trace import OP_FOUND, OP_MARK, OP_PROBE
+
+# Cache line size assumed by the cache-touch metrics
+LINE_BYTES = 64
+
+
+def sort_metrics(steps, algorithm):
+    """Drain an iterable of the named algorithm's sorting steps and return its final counters.
+
+    For distribution sorts "comparisons" holds bucket writes (see
+    counter_labels) and "passes" counts the passes over the data; other
+    sorts report 0 passes (Introsort's marks carry pivot balance instead).
+    """
+    count = 0
+    last = None
+    passes = 0
+    distribution = algorithm in DISTRIBUTION_SORTS
+    for step in steps:
+        count += 1
+        last = step
+        if distribution and step[0] == OP_MARK and step[2] >= passes:
+            passes = step[2] + 1
+    comps, swaps = (last[3], last[4]) if last is not None else (0, 0)
+    return {"steps": count, "comparisons": comps, "swaps": swaps, "passes": passes}
+
+
+def trace_passes(trace, algorithm):
+    """Passes over the data recorded in the named distribution sort's TraceBuffer/TraceFile."""
+    if algorithm not in DISTRIBUTION_SORTS:
+        return 0
+    marks = trace.column("b")[trace.column("op") == OP_MARK]
+    return int(marks.max()) + 1 if len(marks) and marks.max() >= 0 else 0
+
+
+def search_metrics(steps, itemsize=8):
+    """Return probe count, found index (-1 if missing) and cache lines for search steps.
+
+    cache_lines counts the distinct LINE_BYTES-sized lines the probes fall
+    in, for elements of itemsize bytes in an array starting on a line boundary.
+    """
+    count = 0
+    probes = 0
+    found_index = -1
+    lines = set()
+    for step in steps:
+        op, index, probes = step[0], step[1], step[2]
+        count += 1
+        if op == OP_PROBE:
+            lines.add(index * itemsize // LINE_BYTES)
+        elif op == OP_FOUND:
+            found_index = index
+            break
+    return {"steps": count, "probes": probes, "found_index": found_index, "cache_lines": len(lines)}
+
+
+def trace_search_metrics(trace, itemsize=8):
+    """search_metrics for a recorded search TraceBuffer/TraceFile, computed on its columns.
+
+    Reads the op, index and probes columns once with NumPy instead of
+    iterating the steps as Python tuples.
+    """
+    op = trace.column("op")
+    index = trace.column("index")
+    found = np.flatnonzero(op == OP_FOUND)
+    count = int(found[0]) + 1 if len(found) else len(op)
+    if count == 0:
+        return {"steps": 0, "probes": 0, "found_index": -1, "cache_lines": 0}
+    lines = np.sort(index[:count][op[:count] == OP_PROBE].astype(np.int64) * itemsize // LINE_BYTES)
+    distinct = int(np.count_nonzero(lines[1:] != lines[:-1])) + 1 if len(lines) else 0
+    return {"steps": count, "probes": int(trace.column("probes")[count - 1]),
+            "found_index": int(index[found[0]]) if len(found) else -1, "cache_lines": distinct}
+
+
+def pivot_quality(trace):
+    """Summarize the partition balance marks an Introsort trace carries.
+
+    Returns the number of partitions and the mean and worst share of the
+    smaller side (0.5 is a perfect split), or None if there are none.
+    """
+    balance = trace.column("b")[trace.column("op") == OP_MARK]
+    balance = balance[balance >= 0]
+    if not len(balance):
+        return None
+    return {"partitions": len(balance), "mean": float(balance.mean()) / 1000,
+            "worst": float(balance.min()) / 1000}
@@ -0,0 +1,180 @@
+"""Frame scheduling for animation playback.
+
+Playback advances by a steps-per-second rate rather than one step per timer
+tick: each rendered frame applies however many steps are due since the last
+frame and only the final state is drawn.
+"""
+import json
+import time
+from collections import deque
+
+
+# Highest slider position: 10 ** (50 / 10) = 100,000 steps/s, about what one
+# frame's step loop sustains in CPython once drawing is taken into account.
+MAX_RATE_POSITION = 50
+
+
+def slider_rate(position, per_decade=10):
+    """Map a linear slider position to a steps-per-second rate on a log scale."""
+    return 10 ** (position / per_decade)
+
+
+def frame_interval_ms(refresh_rate):
+    """Timer interval for one frame at the given display refresh rate (Hz)."""
+    if not refresh_rate or refresh_rate <= 0:
+        refresh_rate = 60.0
+    return max(1, int(round(1000.0 / refresh_rate)))
+
+
+def finish_places(steps):
+    """1-based race places for the given total step counts; fewer steps ranks first.
+
+    Equal counts share a place and the next place is skipped (1, 2, 2, 4).
+    """
+    return [1 + sum(other < count for other in steps) for count in steps]
+
+
+class FrameBudget:
+    """Turns elapsed wall time into a whole number of steps for the next frame.
+
+    Fractional steps carry over between frames, so low rates (a few steps per
+    second) still advance evenly. Elapsed time is capped at max_lag seconds so
+    a stalled frame does not trigger a huge catch-up burst.
+    """
+
+    def __init__(self, steps_per_second=1.0, frame_ms=16, max_lag=0.25):
+        self.steps_per_second = steps_per_second
+        self.frame_ms = frame_ms
+        self.max_lag = max_lag
+        self.carry = 0.0
+        self.last = None
+
+    def start(self):
+        self.carry = 1.0   # show the first step immediately
+        self.last = time.perf_counter()
+
+    def steps_due(self):
+        now = time.perf_counter()
+        elapsed = 0.0 if self.last is None else min(now - self.last, self.max_lag)
+        self.last = now
+        exact = self.steps_per_second * elapsed + self.carry
+        n = int(exact)
+        self.carry = exact - n
+        return n
+
+    def deadline(self):
+        """perf_counter() value by which step application should stop this frame."""
+        return time.perf_counter() + 0.75 * self.frame_ms / 1000.0
+
+
+class FrameProfiler:
+    """Per-frame playback timings: where each frame's time went.
+
+    A visualizer calls begin() when its frame timer fires, applied() once
+    the due steps are applied and end(steps) after drawing. Each frame records
+    the interval since the previous one, its jitter against the expected
+    interval, how many frames that interval skipped, the steps applied and
+    the apply and draw times. The last `window` frames feed summary(); with
+    a log open, every frame is also written as one JSON line.
+    """
+
+    def __init__(self, window=120):
+        self.frames = deque(maxlen=window)
+        self.expected_ms = 16
+        self.count = 0
+        self.dropped = 0
+        self.rebuild_ms = None
+        self.log = None
+        self._last_tick = None
+        self._tick = self._applied = None
+
+    def start(self, frame_ms):
+        """(Re)start timing at the given frame interval, e.g. after a pause."""
+        self.expected_ms = frame_ms
+        self._last_tick = None
+
+    def begin(self):
+        self._tick = time.perf_counter_ns()
+        self._applied = None
+
+    def applied(self):
+        self._applied = time.perf_counter_ns()
+
+    def end(self, steps):
+        if self._tick is None:
+            return
+        now = time.perf_counter_ns()
+        applied = self._applied if self._applied is not None else now
+        interval = None if self._last_tick is None else (self._tick - self._last_tick) / 1e6
+        dropped = 0
+        if interval is not None and self.expected_ms:
+            dropped = max(0, round(interval / self.expected_ms) - 1)
+        self._last_tick = self._tick
+        self.count += 1
+        self.dropped += dropped
+        frame = {
+            "frame": self.count,
+            "t": self._tick / 1e9,
+            "interval_ms": interval,
+            "jitter_ms": None if interval is None else interval - self.expected_ms,
+            "dropped": dropped,
+            "steps": steps,
+            "apply_ms": (applied - self._tick) / 1e6,
+            "draw_ms": (now - applied) / 1e6,
+        }
+        self.frames.append(frame)
+        self._tick = None
+        if self.log is not None:
+            self.log.write(json.dumps(frame) + "\n")
+
+    def rebuild(self, ms):
+        """Record a full redraw (new array, seek) that happens outside the frame loop."""
+        self.rebuild_ms = ms
+        if self.log is not None:
+            self.log.write(json.dumps({"event": "rebuild", "t": time.perf_counter(), "draw_ms": ms}) + "\n")
+
+    def summary(self):
+        """FPS, steps per frame, draw times, jitter and drops over the recent window."""
+        frames = list(self.frames)
+        if not frames:
+            return None
+        intervals = [f["interval_ms"] for f in frames if f["interval_ms"] is not None]
+        draws = sorted(f["draw_ms"] for f in frames)
+        return {
+            "frames": self.count,
+            "fps": 1000 / (sum(intervals) / len(intervals)) if intervals else 0.0,
+            "steps_per_frame": sum(f["steps"] for f in frames) / len(frames),
+            "apply_ms": sum(f["apply_ms"] for f in frames) / len(frames),
+            "draw_ms": sum(draws) / len(draws),
+            "draw_p95_ms": draws[min(len(draws) - 1, int(0.95 * len(draws)))],
+            "jitter_ms": sum(abs(i - self.expected_ms) for i in intervals) / max(1, len(intervals)),
+            "dropped": sum(f["dropped"] for f in frames),
+            "dropped_total": self.dropped,
+            "rebuild_ms": self.rebuild_ms,
+        }
+
+    def summary_text(self):
+        stats = self.summary()
+        if stats is None:
+            return "No frames yet"
+        lines = [
+            f"{stats['fps']:.1f} fps (target {1000 / self.expected_ms:.0f})",
+            f"{stats['steps_per_frame']:,.1f} steps/frame",
+            f"apply {stats['apply_ms']:.2f} ms · draw {stats['draw_ms']:.2f} ms (p95 {stats['draw_p95_ms']:.2f})",
+            f"jitter {stats['jitter_ms']:.2f} ms · dropped {stats['dropped']} (total {stats['dropped_total']})",
+        ]
+        if stats["rebuild_ms"] is not None:
+            lines.append(f"last full redraw {stats['rebuild_ms']:.1f} ms")
+        return "\n".join(lines)
+
+    def open_log(self, path, **info):
+        """Write every following frame to path as JSON lines, after one header line."""
+        self.close_log()
+        self.log = open(path, "w")
+        self.log.write(json.dumps(dict(info, event="start", t=time.perf_counter(),
+                                       expected_ms=self.expected_ms)) + "\n")
+
+    def close_log(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
@@ -0,0 +1,226 @@
+"""Real cost of one algorithm run, measured apart from the animation.
+
+profile_run times the step generator drained with nothing recorded, times
+it again recording every step the way a TraceBuffer does (the cost the
+visualizers add), and reruns it under tracemalloc for its peak memory. The
+animation only ever shows how long the playback took; these are the numbers
+to compare algorithms by.
+
+Every pass stops after PROFILE_MAX_STEPS steps, so an O(n^2) sort on a large
+input costs the worker seconds rather than minutes of CPU and no disk.
+"""
+from collections import deque
+from itertools import islice
+import multiprocessing as mp
+import time
+import tracemalloc
+
+from .searching import SEARCH_ALGORITHMS
+from .sorting import SORTING_ALGORITHMS
+from .tracebuf import SEARCH_COLUMNS, SORT_COLUMNS, TraceBuffer
+from .worker import attach_args, release_blocks, share_arg
+
+_ALGORITHMS = {"sort": SORTING_ALGORITHMS, "search": SEARCH_ALGORITHMS}
+_COLUMNS = {"sort": SORT_COLUMNS, "search": SEARCH_COLUMNS}
+
+# Steps measured per pass; longer runs are measured on this prefix only
+PROFILE_MAX_STEPS = 1_000_000
+# Bare runs shorter than this are too noisy to report a recording overhead for
+MIN_OVERHEAD_NS = 1_000_000
+
+
+class _DiscardingTrace(TraceBuffer):
+    """TraceBuffer that converts every chunk, as recording does, then drops it."""
+
+    def _flush(self):
+        super()._flush()
+        self.chunks.clear()
+        self.memory_bytes = 0
+
+
+def _fresh_args(kind, args):
+    # sorts work in place, so every run gets its own copy of the input
+    if kind == "sort":
+        return (list(args[0]),) + tuple(args[1:])
+    return args
+
+
+def _best_of(kind, name, args, kwargs, record, min_ns, max_repeat, max_steps):
+    """Fastest of up to max_repeat runs of at most max_steps steps, stopping
+    once min_ns have been spent. Also returns whether the run got to its end."""
+    best = None
+    spent = 0
+    repeats = 0
+    complete = True
+    while repeats < max_repeat and (repeats == 0 or spent < min_ns):
+        run_args = _fresh_args(kind, args)
+        trace = _DiscardingTrace(_COLUMNS[kind]) if record else None
+        generator = _ALGORITHMS[kind][name](*run_args, **kwargs)
+        steps = islice(generator, max_steps)
+        start = time.perf_counter_ns()
+        if record:
+            trace.extend(steps)
+        else:
+            deque(steps, maxlen=0)
+        elapsed = time.perf_counter_ns() - start
+        if trace is not None:
+            trace.close()
+        complete = next(generator, None) is None
+        generator.close()
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        repeats += 1
+    return best, repeats, complete
+
+
+def profile_run(kind, name, args, kwargs=None, min_ns=50_000_000, max_repeat=1000,
+                max_steps=PROFILE_MAX_STEPS):
+    """Measure one algorithm on one input.
+
+    kind is "sort" or "search" and args/kwargs are the step generator's
+    arguments, as for BackgroundStream. Short runs are repeated (up to
+    max_repeat times, until min_ns is reached) and the fastest is kept.
+    Runs longer than max_steps are measured on their first max_steps steps.
+    Returns a dict with steps, complete (False if the run was cut short),
+    bare_ns, traced_ns, overhead (traced / bare - 1, at least 0, or None if
+    the bare run is under MIN_OVERHEAD_NS), peak_bytes allocated by the run
+    itself, and repeats.
+    """
+    kwargs = kwargs or {}
+    bare_ns, repeats, complete = _best_of(kind, name, args, kwargs, False, min_ns, max_repeat, max_steps)
+    traced_ns, _, _ = _best_of(kind, name, args, kwargs, True, min_ns, max_repeat, max_steps)
+
+    run_args = _fresh_args(kind, args)
+    generator = _ALGORITHMS[kind][name](*run_args, **kwargs)
+    steps = 0
+    tracemalloc.start()
+    try:
+        for _ in islice(generator, max_steps):
+            steps += 1
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        generator.close()
+    # best-of timings of short runs jitter by a few percent either way
+    overhead = max(traced_ns / bare_ns - 1, 0.0) if bare_ns >= MIN_OVERHEAD_NS else None
+    return {
+        "steps": steps,
+        "complete": complete,
+        "bare_ns": bare_ns,
+        "traced_ns": traced_ns,
+        "overhead": overhead,
+        "peak_bytes": peak_bytes,
+        "repeats": repeats,
+    }
+
+
+def format_ns(ns):
+    """Human-readable duration for a nanosecond count."""
+    if ns >= 1_000_000_000:
+        return f"{ns / 1e9:.3f} s"
+    if ns >= 1_000_000:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1_000:
+        return f"{ns / 1e3:.1f} µs"
+    return f"{ns} ns"
+
+
+def profile_lines(profile):
+    """The measurements of a profile_run result as short display lines."""
+    per_step = profile["bare_ns"] / profile["steps"] if profile["steps"] else 0
+    runs = f"best of {profile['repeats']}" if profile["repeats"] > 1 else "single run"
+    if profile["overhead"] is None:
+        overhead = "run too short to compare"
+    else:
+        overhead = f"{profile['overhead']:+.0%} overhead"
+    if profile["complete"]:
+        return [
+            f"Algorithm time: {format_ns(profile['bare_ns'])} ({runs}, {per_step:,.0f} ns per step)",
+            f"With trace recording: {format_ns(profile['traced_ns'])} ({overhead})",
+            f"Peak memory allocated: {profile['peak_bytes'] / 1024:,.1f} KiB",
+        ]
+    first = f"first {profile['steps']:,} steps"
+    return [
+        f"Algorithm time: over {format_ns(profile['bare_ns'])} (measured on the {first}, "
+        f"{per_step:,.0f} ns per step)",
+        f"With trace recording: {format_ns(profile['traced_ns'])} for the {first} ({overhead})",
+        f"Peak memory allocated: {profile['peak_bytes'] / 1024:,.1f} KiB in the {first}",
+    ]
+
+
+def _profile_child(conn, kind, name, args, kwargs):
+    attached = []
+    try:
+        result = profile_run(kind, name, attach_args(args, attached), kwargs)
+        conn.send(("ok", result))
+    except Exception as e:
+        try:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        except (BrokenPipeError, EOFError, OSError):
+            pass   # the parent stopped listening
+    finally:
+        args = None
+        release_blocks(attached)
+        conn.close()
+
+
+class BackgroundProfile:
+    """profile_run in a worker process, so a slow algorithm never blocks the GUI.
+
+    Poll done from a timer, then read result (the profile dict) or error.
+    """
+
+    def __init__(self, kind, name, args, kwargs=None):
+        self.result = None
+        self.error = ""
+        self.shared_args = []
+        args = tuple(share_arg(arg, self.shared_args) for arg in args)
+        context = mp.get_context("spawn")   # never fork a process that is running Qt
+        self.conn, child = context.Pipe(duplex=False)
+        self.process = context.Process(target=_profile_child, args=(child, kind, name, args, kwargs or {}),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    @property
+    def done(self):
+        """True once the result (or an error) has arrived; never blocks."""
+        if self.conn is None:
+            return True
+        try:
+            if not self.conn.poll():
+                if self.process.is_alive():
+                    return False
+                if not self.conn.poll():
+                    self.error = "profiling process exited without a result"
+                    self.close()
+                    return True
+            status, value = self.conn.recv()
+        except (EOFError, OSError):
+            status, value = "error", "profiling process exited without a result"
+        if status == "ok":
+            self.result = value
+        else:
+            self.error = value
+        self.close()
+        return True
+
+    def close(self):
+        """Stop the worker if it is still running and release shared memory."""
+        if self.conn is None:
+            return
+        self.conn.close()
+        self.conn = None
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        for block in self.shared_args:
+            block.close()
+            block.unlink()
+        self.shared_args = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
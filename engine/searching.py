@@ -0,0 +1,249 @@
+"""Search algorithms as generators of compact probe steps (see engine.trace)."""
+import math
+
+import numpy as np
+
+from .trace import OP_PROBE, OP_FOUND, OP_DONE
+
+
+# Each step is (op, index, probes_so_far, low, high): [low, high] is the
+# window of indices that can still hold the target when the step is taken
+# (empty, low > high, once the search gives up)
+
+def linear_search_steps(arr, target):
+    n = len(arr)
+    probes = 0
+    for i in range(n):
+        probes += 1
+        yield (OP_PROBE, i, probes, i, n - 1)
+
+        if arr[i] == target:
+            yield (OP_FOUND, i, probes, i, i)
+            return
+    yield (OP_DONE, -1, probes, n, n - 1)
+
+
+def binary_search_steps(sorted_arr, target):
+    arr = sorted_arr
+    low = 0
+    high = len(arr) - 1
+    probes = 0
+
+    while low <= high:
+        mid = (low + high) // 2
+        probes += 1
+        yield (OP_PROBE, mid, probes, low, high)
+
+        if arr[mid] == target:
+            yield (OP_FOUND, mid, probes, mid, mid)
+            return
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+
+    yield (OP_DONE, -1, probes, low, high)
+
+
+def jump_search_steps(sorted_arr, target):
+    arr = sorted_arr
+    n = len(arr)
+    jump = max(1, math.isqrt(n))
+    probes = 0
+    prev = 0
+    # jump ahead block by block until the block's last element reaches the target
+    block_end = min(jump, n) - 1
+    while block_end >= 0:
+        probes += 1
+        yield (OP_PROBE, block_end, probes, prev, n - 1)
+        if arr[block_end] >= target:
+            break
+        prev = block_end + 1
+        if prev >= n:
+            yield (OP_DONE, -1, probes, n, n - 1)
+            return
+        block_end = min(block_end + jump, n - 1)
+    # then scan that block linearly
+    for i in range(prev, block_end + 1):
+        probes += 1
+        yield (OP_PROBE, i, probes, i, block_end)
+        if arr[i] == target:
+            yield (OP_FOUND, i, probes, i, i)
+            return
+        if arr[i] > target:
+            yield (OP_DONE, -1, probes, i, i - 1)
+            return
+    yield (OP_DONE, -1, probes, block_end + 1, block_end)
+
+
+def exponential_search_steps(sorted_arr, target):
+    arr = sorted_arr
+    n = len(arr)
+    probes = 0
+    # double the bound until it passes the target, then binary search the last range
+    bound = 1
+    while bound < n:
+        probes += 1
+        yield (OP_PROBE, bound, probes, bound // 2, n - 1)
+        if arr[bound] == target:
+            yield (OP_FOUND, bound, probes, bound, bound)
+            return
+        if arr[bound] > target:
+            break
+        bound *= 2
+    low = bound // 2
+    high = min(bound, n - 1)
+    while low <= high:
+        mid = (low + high) // 2
+        probes += 1
+        yield (OP_PROBE, mid, probes, low, high)
+        if arr[mid] == target:
+            yield (OP_FOUND, mid, probes, mid, mid)
+            return
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+    yield (OP_DONE, -1, probes, low, high)
+
+
+def interpolation_search_steps(sorted_arr, target):
+    """Probe where the target would sit if values were evenly spread.
+
+    Only the interpolated positions count as probes; the reads of arr[low]
+    and arr[high] it needs sit next to earlier probes.
+    """
+    arr = sorted_arr
+    low = 0
+    high = len(arr) - 1
+    probes = 0
+    while low <= high and arr[low] <= target <= arr[high]:
+        lo_val = int(arr[low])
+        hi_val = int(arr[high])
+        if hi_val == lo_val:
+            pos = low
+        else:
+            pos = low + (target - lo_val) * (high - low) // (hi_val - lo_val)
+        probes += 1
+        yield (OP_PROBE, pos, probes, low, high)
+        if arr[pos] == target:
+            yield (OP_FOUND, pos, probes, pos, pos)
+            return
+        elif arr[pos] < target:
+            low = pos + 1
+        else:
+            high = pos - 1
+    # the target lies outside [arr[low], arr[high]], so nothing is left
+    yield (OP_DONE, -1, probes, low, low - 1)
+
+
+def ternary_search_steps(sorted_arr, target):
+    arr = sorted_arr
+    low = 0
+    high = len(arr) - 1
+    probes = 0
+    while low <= high:
+        third = (high - low) // 3
+        m1 = low + third
+        m2 = high - third
+        probes += 1
+        yield (OP_PROBE, m1, probes, low, high)
+        if arr[m1] == target:
+            yield (OP_FOUND, m1, probes, m1, m1)
+            return
+        probes += 1
+        yield (OP_PROBE, m2, probes, low, high)
+        if arr[m2] == target:
+            yield (OP_FOUND, m2, probes, m2, m2)
+            return
+        if target < arr[m1]:
+            high = m1 - 1
+        elif target > arr[m2]:
+            low = m2 + 1
+        else:
+            low = m1 + 1
+            high = m2 - 1
+    yield (OP_DONE, -1, probes, low, high)
+
+
+def eytzinger_layout(sorted_arr):
+    """Reorder a sorted array into Eytzinger (BFS heap) order.
+
+    Node k (1-based) holds the element whose in-order rank it has in the
+    complete binary tree of n nodes, so a search walks k -> 2k or 2k + 1 and
+    the first levels share a few cache lines. Built without a Python loop:
+    ranks in the perfect tree of the same height are unique, so scattering
+    nodes by rank and dropping the missing ones gives the in-order sequence.
+    """
+    arr = np.asarray(sorted_arr)
+    n = len(arr)
+    if n == 0:
+        return arr.copy()
+    height = n.bit_length()
+    k = np.arange(1, n + 1, dtype=np.int64)
+    depth = np.floor(np.log2(k)).astype(np.int64)
+    # guard against log2 rounding at exact powers of two
+    depth -= (np.left_shift(1, depth) > k).astype(np.int64)
+    depth += (np.left_shift(1, depth + 1) <= k).astype(np.int64)
+    offset = k - np.left_shift(1, depth)
+    rank = (2 * offset + 1) * np.left_shift(1, height - 1 - depth) - 1
+    slots = np.full(1 << height, 0, dtype=np.int64)
+    slots[rank] = k
+    in_order = slots[slots > 0]
+    layout = np.empty_like(arr)
+    layout[in_order - 1] = arr
+    return layout
+
+
+def eytzinger_search_steps(layout, target):
+    """Branchless binary search over an Eytzinger layout (see eytzinger_layout).
+
+    The descent always runs to a leaf, choosing the child by arithmetic on
+    the comparison instead of branching; the candidate is then recovered
+    from the path and checked once. Indices in the steps are layout positions;
+    the candidates under node k are not one contiguous range of the layout,
+    so the window is reported as (-1, -1), i.e. unknown.
+    """
+    n = len(layout)
+    probes = 0
+    k = 1
+    while k <= n:
+        probes += 1
+        yield (OP_PROBE, k - 1, probes, -1, -1)
+        k = 2 * k + int(layout[k - 1] < target)
+    # drop the trailing right turns and the final left turn: k is the lower bound
+    k >>= (~k & (k + 1)).bit_length()
+    if k:
+        probes += 1
+        yield (OP_PROBE, k - 1, probes, -1, -1)
+        if layout[k - 1] == target:
+            yield (OP_FOUND, k - 1, probes, k - 1, k - 1)
+            return
+    yield (OP_DONE, -1, probes, 0, -1)
+
+
+# Display name -> step generator. All but UNSORTED_SEARCHES expect a sorted
+# array, reordered first by SEARCH_LAYOUTS where one is listed.
+SEARCH_ALGORITHMS = {
+    "Linear Search": linear_search_steps,
+    "Binary Search": binary_search_steps,
+    "Jump Search": jump_search_steps,
+    "Exponential Search": exponential_search_steps,
+    "Interpolation Search": interpolation_search_steps,
+    "Ternary Search": ternary_search_steps,
+    "Eytzinger Binary Search": eytzinger_search_steps,
+}
+
+UNSORTED_SEARCHES = {"Linear Search"}
+
+SEARCH_LAYOUTS = {"Eytzinger Binary Search": eytzinger_layout}
+
+
+def search_input(name, arr, sorted_arr=None):
+    """The array the named search runs on, given the raw input (and its sorted copy)."""
+    if name in UNSORTED_SEARCHES:
+        return arr
+    data = sorted_arr if sorted_arr is not None else np.sort(np.asarray(arr))
+    if name in SEARCH_LAYOUTS:
+        data = SEARCH_LAYOUTS[name](data)
+    return data
@@ -0,0 +1,525 @@
+"""Sorting algorithms as lazy generators of delta steps (see engine.trace)."""
+import bisect
+import random
+
+from .trace import OP_COMPARE, OP_SWAP, OP_WRITE, OP_MARK, OP_DONE
+
+
+def bubble_sort_steps(arr):
+    comps = 0
+    swaps = 0
+    n = len(arr)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            comps += 1
+            yield (OP_COMPARE, j, j + 1, comps, swaps)
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swaps += 1
+                swapped = True
+                yield (OP_SWAP, j, j + 1, comps, swaps)
+        if not swapped:
+            break   # a pass without swaps: already sorted
+    # final state
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+def selection_sort_steps(arr):
+    comps = 0
+    swaps = 0
+    n = len(arr)
+    for i in range(n):
+        min_idx = i
+        for j in range(i + 1, n):
+            comps += 1
+            yield (OP_COMPARE, min_idx, j, comps, swaps)
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+                # highlight new min as change (no swap yet)
+                yield (OP_MARK, min_idx, -1, comps, swaps)
+        # swap minimum into position i
+        if min_idx != i:
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            swaps += 1
+            yield (OP_SWAP, i, min_idx, comps, swaps)
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+def insertion_sort_steps(arr):
+    comps = 0
+    swaps = 0  # here count assignments/shifts as swaps for demonstration
+    n = len(arr)
+    for i in range(1, n):
+        key = arr[i]
+        j = i - 1
+        # show initial key
+        yield (OP_MARK, i, -1, comps, swaps)
+        while j >= 0:
+            comps += 1
+            yield (OP_COMPARE, j, j + 1, comps, swaps)
+            if arr[j] > key:
+                arr[j + 1] = arr[j]
+                swaps += 1
+                yield (OP_WRITE, j + 1, arr[j], comps, swaps)
+                j -= 1
+            else:
+                break
+        arr[j + 1] = key
+        swaps += 1
+        yield (OP_WRITE, j + 1, key, comps, swaps)
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+def quick_sort_steps(arr):
+    comps = 0
+    swaps = 0
+    # explicit stack of (low, high) ranges: nested generators would make every
+    # step cost O(depth) to resume, and sorted input would hit the recursion limit
+    stack = [(0, len(arr) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+        pivot = arr[high]
+        i = low - 1
+        for j in range(low, high):
+            comps += 1
+            yield (OP_COMPARE, j, high, comps, swaps)
+            if arr[j] < pivot:
+                i += 1
+                arr[i], arr[j] = arr[j], arr[i]
+                swaps += 1
+                yield (OP_SWAP, i, j, comps, swaps)
+        arr[i + 1], arr[high] = arr[high], arr[i + 1]
+        swaps += 1
+        yield (OP_SWAP, i + 1, high, comps, swaps)
+        p = i + 1
+        # right side pushed first so the left side is sorted first, as before
+        stack.append((p + 1, high))
+        stack.append((low, p - 1))
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+# Pivot choices accepted by intro_sort_steps(pivot=...)
+PIVOT_STRATEGIES = ("median-of-three", "ninther", "random")
+
+
+def intro_sort_steps(arr, pivot="median-of-three", cutoff=16, seed=0):
+    """Iterative introsort: Hoare-partition quicksort on an explicit stack.
+
+    Partitions of at most `cutoff` elements are finished by insertion sort and
+    any partition nested deeper than 2·log2(n) falls back to heapsort, so the
+    worst case stays O(n log n) without Python recursion. After each partition
+    an OP_MARK at the split point carries its balance in b: the smaller side's
+    share of the range in per mille (500 is a perfect split, see pivot_quality).
+    """
+    comps = 0
+    swaps = 0
+    rng = random.Random(seed)
+
+    def less(i, j):
+        nonlocal comps
+        comps += 1
+        return arr[i] < arr[j]
+
+    def median3(i, j, k):
+        # index of the median of arr[i], arr[j], arr[k]
+        if less(i, j):
+            if less(j, k):
+                return j
+            return k if less(i, k) else i
+        if less(i, k):
+            return i
+        return k if less(j, k) else j
+
+    def choose_pivot(lo, hi):
+        if pivot == "random":
+            return rng.randint(lo, hi)
+        mid = (lo + hi) // 2
+        if pivot == "ninther" and hi - lo >= 40:
+            step = (hi - lo) // 8
+            return median3(median3(lo, lo + step, lo + 2 * step),
+                           median3(mid - step, mid, mid + step),
+                           median3(hi - 2 * step, hi - step, hi))
+        return median3(lo, mid, hi)
+
+    def swap(i, j):
+        nonlocal swaps
+        arr[i], arr[j] = arr[j], arr[i]
+        swaps += 1
+        return (OP_SWAP, i, j, comps, swaps)
+
+    def partition(lo, hi):
+        nonlocal comps
+        p = choose_pivot(lo, hi)
+        yield (OP_MARK, p, -1, comps, swaps)
+        if p != lo:
+            yield swap(lo, p)
+        value = arr[lo]
+        i = lo - 1
+        j = hi + 1
+        while True:
+            i += 1
+            comps += 1
+            yield (OP_COMPARE, i, j - 1, comps, swaps)
+            while arr[i] < value:
+                i += 1
+                comps += 1
+                yield (OP_COMPARE, i, j - 1, comps, swaps)
+            j -= 1
+            comps += 1
+            yield (OP_COMPARE, i, j, comps, swaps)
+            while arr[j] > value:
+                j -= 1
+                comps += 1
+                yield (OP_COMPARE, i, j, comps, swaps)
+            if i >= j:
+                return j
+            yield swap(i, j)
+
+    def insertion(lo, hi):
+        nonlocal comps, swaps
+        for i in range(lo + 1, hi + 1):
+            key = arr[i]
+            j = i - 1
+            yield (OP_MARK, i, -1, comps, swaps)
+            while j >= lo:
+                comps += 1
+                yield (OP_COMPARE, j, j + 1, comps, swaps)
+                if arr[j] > key:
+                    arr[j + 1] = arr[j]
+                    swaps += 1
+                    yield (OP_WRITE, j + 1, arr[j], comps, swaps)
+                    j -= 1
+                else:
+                    break
+            arr[j + 1] = key
+            swaps += 1
+            yield (OP_WRITE, j + 1, key, comps, swaps)
+
+    def heapsort(lo, hi):
+        n = hi - lo + 1
+
+        def sift(root, end):
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    return
+                if child + 1 < end and less(lo + child, lo + child + 1):
+                    child += 1
+                yield (OP_COMPARE, lo + root, lo + child, comps, swaps)
+                if not less(lo + root, lo + child):
+                    return
+                yield swap(lo + root, lo + child)
+                root = child
+
+        for root in range(n // 2 - 1, -1, -1):
+            yield from sift(root, n)
+        for end in range(n - 1, 0, -1):
+            yield swap(lo, lo + end)
+            yield from sift(0, end)
+
+    n = len(arr)
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo + 1 <= cutoff:
+            yield from insertion(lo, hi)
+            continue
+        if depth == 0:
+            yield from heapsort(lo, hi)
+            continue
+        split = yield from partition(lo, hi)
+        balance = min(split - lo + 1, hi - split) * 1000 // (hi - lo + 1)
+        yield (OP_MARK, split, balance, comps, swaps)
+        # push the larger side first so the stack stays O(log n) deep
+        left, right = (lo, split, depth - 1), (split + 1, hi, depth - 1)
+        if split - lo < hi - split:
+            stack.extend((right, left))
+        else:
+            stack.extend((left, right))
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+def merge_sort_steps(arr):
+    comps = 0
+    swaps = 0  # count assignments into main array as swaps/assignments
+    # explicit stack of (l, r, halves_sorted) frames instead of recursive
+    # generators; a range is pushed back with halves_sorted=True to merge it
+    stack = [(0, len(arr) - 1, False)]
+    while stack:
+        l, r, halves_sorted = stack.pop()
+        if l >= r:
+            continue
+        m = (l + r) // 2
+        if not halves_sorted:
+            stack.append((l, r, True))
+            stack.append((m + 1, r, False))
+            stack.append((l, m, False))
+            continue
+        L = arr[l:m+1]
+        R = arr[m+1:r+1]
+        i = j = 0
+        k = l
+        while i < len(L) and j < len(R):
+            comps += 1
+            yield (OP_MARK, k, -1, comps, swaps)
+            if L[i] <= R[j]:
+                arr[k] = L[i]
+                i += 1
+                swaps += 1
+            else:
+                arr[k] = R[j]
+                j += 1
+                swaps += 1
+            yield (OP_WRITE, k, arr[k], comps, swaps)
+            k += 1
+        while i < len(L):
+            arr[k] = L[i]
+            i += 1
+            k += 1
+            swaps += 1
+            yield (OP_WRITE, k-1, arr[k-1], comps, swaps)
+        while j < len(R):
+            arr[k] = R[j]
+            j += 1
+            k += 1
+            swaps += 1
+            yield (OP_WRITE, k-1, arr[k-1], comps, swaps)
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+def bottom_up_merge_sort_steps(arr):
+    """Natural bottom-up merge sort with one preallocated buffer.
+
+    A first pass splits arr into ascending runs (reversing strictly
+    descending ones in place), then each pass merges neighbouring runs from
+    one of arr/buffer into the other. Steps describe the logical array, so
+    every merged element is an OP_WRITE at its output index whichever buffer
+    physically holds it; already sorted input costs n - 1 comparisons.
+    """
+    comps = 0
+    swaps = 0
+    n = len(arr)
+    bounds = [0]
+    i = 0
+    while i < n - 1:
+        # extend the run starting at i as far as it ascends (or strictly descends)
+        start = i
+        comps += 1
+        yield (OP_COMPARE, i, i + 1, comps, swaps)
+        descending = arr[i + 1] < arr[i]
+        i += 1
+        while i < n - 1:
+            comps += 1
+            yield (OP_COMPARE, i, i + 1, comps, swaps)
+            if (arr[i + 1] < arr[i]) != descending:
+                break
+            i += 1
+        if descending:
+            # strictly descending, so reversing it keeps the sort stable
+            lo, hi = start, i
+            while lo < hi:
+                arr[lo], arr[hi] = arr[hi], arr[lo]
+                swaps += 1
+                yield (OP_SWAP, lo, hi, comps, swaps)
+                lo += 1
+                hi -= 1
+        i += 1
+        bounds.append(i)
+    if bounds[-1] != n:
+        bounds.append(n)
+
+    src, dst = arr, [0] * n
+    while len(bounds) > 2:
+        merged = [0]
+        for r in range(0, len(bounds) - 1, 2):
+            lo = bounds[r]
+            mid = bounds[r + 1]
+            hi = bounds[r + 2] if r + 2 < len(bounds) else mid
+            i, j = lo, mid
+            for k in range(lo, hi):
+                if i < mid and j < hi:
+                    comps += 1
+                    yield (OP_MARK, k, -1, comps, swaps)
+                if j >= hi or (i < mid and src[i] <= src[j]):
+                    dst[k] = src[i]
+                    i += 1
+                else:
+                    dst[k] = src[j]
+                    j += 1
+                swaps += 1
+                yield (OP_WRITE, k, dst[k], comps, swaps)
+            merged.append(hi)
+        bounds = merged
+        src, dst = dst, src
+    if src is not arr:
+        # the last pass ended in the buffer; the displayed array already matches it
+        arr[:] = src
+        swaps += n
+    yield (OP_DONE, -1, -1, comps, swaps)
+
+
+# ---------------- Distribution (non-comparison) sorts ----------------
+# These never compare two elements, so their counters are
+# (bucket_writes, array_writes) instead of (comparisons, swaps), and the
+# OP_MARK step that reads an element into a bucket carries the pass number in b.
+
+def counting_sort_steps(arr):
+    writes = 0    # increments of the count table
+    assigns = 0   # values written back into arr
+    if arr:
+        lo = min(arr)
+        counts = [0] * (max(arr) - lo + 1)
+        for i, v in enumerate(arr):
+            counts[v - lo] += 1
+            writes += 1
+            yield (OP_MARK, i, 0, writes, assigns)
+        k = 0
+        for offset, c in enumerate(counts):
+            for _ in range(c):
+                arr[k] = offset + lo
+                assigns += 1
+                yield (OP_WRITE, k, offset + lo, writes, assigns)
+                k += 1
+    yield (OP_DONE, -1, -1, writes, assigns)
+
+
+def lsd_radix_sort_steps(arr, base=10):
+    writes = 0
+    assigns = 0
+    if arr:
+        lo = min(arr)
+        span = max(arr) - lo
+        exp = 1
+        p = 0
+        while True:
+            # stable distribution on one digit, least significant first
+            buckets = [[] for _ in range(base)]
+            for i, v in enumerate(arr):
+                buckets[(v - lo) // exp % base].append(v)
+                writes += 1
+                yield (OP_MARK, i, p, writes, assigns)
+            k = 0
+            for bucket in buckets:
+                for v in bucket:
+                    arr[k] = v
+                    assigns += 1
+                    yield (OP_WRITE, k, v, writes, assigns)
+                    k += 1
+            exp *= base
+            p += 1
+            if exp > span:
+                break
+    yield (OP_DONE, -1, -1, writes, assigns)
+
+
+def msd_radix_sort_steps(arr, base=10):
+    writes = 0
+    assigns = 0
+    if len(arr) > 1:
+        lo = min(arr)
+        span = max(arr) - lo
+        exp = 1
+        while exp * base <= span:
+            exp *= base
+        # explicit stack of (start, end, digit, depth) segments still to split
+        stack = [(0, len(arr), exp, 0)]
+        while stack:
+            start, end, exp, depth = stack.pop()
+            buckets = [[] for _ in range(base)]
+            for i in range(start, end):
+                v = arr[i]
+                buckets[(v - lo) // exp % base].append(v)
+                writes += 1
+                yield (OP_MARK, i, depth, writes, assigns)
+            k = start
+            segments = []
+            for bucket in buckets:
+                for v in bucket:
+                    arr[k] = v
+                    assigns += 1
+                    yield (OP_WRITE, k, v, writes, assigns)
+                    k += 1
+                if len(bucket) > 1 and exp > 1:
+                    segments.append((k - len(bucket), k, exp // base, depth + 1))
+            # pushed in reverse so the lowest bucket is refined first
+            stack.extend(reversed(segments))
+    yield (OP_DONE, -1, -1, writes, assigns)
+
+
+def bucket_sort_steps(arr):
+    writes = 0
+    assigns = 0
+    n = len(arr)
+    if n:
+        lo = min(arr)
+        span = max(arr) - lo + 1
+        # n equal-width buckets, each kept sorted as elements arrive
+        buckets = [[] for _ in range(n)]
+        for i, v in enumerate(arr):
+            bisect.insort(buckets[(v - lo) * n // span], v)
+            writes += 1
+            yield (OP_MARK, i, 0, writes, assigns)
+        k = 0
+        for bucket in buckets:
+            for v in bucket:
+                arr[k] = v
+                assigns += 1
+                yield (OP_WRITE, k, v, writes, assigns)
+                k += 1
+    yield (OP_DONE, -1, -1, writes, assigns)
+
+
+def _radix_digits(data, base=10):
+    span = max(data) - min(data) if data else 0
+    digits = 1
+    while base ** digits <= span:
+        digits += 1
+    return digits
+
+
+# Peak auxiliary storage, in array elements, as a function of the input
+_AUX_CELLS = {
+    "Merge Sort": lambda data: len(data),
+    "Merge Sort (Bottom-up)": lambda data: len(data),
+    "Counting Sort": lambda data: max(data) - min(data) + 1 if data else 0,
+    "LSD Radix Sort": lambda data: len(data) + 10,
+    "MSD Radix Sort": lambda data: len(data) + 10 * _radix_digits(data),
+    "Bucket Sort": lambda data: 2 * len(data),
+}
+
+
+def aux_cells(name, data):
+    """Peak auxiliary storage (in elements) the named sort needs for data; 0 if in place."""
+    return _AUX_CELLS[name](data) if name in _AUX_CELLS else 0
+
+
+def counter_labels(name):
+    """Display names of the two counters a sort's steps carry."""
+    if name in DISTRIBUTION_SORTS:
+        return ("Bucket writes", "Array writes")
+    return ("Comparisons", "Swaps/Assignments")
+
+
+# Sorts that take n² steps in the average and worst case (used to cap benchmark sizes)
+QUADRATIC_SORTS = {"Bubble Sort", "Selection Sort", "Insertion Sort"}
+
+# Sorts that count bucket writes instead of comparisons (see counter_labels)
+DISTRIBUTION_SORTS = {"Counting Sort", "LSD Radix Sort", "MSD Radix Sort", "Bucket Sort"}
+
+# Display name -> step generator, in the order the visualizer lists them
+SORTING_ALGORITHMS = {
+    "Bubble Sort": bubble_sort_steps,
+    "Selection Sort": selection_sort_steps,
+    "Insertion Sort": insertion_sort_steps,
+    "Quick Sort": quick_sort_steps,
+    "Merge Sort": merge_sort_steps,
+    "Merge Sort (Bottom-up)": bottom_up_merge_sort_steps,
+    "Introsort": intro_sort_steps,
+    "Counting Sort": counting_sort_steps,
+    "LSD Radix Sort": lsd_radix_sort_steps,
+    "MSD Radix Sort": msd_radix_sort_steps,
+    "Bucket Sort": bucket_sort_steps,
+}
@@ -0,0 +1,63 @@
+"""Keyframe index over a recorded sorting trace for seeking and reverse play."""
+from array import array
+
+from .trace import apply_step, step_highlight
+
+
+# Bounds on the default keyframe interval, in steps. Every seek replays at
+# most KEYFRAME_MAX_INTERVAL deltas in Python whatever the array size.
+KEYFRAME_MIN_INTERVAL = 4096
+KEYFRAME_MAX_INTERVAL = 1 << 16
+
+
+class Timeline:
+    """Seekable view of a trace recorded from a known initial array.
+
+    A full copy of the array is kept every `interval` steps; seek(k) starts
+    from the nearest keyframe at or before k and replays at most `interval`
+    deltas. Keyframes are taken by the player through record() and, for
+    positions it never reached, the first time a seek passes them. The default
+    interval is n // 4 clamped to KEYFRAME_MIN_INTERVAL .. KEYFRAME_MAX_INTERVAL
+    steps: int64 keyframes then cost about 32 bytes per step on small and
+    medium arrays, and seeks stay fast on large ones at the price of more
+    keyframe memory.
+    """
+
+    def __init__(self, initial, trace, interval=None):
+        self.trace = trace
+        self.interval = interval or min(KEYFRAME_MAX_INTERVAL, max(KEYFRAME_MIN_INTERVAL, len(initial) // 4))
+        self.keyframes = [array("q", initial)]
+
+    @property
+    def next_keyframe(self):
+        """Position at which record() should be called next."""
+        return len(self.keyframes) * self.interval
+
+    def record(self, position, data):
+        """Store data as the keyframe for position if it is the next one due."""
+        if position == self.next_keyframe:
+            self.keyframes.append(array("q", data))
+
+    def __len__(self):
+        return len(self.trace)
+
+    def seek(self, position):
+        """Return (array, highlight, comparisons, swaps) after `position` steps."""
+        position = max(0, min(position, len(self.trace)))
+        k = min(position // self.interval, len(self.keyframes) - 1)
+        data = self.keyframes[k].tolist()
+        at = k * self.interval
+        if at < position:
+            for step in self.trace.iter_from(at):
+                apply_step(data, step)
+                at += 1
+                self.record(at, data)
+                if at == position:
+                    break
+        if position == 0:
+            return data, [], 0, 0
+        last = self.trace[position - 1]
+        return data, step_highlight(last), last[3], last[4]
+
+    def nbytes(self):
+        return sum(len(frame) * frame.itemsize for frame in self.keyframes)
@@ -0,0 +1,99 @@
+"""Step traces shared by the algorithm engine and the visualizers."""
+from collections import deque
+
+# Step opcodes. A step is (op, a, b, comparisons_so_far, swaps_so_far):
+#   OP_COMPARE  a, b = indices being compared
+#   OP_SWAP     a, b = indices exchanged
+#   OP_WRITE    a = index, b = value written there
+#   OP_MARK     a = index highlighted without changing the array; distribution
+#               sorts put the pass number in b and Introsort the partition
+#               balance (otherwise -1)
+#   OP_DONE     final step, nothing highlighted
+# Search steps are (op, index, probes_so_far, low, high), where [low, high]
+# is the window still holding candidates (low > high once it is empty, and
+# -1, -1 if the candidates are not a contiguous range):
+#   OP_PROBE    index = element being checked
+#   OP_FOUND    index = element equal to the target
+#   OP_DONE     search finished without finding the target (index = -1)
+OP_COMPARE = 0
+OP_SWAP = 1
+OP_WRITE = 2
+OP_MARK = 3
+OP_DONE = 4
+OP_PROBE = 5
+OP_FOUND = 6
+
+# Version of the steps the algorithms emit, keyed into cached traces (see
+# engine.tracefile.cache_path). Bump it whenever a generator changes which
+# steps it yields, so traces cached by older code are regenerated.
+STEPS_VERSION = 2
+
+
+def apply_step(arr, step):
+    """Apply one delta step to arr in place and return the indices to highlight."""
+    op, a, b = step[0], step[1], step[2]
+    if op == OP_SWAP:
+        arr[a], arr[b] = arr[b], arr[a]
+        return [a, b]
+    if op == OP_WRITE:
+        arr[a] = b
+        return [a]
+    if op == OP_COMPARE:
+        return [a, b]
+    if op == OP_MARK:
+        return [a]
+    return []
+
+
+def step_highlight(step):
+    """Return the indices a step highlights, without applying it."""
+    op, a, b = step[0], step[1], step[2]
+    if op == OP_SWAP or op == OP_COMPARE:
+        return [a, b]
+    if op == OP_WRITE or op == OP_MARK:
+        return [a]
+    return []
+
+
+class StepStream:
+    """Pulls steps lazily from a step generator through a small lookahead buffer.
+
+    If a trace (e.g. a TraceBuffer) is given, every step pulled from the
+    generator is also appended to it.
+    """
+
+    def __init__(self, generator, lookahead=64, trace=None):
+        self.generator = generator
+        self.lookahead = lookahead
+        self.trace = trace
+        self.buffer = deque()
+        self.exhausted = False
+
+    def _fill(self):
+        while not self.exhausted and len(self.buffer) < self.lookahead:
+            try:
+                step = next(self.generator)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.buffer.append(step)
+            if self.trace is not None:
+                self.trace.append(step)
+
+    def next_step(self):
+        """Return the next step, or None once the generator is finished."""
+        if not self.buffer:
+            self._fill()
+        if not self.buffer:
+            return None
+        return self.buffer.popleft()
+
+    @property
+    def finished(self):
+        return self.exhausted and not self.buffer
+
+    def close(self):
+        if hasattr(self.generator, "close"):
+            self.generator.close()
+        self.exhausted = True
+        self.buffer.clear()
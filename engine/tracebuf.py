@@ -0,0 +1,156 @@
+"""Columnar, fixed-width storage for long step traces.
+
+Steps are kept as one NumPy array per column in fixed-size chunks instead of
+a Python list of tuples. Once the in-memory chunks exceed max_memory_bytes,
+further chunks are written to a temporary file and read back through
+np.memmap, so traces with tens of millions of steps fit in RAM or on disk.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+# (op, a, b, comparisons, swaps); for OP_WRITE, b holds the value written
+SORT_COLUMNS = (
+    ("op", np.uint8),
+    ("a", np.int32),
+    ("b", np.int32),
+    ("comps", np.int64),
+    ("swaps", np.int64),
+)
+
+# (op, index, probes, low, high)
+SEARCH_COLUMNS = (
+    ("op", np.uint8),
+    ("index", np.int32),
+    ("probes", np.int64),
+    ("low", np.int32),
+    ("high", np.int32),
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_MAX_MEMORY = int(os.environ.get("ALGOQUEST_TRACE_MEMORY_MB", "256")) << 20
+
+
+class TraceBuffer:
+    """Append-only step trace with list-like len() and indexing.
+
+    Appended steps are collected in a small pending list and converted to
+    NumPy columns one chunk at a time, so append() stays cheap.
+    """
+
+    def __init__(self, columns=SORT_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY, spill_dir=None):
+        self.columns = tuple(columns)
+        self.chunk_size = chunk_size
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self.row_bytes = sum(np.dtype(dt).itemsize for _, dt in self.columns)
+        self.chunks = []          # list of tuples of column arrays
+        self.pending = []
+        self.memory_bytes = 0
+        self.spill_path = None
+        self._spill_file = None
+
+    def __len__(self):
+        return len(self.chunks) * self.chunk_size + len(self.pending)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        c, j = divmod(i, self.chunk_size)
+        if c < len(self.chunks):
+            return tuple(col[j].item() for col in self.chunks[c])
+        if 0 <= j < len(self.pending) and c == len(self.chunks):
+            return self.pending[j]
+        raise IndexError("trace index out of range")
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def spilled(self):
+        return self.spill_path is not None
+
+    def append(self, step):
+        self.pending.append(step)
+        if len(self.pending) == self.chunk_size:
+            self._flush()
+
+    def extend(self, steps):
+        for step in steps:
+            self.append(step)
+
+    def iter_from(self, start):
+        """Yield steps as tuples of Python ints, starting at index start."""
+        c, j = divmod(start, self.chunk_size)
+        for chunk in self.chunks[c:]:
+            yield from zip(*(col[j:].tolist() for col in chunk))
+            j = 0
+        if c <= len(self.chunks):
+            yield from self.pending[j if c == len(self.chunks) else 0:]
+
+    def iter_chunks(self):
+        """Yield the trace as lists of column arrays, one list per chunk."""
+        for chunk in self.chunks:
+            yield list(chunk)
+        if self.pending:
+            values = list(zip(*self.pending))
+            yield [np.array(values[k], dtype=dt) for k, (_, dt) in enumerate(self.columns)]
+
+    def column(self, name):
+        """Return one column of the whole trace as a single array."""
+        k = [n for n, _ in self.columns].index(name)
+        parts = [chunk[k] for chunk in self.chunks]
+        if self.pending:
+            parts.append(np.array([step[k] for step in self.pending], dtype=self.columns[k][1]))
+        if not parts:
+            return np.empty(0, dtype=self.columns[k][1])
+        return np.concatenate(parts)
+
+    def nbytes(self):
+        """Bytes used by the stored columns, in memory and on disk."""
+        return len(self) * self.row_bytes
+
+    def close(self):
+        """Drop the stored steps and delete the spill file, if any."""
+        self.chunks = []
+        self.pending = []
+        self.memory_bytes = 0
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+    def _flush(self):
+        values = list(zip(*self.pending))
+        arrays = [np.array(values[k], dtype=dt) for k, (_, dt) in enumerate(self.columns)]
+        chunk_bytes = sum(arr.nbytes for arr in arrays)
+        if self.memory_bytes + chunk_bytes > self.max_memory_bytes:
+            arrays = self._spill(arrays)
+        else:
+            self.memory_bytes += chunk_bytes
+        self.chunks.append(tuple(arrays))
+        self.pending = []
+
+    def _spill(self, arrays):
+        if self._spill_file is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="algoquest-trace-", suffix=".bin",
+                                                   dir=self.spill_dir)
+            self._spill_file = os.fdopen(fd, "wb")
+        mapped = []
+        for arr in arrays:
+            offset = self._spill_file.tell()
+            self._spill_file.write(arr.tobytes())
+            mapped.append((offset, arr.dtype, len(arr)))
+        self._spill_file.flush()
+        return [np.memmap(self.spill_path, dtype=dt, mode="r", offset=off, shape=(n,))
+                for off, dt, n in mapped]
@@ -0,0 +1,304 @@
+"""Versioned binary trace files for export, import and instant replay.
+
+Layout (all integers little-endian):
+
+    preamble   8s magic "AQTRACE\\0", u16 version, u16 reserved, u32 header length
+    header     UTF-8 JSON: kind, algorithm, options, target, columns, input length
+    input      int64[input length], the array the trace starts from
+    chunks     repeated: 4s "CHNK", u32 rows, u32 flags, u64 payload bytes, payload
+               payload = each column's rows back to back, zlib-compressed if flags & 1
+    footer     4s "FOOT", u32 0, u32 0, u64 length, UTF-8 JSON (steps, counters)
+    u64        offset of the footer record
+
+Uncompressed chunks are read as NumPy views straight from an mmap of the file,
+so replaying a saved trace copies nothing up front.
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from .trace import STEPS_VERSION
+
+MAGIC = b"AQTRACE\0"
+VERSION = 1
+EXTENSION = ".aqt"
+COMPRESSED_EXTENSION = ".aqtz"
+
+_PREAMBLE = struct.Struct("<8sHHI")
+_RECORD = struct.Struct("<4sIIQ")
+_OFFSET = struct.Struct("<Q")
+_COMPRESSED = 1
+
+# Traces at least this long are cached on disk after a run (see cache_path)
+CACHE_MIN_STEPS = 100000
+CACHE_DIR = os.environ.get(
+    "ALGOQUEST_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "algoquest", "traces"))
+# Total size the cache is pruned back to, least recently used first (see prune_cache)
+CACHE_MAX_BYTES = int(os.environ.get("ALGOQUEST_CACHE_MAX_BYTES", 2 << 30))
+
+
+class TraceFileError(ValueError):
+    """Raised when a file is not a readable trace file."""
+
+
+class TraceWriter:
+    """Writes a trace file chunk by chunk as steps are produced.
+
+    Data goes to path + ".part" and is renamed into place by close(), so a
+    half-written trace is never picked up by a reader. With a budget (in
+    bytes), close() then prunes the file's directory back to that size.
+    """
+
+    def __init__(self, path, kind, algorithm, data, columns, target=None, options=None,
+                 compress=None, chunk_size=1 << 16, budget=None):
+        self.path = path
+        self.budget = budget
+        self.columns = tuple(columns)
+        self.compress = path.endswith(COMPRESSED_EXTENSION) if compress is None else compress
+        self.chunk_size = chunk_size
+        self.pending = []
+        self.steps = 0
+        self.last = None
+        data = np.asarray(data, dtype=np.int64)
+        header = json.dumps({
+            "kind": kind,
+            "algorithm": algorithm,
+            "options": options or {},
+            "target": target,
+            "columns": [[name, np.dtype(dt).str] for name, dt in self.columns],
+            "input_length": len(data),
+        }).encode("utf-8")
+        self.file = open(path + ".part", "wb")
+        self.file.write(_PREAMBLE.pack(MAGIC, VERSION, 0, len(header)))
+        self.file.write(header)
+        self.file.write(data.tobytes())
+
+    def append(self, step):
+        self.pending.append(step)
+        if len(self.pending) == self.chunk_size:
+            self._flush()
+
+    def write_columns(self, arrays):
+        """Write one chunk given as one array per column."""
+        self._flush()
+        arrays = [np.asarray(arr, dtype=dt) for arr, (_, dt) in zip(arrays, self.columns)]
+        rows = len(arrays[0])
+        if rows == 0:
+            return
+        payload = b"".join(arr.tobytes() for arr in arrays)
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+            flags |= _COMPRESSED
+        self.file.write(_RECORD.pack(b"CHNK", rows, flags, len(payload)))
+        self.file.write(payload)
+        self.steps += rows
+        self.last = tuple(arr[-1].item() for arr in arrays)
+
+    def close(self, counters=None):
+        self._flush()
+        footer = json.dumps({"steps": self.steps, "counters": counters or {}}).encode("utf-8")
+        offset = self.file.tell()
+        self.file.write(_RECORD.pack(b"FOOT", 0, 0, len(footer)))
+        self.file.write(footer)
+        self.file.write(_OFFSET.pack(offset))
+        self.file.close()
+        os.replace(self.path + ".part", self.path)
+        if self.budget is not None:
+            prune_cache(self.budget, os.path.dirname(self.path), keep=self.path)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.path + ".part")
+
+    def _flush(self):
+        if self.pending:
+            pending, self.pending = self.pending, []
+            self.write_columns(list(zip(*pending)))
+
+
+def save_trace(path, trace, kind, algorithm, data, target=None, options=None, counters=None,
+               compress=None):
+    """Write a recorded TraceBuffer (or another TraceFile) to path, chunk by chunk."""
+    writer = TraceWriter(path, kind, algorithm, data, trace.columns, target=target,
+                         options=options, compress=compress)
+    try:
+        for arrays in trace.iter_chunks():
+            writer.write_columns(arrays)
+        writer.close(counters)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+class TraceFile:
+    """Read-only, memory-mapped trace file with the same reading interface as
+    TraceBuffer (len, indexing, iter_from, column)."""
+
+    spilled = True   # the steps live on disk
+
+    def __init__(self, path):
+        self.path = path
+        # mmap refuses empty files with a plain ValueError
+        if os.path.getsize(path) < _PREAMBLE.size:
+            raise TraceFileError(f"{path}: not a valid trace file (too short)")
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (struct.error, ValueError, KeyError) as e:
+            self.close()
+            raise TraceFileError(f"{path}: not a valid trace file ({e})")
+        self._cached = (None, None)
+
+    def _parse(self):
+        mm = self.mm
+        magic, version, _, header_len = _PREAMBLE.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("bad magic")
+        if version > VERSION:
+            raise ValueError(f"unsupported version {version}")
+        pos = _PREAMBLE.size
+        self.header = json.loads(bytes(mm[pos:pos + header_len]).decode("utf-8"))
+        pos += header_len
+        self.kind = self.header["kind"]
+        self.algorithm = self.header["algorithm"]
+        self.options = self.header["options"]
+        self.target = self.header["target"]
+        self.columns = tuple((name, np.dtype(dt)) for name, dt in self.header["columns"])
+        self.row_bytes = sum(dt.itemsize for _, dt in self.columns)
+        n = self.header["input_length"]
+        self.input = np.frombuffer(mm, dtype=np.int64, count=n, offset=pos)
+        pos += n * 8
+
+        (footer_at,) = _OFFSET.unpack_from(mm, len(mm) - _OFFSET.size)
+        tag, _, _, footer_len = _RECORD.unpack_from(mm, footer_at)
+        if tag != b"FOOT":
+            raise ValueError("missing footer")
+        start = footer_at + _RECORD.size
+        self.footer = json.loads(bytes(mm[start:start + footer_len]).decode("utf-8"))
+        self.counters = self.footer["counters"]
+
+        self.index = []     # (payload offset, rows, flags, payload bytes)
+        self.starts = []    # first step number of each chunk
+        total = 0
+        while pos < footer_at:
+            tag, rows, flags, nbytes = _RECORD.unpack_from(mm, pos)
+            if tag != b"CHNK":
+                raise ValueError(f"bad chunk tag at offset {pos}")
+            self.index.append((pos + _RECORD.size, rows, flags, nbytes))
+            self.starts.append(total)
+            total += rows
+            pos += _RECORD.size + nbytes
+        self.steps = total
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.steps
+        if not 0 <= i < self.steps:
+            raise IndexError("trace index out of range")
+        c = bisect.bisect_right(self.starts, i) - 1
+        return tuple(col[i - self.starts[c]].item() for col in self._chunk(c))
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, start):
+        if start >= self.steps:
+            return
+        c = bisect.bisect_right(self.starts, start) - 1
+        j = start - self.starts[c]
+        for k in range(c, len(self.index)):
+            yield from zip(*(col[j:].tolist() for col in self._chunk(k)))
+            j = 0
+
+    def iter_chunks(self):
+        for c in range(len(self.index)):
+            yield self._chunk(c)
+
+    def column(self, name):
+        k = [n for n, _ in self.columns].index(name)
+        parts = [self._chunk(c)[k] for c in range(len(self.index))]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=self.columns[k][1])
+
+    def nbytes(self):
+        return self.steps * self.row_bytes
+
+    def close(self):
+        self._cached = (None, None)
+        self.input = None
+        try:
+            self.mm.close()
+        except BufferError:
+            pass   # views handed out are still alive; the map closes with them
+
+    def _chunk(self, c):
+        if self._cached[0] == c:
+            return self._cached[1]
+        offset, rows, flags, nbytes = self.index[c]
+        if flags & _COMPRESSED:
+            buffer = zlib.decompress(self.mm[offset:offset + nbytes])
+            offset = 0
+        else:
+            buffer = self.mm
+        arrays = []
+        for _, dt in self.columns:
+            arrays.append(np.frombuffer(buffer, dtype=dt, count=rows, offset=offset))
+            offset += rows * dt.itemsize
+        self._cached = (c, arrays)
+        return arrays
+
+
+def cache_path(kind, algorithm, data, target=None, options=None):
+    """Path in CACHE_DIR under which the trace for these inputs is cached.
+
+    The file format and step versions are part of the key, so traces written
+    by older code are never replayed.
+    """
+    digest = hashlib.sha1()
+    key = [VERSION, STEPS_VERSION, kind, algorithm, target, options or {}]
+    digest.update(json.dumps(key, sort_keys=True).encode("utf-8"))
+    digest.update(np.asarray(data, dtype=np.int64).tobytes())
+    return os.path.join(CACHE_DIR, digest.hexdigest() + EXTENSION)
+
+
+def prune_cache(budget=None, directory=None, keep=None):
+    """Delete the least recently used trace files in directory until the rest fit in budget bytes.
+
+    Recency is the file's mtime, which a cache hit refreshes with os.utime.
+    keep (a path) is never deleted; files still being written (".part") are
+    ignored. Returns the paths removed.
+    """
+    budget = CACHE_MAX_BYTES if budget is None else budget
+    directory = CACHE_DIR if directory is None else directory
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith((EXTENSION, COMPRESSED_EXTENSION)):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort(reverse=True)
+    keep = keep and os.path.abspath(keep)
+    total = sum(size for _, size, path in entries if os.path.abspath(path) == keep)
+    removed = []
+    for _, size, path in entries:
+        if os.path.abspath(path) == keep:
+            continue
+        total += size
+        if total > budget:
+            # this and every older file go
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                pass   # already gone, or held open elsewhere
+    return removed
@@ -0,0 +1,242 @@
+"""Trace generation in a worker process, streamed through shared memory.
+
+The worker runs a step generator and writes fixed-width int64 records into a
+multiprocessing.shared_memory ring buffer. The GUI side reads them through
+BackgroundStream, which has the same next_step()/finished/close() interface
+as StepStream, so playback can start as soon as the first chunk arrives.
+"""
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import time
+from collections import deque
+
+import numpy as np
+
+from .sorting import SORTING_ALGORITHMS
+from .searching import SEARCH_ALGORITHMS
+
+# Header slots (int64) at the start of the shared block
+_WRITTEN, _READ, _STATE, _CANCEL = range(4)
+_HEADER_SLOTS = 8
+_ERROR_BYTES = 256
+
+RUNNING, DONE, FAILED, CANCELLED = range(4)
+
+_ALGORITHMS = {"sort": SORTING_ALGORITHMS, "search": SEARCH_ALGORITHMS}
+
+# NumPy arguments at least this large go to the worker through shared memory
+# instead of being pickled into the spawn pipe
+SHARE_MIN_BYTES = 1 << 20
+
+# Rows converted to step tuples per refill, so one next_step() call never
+# stalls a frame converting a whole ring's worth of steps
+FILL_ROWS = 4096
+
+
+class _SharedArray:
+    """Picklable handle to an ndarray copied into its own shared memory block."""
+
+    def __init__(self, shm, dtype, shape):
+        self.name = shm.name
+        self.dtype = dtype.str
+        self.shape = shape
+
+    def attach(self):
+        shm = shared_memory.SharedMemory(name=self.name)
+        return shm, np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+
+def share_arg(arg, blocks):
+    """Copy a large ndarray into shared memory and return its handle (else arg).
+
+    The new block is appended to blocks; the caller closes and unlinks it.
+    """
+    if not isinstance(arg, np.ndarray) or arg.nbytes < SHARE_MIN_BYTES:
+        return arg
+    block = shared_memory.SharedMemory(create=True, size=arg.nbytes)
+    np.ndarray(arg.shape, dtype=arg.dtype, buffer=block.buf)[...] = arg
+    blocks.append(block)
+    return _SharedArray(block, arg.dtype, arg.shape)
+
+
+def attach_args(args, attached):
+    """Worker side of share_arg: resolve handles, appending their blocks to attached."""
+    resolved = []
+    for arg in args:
+        if isinstance(arg, _SharedArray):
+            block, arg = arg.attach()
+            attached.append(block)
+        resolved.append(arg)
+    return resolved
+
+
+def release_blocks(attached):
+    for block in attached:
+        try:
+            block.close()
+        except BufferError:
+            pass   # a view is still alive; the parent unlinks the block anyway
+
+
+def _views(shm, capacity, width):
+    header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+    error = shm.buf[_HEADER_SLOTS * 8:_HEADER_SLOTS * 8 + _ERROR_BYTES]
+    offset = _HEADER_SLOTS * 8 + _ERROR_BYTES
+    ring = np.ndarray((capacity, width), dtype=np.int64, buffer=shm.buf, offset=offset)
+    return header, error, ring
+
+
+def _produce(shm_name, capacity, width, kind, name, args, kwargs, chunk):
+    """Worker entry point: run the generator and fill the ring buffer."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, error, ring = _views(shm, capacity, width)
+    attached = []
+    try:
+        resolved = attach_args(args, attached)
+        generator = _ALGORITHMS[kind][name](*resolved, **kwargs)
+        batch = []
+        for step in generator:
+            batch.append(step)
+            if len(batch) == chunk:
+                if not _publish(header, ring, capacity, batch):
+                    return
+                batch = []
+        if batch and not _publish(header, ring, capacity, batch):
+            return
+        header[_STATE] = DONE
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}".encode("utf-8", "replace")[:_ERROR_BYTES]
+        error[:len(message)] = message
+        header[_STATE] = FAILED
+    finally:
+        del header, error, ring
+        resolved = generator = None   # drop the views before closing their blocks
+        release_blocks(attached)
+        shm.close()
+
+
+def _publish(header, ring, capacity, batch):
+    """Copy batch into the ring once there is room; False if cancelled."""
+    while header[_WRITTEN] - header[_READ] + len(batch) > capacity:
+        if header[_CANCEL]:
+            header[_STATE] = CANCELLED
+            return False
+        time.sleep(0.001)
+    if header[_CANCEL]:
+        header[_STATE] = CANCELLED
+        return False
+    rows = np.array(batch, dtype=np.int64)
+    start = int(header[_WRITTEN] % capacity)
+    first = min(len(rows), capacity - start)
+    ring[start:start + first] = rows[:first]
+    ring[:len(rows) - first] = rows[first:]
+    header[_WRITTEN] += len(rows)   # publish only after the rows are in place
+    return True
+
+
+class BackgroundStream:
+    """Steps produced by a worker process, read through a shared-memory ring.
+
+    kind is "sort" or "search"; name is a key of the matching algorithm
+    registry and args/kwargs are passed to the step generator in the worker.
+    width is the number of fields per step (5 for both sorting and searching steps).
+    Large ndarray args are copied once into shared memory rather than pickled.
+    """
+
+    RUNNING, DONE, FAILED, CANCELLED = RUNNING, DONE, FAILED, CANCELLED
+
+    def __init__(self, kind, name, args, kwargs=None, width=5, trace=None,
+                 capacity=1 << 16, chunk=4096):
+        self.width = width
+        self.capacity = capacity
+        self.trace = trace
+        self.buffer = deque()
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER_SLOTS * 8 + _ERROR_BYTES + capacity * width * 8)
+        self.header, self.error_view, self.ring = _views(self.shm, capacity, width)
+        self.header[:] = 0
+        self.shared_args = []
+        args = [share_arg(arg, self.shared_args) for arg in args]
+        context = mp.get_context("spawn")   # never fork a process that is running Qt
+        self.process = context.Process(
+            target=_produce,
+            args=(self.shm.name, capacity, width, kind, name, tuple(args), kwargs or {}, chunk),
+            daemon=True,
+        )
+        self.process.start()
+
+    @property
+    def produced(self):
+        """Steps generated by the worker so far (for progress display)."""
+        return int(self.header[_WRITTEN]) if self.header is not None else 0
+
+    @property
+    def state(self):
+        if self.header is None:
+            return CANCELLED
+        state = int(self.header[_STATE])
+        if state == RUNNING and not self.process.is_alive():
+            return FAILED
+        return state
+
+    @property
+    def error(self):
+        if self.header is None:
+            return ""
+        return bytes(self.error_view).rstrip(b"\0").decode("utf-8", "replace")
+
+    @property
+    def exhausted(self):
+        """True once the worker is done and every step has left the ring (some may still be buffered)."""
+        return self.header is not None and self.state == DONE and self.header[_READ] == self.header[_WRITTEN]
+
+    @property
+    def finished(self):
+        if self.buffer or self.header is None:
+            return self.header is None
+        return self.state != RUNNING and self.header[_READ] == self.header[_WRITTEN]
+
+    def _fill(self):
+        read = int(self.header[_READ])
+        available = int(self.header[_WRITTEN]) - read
+        if available <= 0:
+            return
+        start = read % self.capacity
+        count = min(available, self.capacity - start, FILL_ROWS)
+        steps = [tuple(row) for row in self.ring[start:start + count].tolist()]
+        self.header[_READ] = read + count
+        self.buffer.extend(steps)
+        if self.trace is not None:
+            self.trace.extend(steps)
+
+    def next_step(self):
+        """Return the next step, or None if none is available yet (see finished)."""
+        if not self.buffer and self.header is not None:
+            self._fill()
+        if not self.buffer:
+            return None
+        return self.buffer.popleft()
+
+    def close(self):
+        """Cancel the worker if it is still running and release the shared memory."""
+        if self.header is None:
+            return
+        self.header[_CANCEL] = 1
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.buffer.clear()
+        self.header = self.error_view = self.ring = None
+        self.shm.close()
+        self.shm.unlink()
+        for block in self.shared_args:
+            block.close()
+            block.unlink()
+        self.shared_args = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,71 @@
+"""Seeded input arrays in the shapes that make sorts and searches misbehave.
+
+Every generator builds the whole array with NumPy in one go, so even a
+million elements take milliseconds, and the same (distribution, n, seed)
+always yields the same array.
+"""
+import numpy as np
+
+DISTRIBUTIONS = (
+    "random", "sorted", "reversed", "nearly-sorted", "few-unique",
+    "organ-pipe", "sawtooth", "gaussian", "zipf",
+)
+
+
+def _uniform(rng, n, low, high):
+    return rng.integers(low, high + 1, size=n, dtype=np.int64)
+
+
+def _scaled(ramp, low, high):
+    """Map a float array in [0, 1] onto integers in [low, high]."""
+    return low + np.rint(ramp * (high - low)).astype(np.int64)
+
+
+def generate(distribution, n, seed=None, low=10, high=100, swaps=None, unique=5, teeth=8, zipf_a=1.5):
+    """Return an int64 array of n values in [low, high] with the given shape.
+
+    nearly-sorted applies `swaps` random transpositions to a sorted array
+    (default n // 100, at least one); few-unique draws from `unique` distinct
+    values; sawtooth repeats `teeth` ascending ramps; zipf is heavy-tailed
+    with exponent zipf_a, so most values sit at `low`.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution {distribution!r}; choose from {', '.join(DISTRIBUTIONS)}")
+    rng = np.random.default_rng(seed)
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if distribution == "random":
+        return _uniform(rng, n, low, high)
+    if distribution == "sorted":
+        return np.sort(_uniform(rng, n, low, high))
+    if distribution == "reversed":
+        return np.sort(_uniform(rng, n, low, high))[::-1].copy()
+    if distribution == "nearly-sorted":
+        arr = np.sort(_uniform(rng, n, low, high))
+        k = min(n // 2, max(1, n // 100) if swaps is None else swaps)
+        pos = rng.choice(n, size=2 * k, replace=False)
+        # disjoint pairs, so the k transpositions apply all at once
+        arr[pos[:k]], arr[pos[k:]] = arr[pos[k:]], arr[pos[:k]]
+        return arr
+    if distribution == "few-unique":
+        # sample offsets rather than np.arange(low, high + 1), which a wide range cannot afford
+        values = low + rng.choice(high - low + 1, size=min(unique, high - low + 1), replace=False)
+        return values[rng.integers(0, len(values), size=n)].astype(np.int64)
+    if distribution == "organ-pipe":
+        ramp = 1.0 - np.abs(np.linspace(-1.0, 1.0, n))
+        return _scaled(ramp, low, high)
+    if distribution == "sawtooth":
+        period = max(1, -(-n // teeth))
+        ramp = (np.arange(n) % period) / max(1, period - 1)
+        return _scaled(ramp, low, high)
+    if distribution == "gaussian":
+        values = rng.normal((low + high) / 2, (high - low) / 6, size=n)
+        return np.clip(np.rint(values), low, high).astype(np.int64)
+    # zipf: P(low + k - 1) is proportional to k ** -zipf_a
+    span = high - low + 1
+    if span > 1 << 20:
+        # too wide for a lookup table; the tail beyond the range is tiny, so clip it
+        return low + np.minimum(rng.zipf(zipf_a, size=n), span) - 1
+    cdf = np.cumsum(np.arange(1, span + 1, dtype=np.float64) ** -zipf_a)
+    return low + np.searchsorted(cdf, rng.random(n) * cdf[-1]).astype(np.int64)
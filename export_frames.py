@@ -0,0 +1,374 @@
+"""Headless export of a sorting or search run to an animated GIF or PNG frames.
+
+    python export_frames.py run.aqtz -o run.gif
+    python export_frames.py --sort "Quick Sort" --size 5000 --every 50 -o frames/
+
+The run comes from a saved trace file (Save Trace in either visualizer) or
+is generated here from an algorithm name and a workload. Frames are drawn
+offscreen straight into palette-indexed NumPy images, so no display, Qt or
+matplotlib is involved. The frames are split into chunks of consecutive
+steps, each handed the array as it stands at its first frame, and a process
+pool replays and renders the chunks in parallel. PNG frames are written by
+the workers themselves; GIF frames are streamed to the encoder in order.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import GifImagePlugin, Image, ImageDraw, ImageFont
+
+from engine import (
+    DISTRIBUTIONS, OP_FOUND, OP_PROBE, SEARCH_ALGORITHMS, SEARCH_COLUMNS, SORT_COLUMNS,
+    SORTING_ALGORITHMS, TraceBuffer, TraceFile, TraceFileError, apply_step,
+    column_envelope, counter_labels, generate, save_trace, search_input, step_highlight,
+)
+
+# Palette indices; frames are 8-bit images in this palette, which GIF and
+# PNG store as-is, so nothing has to be quantized
+PALETTE = [
+    (255, 255, 255),   # background
+    (100, 149, 237),   # sorting bar (as in the sorting view)
+    (127, 179, 255),   # search bar (as in the search view)
+    (176, 196, 222),   # min..max spread of a column wider than one element
+    (255, 99, 71),     # highlighted by the last step
+    (255, 165, 0),     # element being probed
+    (111, 224, 127),   # element found
+    (210, 210, 210),   # background behind elements the search has ruled out
+    (0, 0, 0),         # caption text
+]
+BACKGROUND, SORT_BAR, SEARCH_BAR, RANGE, HIGHLIGHT, PROBE, FOUND, ELIMINATED, TEXT = range(len(PALETTE))
+FLAT_PALETTE = [channel for color in PALETTE for channel in color]
+
+CAPTION_HEIGHT = 16
+# Chunks per worker, so a slow chunk (dense swaps, wide arrays) does not hold up the pool
+CHUNKS_PER_WORKER = 4
+# Most frames rendered by one job; bounds the frames held for the GIF encoder
+CHUNK_FRAMES = 100
+# How long the last GIF frame stays up before the animation loops
+HOLD_MS = 1500
+
+_font = None
+
+
+def caption_font():
+    # the bitmap font: the scalable default font takes longer to draw one
+    # caption than NumPy takes to draw the whole frame
+    global _font
+    if _font is None:
+        _font = ImageFont.load_default_imagefont()
+    return _font
+
+
+class FrameLayout:
+    """Pixel geometry shared by every frame of one export."""
+
+    def __init__(self, n, width, height, max_val):
+        self.n = max(n, 1)
+        self.width = width
+        self.height = height
+        self.plot_height = height - CAPTION_HEIGHT
+        self.max_val = max(int(max_val), 1)
+        self.columns = max(1, min(n, width))
+        x = np.arange(width)
+        self.column = x * self.columns // width          # element column under each pixel x
+        # leave a one-pixel gap after each bar once bars are wide enough to tell apart
+        self.gap = np.zeros(width, dtype=bool)
+        if width // self.columns >= 4:
+            self.gap = (x + 1) * self.columns // width != self.column
+        self.rows = np.arange(self.plot_height)[:, None]
+
+    def column_of(self, i):
+        return i * self.columns // self.n
+
+    def scale(self, values):
+        return np.clip(np.asarray(values, dtype=np.int64) * self.plot_height // self.max_val,
+                       0, self.plot_height)
+
+
+def palette_image(pixels):
+    """A "P" mode image in PALETTE over a 2-D uint8 array."""
+    image = Image.fromarray(np.ascontiguousarray(pixels))
+    image.putpalette(FLAT_PALETTE)
+    return image
+
+
+def render_frame(layout, data, bar, marks=(), window=None, caption=""):
+    """One frame as an 8-bit palette image.
+
+    marks are (index, palette color) pairs drawn over the bars; window is a
+    search's (low, high) candidate range, and columns wholly outside it get
+    a shaded background.
+    """
+    starts, mins, maxs = column_envelope(data, layout.columns)
+    color = np.full(layout.columns, bar, dtype=np.uint8)
+    for i, mark in marks:
+        if 0 <= i < layout.n:
+            color[layout.column_of(i)] = mark
+    background = np.full(layout.columns, BACKGROUND, dtype=np.uint8)
+    if window is not None and window != (-1, -1):
+        low, high = window
+        stops = np.append(starts[1:], layout.n)
+        background[(stops <= low) | (starts > high)] = ELIMINATED
+
+    # draw one pixel-wide strip per column, then widen the strips to the
+    # frame; a single-element column has min == max, so only columns
+    # summarizing several elements show the lighter min..max spread
+    depth = layout.rows
+    strips = np.where(depth >= layout.plot_height - layout.scale(maxs), np.uint8(RANGE), background)
+    strips = np.where(depth >= layout.plot_height - layout.scale(mins), color, strips)
+    pixels = strips[:, layout.column] if layout.columns < layout.width else strips
+    pixels[:, layout.gap] = background[layout.column][layout.gap]
+
+    image = np.full((layout.height, layout.width), BACKGROUND, dtype=np.uint8)
+    image[CAPTION_HEIGHT:] = pixels
+    image = palette_image(image)
+    if caption:
+        ImageDraw.Draw(image).text((4, 2), caption, fill=TEXT, font=caption_font())
+    return image
+
+
+def sort_caption(algorithm, position, total, step):
+    first, second = counter_labels(algorithm)
+    comparisons, swaps = (step[3], step[4]) if step is not None else (0, 0)
+    return f"{algorithm}   step {position:,}/{total:,}   {first}: {comparisons:,}   {second}: {swaps:,}"
+
+
+def search_frame_state(step):
+    """Marks, window and caption detail for the search state after step."""
+    if step is None:
+        return [], None, "probes: 0"
+    op, index, probes = step[0], step[1], step[2]
+    window = (step[3], step[4]) if len(step) > 4 else None   # traces from before the window columns
+    if op == OP_FOUND:
+        return [(index, FOUND)], window, f"probes: {probes:,}   found at {index:,}"
+    if op == OP_PROBE:
+        return [(index, PROBE)], window, f"probes: {probes:,}"
+    return [], window, f"probes: {probes:,}   not found"
+
+
+def render_chunk(job):
+    """Replay one chunk of the trace and render its frames.
+
+    Returns the frames as raw palette bytes, or the number of PNG files
+    written when job["out_dir"] is set.
+    """
+    trace = TraceFile(job["path"])
+    try:
+        layout = FrameLayout(len(trace.input), job["width"], job["height"], job["max_val"])
+        total = len(trace)
+        at = job["start"]
+        last = trace[at - 1] if at else None
+        if trace.kind == "sort":
+            data = job["state"].tolist()
+            steps = trace.iter_from(at)
+        else:
+            data = trace.input
+        frames = []
+        for number, position in job["frames"]:
+            if trace.kind == "sort":
+                while at < position:
+                    last = next(steps)
+                    apply_step(data, last)
+                    at += 1
+                marks = [(i, HIGHLIGHT) for i in step_highlight(last)] if last is not None else []
+                image = render_frame(layout, np.asarray(data), SORT_BAR, marks,
+                                     caption=sort_caption(trace.algorithm, position, total, last))
+            else:
+                last = trace[position - 1] if position else None
+                marks, window, detail = search_frame_state(last)
+                caption = f"{trace.algorithm}   target {trace.target}   step {position:,}/{total:,}   {detail}"
+                image = render_frame(layout, data, SEARCH_BAR, marks, window, caption)
+            if job["out_dir"]:
+                image.save(os.path.join(job["out_dir"], f"frame_{number:06d}.png"), compress_level=1)
+            else:
+                frames.append(image.tobytes())
+        return len(job["frames"]) if job["out_dir"] else frames
+    finally:
+        trace.close()
+
+
+def frame_positions(steps, every):
+    """Step counts to draw a frame after: 0, every, 2 * every, ... and always the last."""
+    positions = list(range(0, steps, every))
+    if not positions or positions[-1] != steps:
+        positions.append(steps)
+    return positions
+
+
+def plan_chunks(trace, positions, chunk_frames):
+    """Yield (first step, array there or None, [(frame number, position)]) per chunk.
+
+    Sort chunks get a copy of the array at their first frame. The trace is
+    replayed once here as the chunks are handed out, so only the chunks in
+    flight hold a copy, however long the run or wide the array.
+    """
+    numbered = list(enumerate(positions))
+    data = trace.input.tolist() if trace.kind == "sort" else None
+    steps = trace.iter_from(0)
+    at = 0
+    for k in range(0, len(numbered), chunk_frames):
+        frames = numbered[k:k + chunk_frames]
+        start = frames[0][1]
+        if data is None:
+            yield start, None, frames
+            continue
+        while at < start:
+            apply_step(data, next(steps))
+            at += 1
+        yield start, np.array(data, dtype=np.int64), frames
+
+
+def run_ordered(pool, jobs, ahead):
+    """Results of render_chunk over jobs, in order, with at most `ahead` jobs in flight."""
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(render_chunk, job))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def record_run(args, path):
+    """Run the requested algorithm on a generated workload and save its trace to path."""
+    kind = "sort" if args.sort else "search"
+    # values span 0..4n, as in benchmark.py, so bars are distinguishable and searches can miss
+    data = generate(args.distribution, args.size, args.seed, low=0, high=4 * args.size)
+    target = None
+    if kind == "sort":
+        algorithm = args.sort
+        trace = TraceBuffer(SORT_COLUMNS)
+        trace.extend(SORTING_ALGORITHMS[algorithm](data.tolist()))
+    else:
+        algorithm = args.search
+        data = np.asarray(search_input(algorithm, data))
+        target = args.target
+        if target is None:
+            target = int(data[np.random.default_rng(args.seed).integers(len(data))]) if len(data) else 0
+        trace = TraceBuffer(SEARCH_COLUMNS)
+        trace.extend(SEARCH_ALGORITHMS[algorithm](data, target))
+    try:
+        save_trace(path, trace, kind, algorithm, data, target=target)
+    finally:
+        trace.close()
+
+
+def write_gif(path, results, count, width, height, fps):
+    """Encode frames into an animated GIF one at a time, as they arrive.
+
+    Image.save(save_all=True) holds every frame until the end, which a long
+    export cannot afford. After the first, each frame is stored as just the
+    rectangle that changed since the previous one.
+    """
+    duration = max(20, round(1000 / fps))
+    previous = None
+    written = 0
+    with open(path, "wb") as fp:
+        for frames in results:
+            for raw in frames:
+                pixels = np.frombuffer(raw, dtype=np.uint8).reshape(height, width)
+                written += 1
+                if previous is None:
+                    header, _ = GifImagePlugin.getheader(palette_image(pixels), info={"loop": 0, "optimize": False})
+                    fp.writelines(header)
+                    x0, y0, x1, y1 = 0, 0, width, height
+                else:
+                    changed = pixels != previous
+                    rows = np.flatnonzero(changed.any(axis=1))
+                    cols = np.flatnonzero(changed.any(axis=0))
+                    # an unchanged frame still needs one pixel to carry its delay
+                    x0, y0, x1, y1 = (cols[0], rows[0], cols[-1] + 1, rows[-1] + 1) if len(rows) else (0, 0, 1, 1)
+                previous = pixels
+                frame = palette_image(pixels[y0:y1, x0:x1])
+                fp.writelines(GifImagePlugin.getdata(frame, offset=(int(x0), int(y0)),
+                                                     duration=HOLD_MS if written == count else duration))
+        fp.write(b";")
+
+
+def export(args, path):
+    out_dir = None if args.output.lower().endswith(".gif") else args.output
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    trace = TraceFile(path)
+    try:
+        every = args.every or max(1, -(-len(trace) // args.frames))
+        positions = frame_positions(len(trace), every)
+        max_val = trace.input.max() if len(trace.input) else 1
+        # enough chunks to keep every worker busy, but never so many frames
+        # in one chunk that the GIF frames waiting to be encoded pile up
+        chunk_frames = max(1, min(CHUNK_FRAMES, -(-len(positions) // (args.workers * CHUNKS_PER_WORKER))))
+        chunks = -(-len(positions) // chunk_frames)
+        jobs = ({"path": path, "start": start, "state": state, "frames": frames, "out_dir": out_dir,
+                 "width": args.width, "height": args.height, "max_val": max_val}
+                for start, state, frames in plan_chunks(trace, positions, chunk_frames))
+
+        def progress(results):
+            for done, result in enumerate(results, 1):
+                print(f"\r{done}/{chunks} chunks", end="", file=sys.stderr)
+                yield result
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = progress(run_ordered(pool, jobs, 2 * args.workers))
+            if out_dir:
+                for _ in results:
+                    pass
+            else:
+                write_gif(args.output, results, len(positions), args.width, args.height, args.fps)
+    finally:
+        trace.close()
+    print(f"\rwrote {len(positions)} frames (every {every} steps) to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", nargs="?", help=".aqt/.aqtz trace file saved by a visualizer")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--sort", choices=SORTING_ALGORITHMS, help="generate a run of this sort instead")
+    source.add_argument("--search", choices=SEARCH_ALGORITHMS, help="generate a run of this search instead")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--distribution", default="random", choices=DISTRIBUTIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", type=int, help="search target (default: an element of the array)")
+    frames = parser.add_mutually_exclusive_group()
+    frames.add_argument("--every", type=int, help="draw a frame after every N steps")
+    frames.add_argument("--frames", type=int, default=300,
+                        help="number of frames to spread evenly over the run (default 300)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--fps", type=float, default=30, help="GIF frame rate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", "-o", required=True,
+                        help="a .gif file, or a directory to fill with frame_NNNNNN.png")
+    args = parser.parse_args(argv)
+    if bool(args.trace) == bool(args.sort or args.search):
+        parser.error("give either a trace file or --sort/--search")
+    if (args.every is not None and args.every < 1) or args.frames < 1:
+        parser.error("--every and --frames must be at least 1")
+    if args.width < 16 or args.height <= CAPTION_HEIGHT + 8:
+        parser.error(f"frames must be at least 16 x {CAPTION_HEIGHT + 9} pixels")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        try:
+            export(args, args.trace)
+        except TraceFileError as e:
+            sys.exit(str(e))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.aqt")
+        record_run(args, path)
+        export(args, path)
+
+
+if __name__ == "__main__":
+    main()
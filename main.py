@@ -1,11 +1,12 @@
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel
-from PyQt5.QtCore import Qt
-from sorting_visualizer import SortingVisualizer
-from search_visualizer import SearchingVisualizer   # ✅ Corrected import name
-from graph_visualizer import GraphVisualizer
-from dp_visualizer import DPVisualizer
-from ml_visualizer import MLVisualizer
+import startup   # first, so its clock starts as early as possible
 import sys
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QMessageBox
+from PyQt5.QtCore import Qt, QTimer
+from registry import VISUALIZERS, IMPORT_TIMES, is_available, load
+startup.mark("PyQt5 imported")
+
+# Print startup phases and per-visualizer import times to stderr
+STARTUP_REPORT = "--startup-report" in sys.argv
 
 
 class MainWindow(QWidget):
@@ -28,29 +29,20 @@ class MainWindow(QWidget):
         subtitle.setStyleSheet("font-size: 16px; color: #34495e;")
         layout.addWidget(subtitle)
 
-        # Buttons for each visualizer
-        btn_sort = QPushButton("Sorting Visualizer", self)
-        btn_sort.clicked.connect(self.open_sorting)
-        layout.addWidget(btn_sort)
-
-        btn_search = QPushButton("Searching Visualizer", self)
-        btn_search.clicked.connect(self.open_searching)
-        layout.addWidget(btn_search)
-
-        btn_graph = QPushButton("Graph Visualizer", self)
-        btn_graph.clicked.connect(self.open_graph)
-        layout.addWidget(btn_graph)
-
-        btn_dp = QPushButton("Dynamic Programming Visualizer", self)
-        btn_dp.clicked.connect(self.open_dp)
-        layout.addWidget(btn_dp)
-
-        btn_ml = QPushButton("Machine Learning Visualizer", self)
-        btn_ml.clicked.connect(self.open_ml)
-        layout.addWidget(btn_ml)
+        # Buttons for each visualizer; modules are imported only when clicked
+        self.windows = {}
+        buttons = []
+        for entry in VISUALIZERS:
+            btn = QPushButton(entry.title, self)
+            btn.clicked.connect(lambda checked=False, e=entry: self.open_visualizer(e))
+            if not is_available(entry):
+                btn.setEnabled(False)
+                btn.setToolTip(f"Module '{entry.module}' is not installed")
+            layout.addWidget(btn)
+            buttons.append(btn)
 
         # Button Styling
-        for btn in [btn_sort, btn_search, btn_graph, btn_dp, btn_ml]:
+        for btn in buttons:
             btn.setStyleSheet("""
                 QPushButton {
                     font-size: 16px;
@@ -61,45 +53,51 @@ class MainWindow(QWidget):
                 QPushButton:hover {
                     background-color: #dcdde1;
                 }
+                QPushButton:disabled {
+                    color: #95a5a6;
+                }
             """)
 
         self.setLayout(layout)
 
     # ----- Window Navigation Methods -----
 
-    def open_sorting(self):
+    def open_visualizer(self, entry):
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            widget_class = load(entry)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Visualizer unavailable", f"Could not load {entry.title}:\n{e}")
+            return
+        QApplication.restoreOverrideCursor()
+        if STARTUP_REPORT:
+            print(f"{entry.module} imported in {IMPORT_TIMES[entry.module] * 1000:.1f} ms",
+                  file=sys.stderr)
         self.hide()
-        self.sort_window = SortingVisualizer()
-        self.sort_window.backToHomeSignal.connect(self.show)
-        self.sort_window.show()
+        window = widget_class()
+        window.backToHomeSignal.connect(self.show)
+        window.show()
+        self.windows[entry.module] = window
 
-    def open_searching(self):
-        self.hide()
-        self.search_window = SearchingVisualizer()  # ✅ Correct class name
-        self.search_window.backToHomeSignal.connect(self.show)
-        self.search_window.show()
-
-    def open_graph(self):
-        self.hide()
-        self.graph_window = GraphVisualizer()
-        self.graph_window.backToHomeSignal.connect(self.show)
-        self.graph_window.show()
 
-    def open_dp(self):
-        self.hide()
-        self.dp_window = DPVisualizer()
-        self.dp_window.backToHomeSignal.connect(self.show)
-        self.dp_window.show()
-
-    def open_ml(self):
-        self.hide()
-        self.ml_window = MLVisualizer()
-        self.ml_window.backToHomeSignal.connect(self.show)
-        self.ml_window.show()
+def print_startup_report():
+    print(startup.phase_report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
+    if "--import-report" in sys.argv:
+        # -X importtime breakdown of the hub and every visualizer, without a GUI
+        for module in ["main"] + [entry.module for entry in VISUALIZERS]:
+            print(startup.import_breakdown(module) + "\n")
+        sys.exit(0)
     app = QApplication(sys.argv)
+    startup.mark("QApplication created")
     window = MainWindow()
+    startup.mark("MainWindow built")
     window.show()
+    startup.mark("MainWindow shown")
+    if STARTUP_REPORT:
+        # runs once the event loop has painted the hub
+        QTimer.singleShot(0, lambda: (startup.mark("event loop running"), print_startup_report()))
     sys.exit(app.exec_())
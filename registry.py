@@ -0,0 +1,41 @@
+"""Registry of the hub's visualizers, imported only when first opened.
+
+Each entry names the module and widget class; nothing here imports PyQt5,
+matplotlib or the visualizer modules themselves.
+"""
+from collections import namedtuple
+import importlib
+import importlib.util
+import time
+
+Visualizer = namedtuple("Visualizer", ["title", "module", "class_name"])
+
+VISUALIZERS = [
+    Visualizer("Sorting Visualizer", "sorting_visualizer", "SortingVisualizer"),
+    Visualizer("Searching Visualizer", "search_visualizer", "SearchingVisualizer"),
+    Visualizer("Graph Visualizer", "graph_visualizer", "GraphVisualizer"),
+    Visualizer("Dynamic Programming Visualizer", "dp_visualizer", "DPVisualizer"),
+    Visualizer("Machine Learning Visualizer", "ml_visualizer", "MLVisualizer"),
+]
+
+# module name -> seconds spent importing it on first use
+IMPORT_TIMES = {}
+
+
+def is_available(entry):
+    """Cheap check that the module exists, without importing it."""
+    return importlib.util.find_spec(entry.module) is not None
+
+
+def load(entry):
+    """Import the entry's module on first use and return its widget class.
+
+    Raises ImportError if the module or class is missing.
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(entry.module)
+    IMPORT_TIMES.setdefault(entry.module, time.perf_counter() - start)
+    try:
+        return getattr(module, entry.class_name)
+    except AttributeError:
+        raise ImportError(f"{entry.module} has no class {entry.class_name}")
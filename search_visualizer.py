@@ -1,11 +1,66 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton,
-    QHBoxLayout, QSlider, QComboBox, QLineEdit, QSizePolicy, QMessageBox, QTextEdit
+    QWidget, QVBoxLayout, QLabel, QPushButton, QApplication,
+    QHBoxLayout, QSlider, QComboBox, QLineEdit, QSizePolicy, QMessageBox, QTextEdit, QFileDialog,
+    QSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QGuiApplication
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.patches import Rectangle
 import matplotlib.pyplot as plt
+import numpy as np
+import os
+import time
+
+from engine import (
+    BINARY_DTYPES, DISTRIBUTIONS, LINE_BYTES, MAX_RATE_POSITION, OP_FOUND, SEARCH_ALGORITHMS, SEARCH_COLUMNS,
+    SEARCH_LAYOUTS, UNSORTED_SEARCHES, BackgroundProfile, BackgroundStream, FrameBudget, FrameProfiler, StepStream,
+    TraceBuffer, TraceFile, TraceFileError,
+    batch_search, column_envelope, frame_interval_ms, generate, iter_text_chunks, map_binary, parse_values,
+    probe_summary, profile_lines, save_trace, search_input, slider_rate, sorted_copy, trace_search_metrics,
+)
+
+# Arrays at least this large generate their trace in a worker process
+BACKGROUND_MIN_SIZE = 100000
+
+# Above this many elements the array is drawn as a min/max envelope instead of bars
+MAX_BARS = 1000
+
+DEFAULT_COLOR = "#7fb3ff"
+PROBE_COLOR = "#ffa500"   # orange for the element being checked
+FOUND_COLOR = "#6fe07f"   # green for found
+ELIMINATED_COLOR = "#8c8c8c"   # grey shade over elements ruled out
+
+# Algorithm -> (how it works, best, average, worst case)
+SEARCH_INFO = {
+    "Linear Search": (
+        "Linear Search checks each element in the list sequentially until the target value is found or the list ends.",
+        "O(1)", "O(n/2)", "O(n)"),
+    "Binary Search": (
+        "Binary Search works on sorted arrays by repeatedly dividing the search interval in half.",
+        "O(1)", "O(log n)", "O(log n)"),
+    "Jump Search": (
+        "Jump Search checks every &radic;n-th element of the sorted array until it passes the target, "
+        "then scans the last block it jumped over one element at a time.",
+        "O(1)", "O(&radic;n)", "O(&radic;n)"),
+    "Exponential Search": (
+        "Exponential Search probes indices 1, 2, 4, 8, ... until it passes the target, "
+        "then binary searches the last doubling.",
+        "O(1)", "O(log i)", "O(log n)"),
+    "Interpolation Search": (
+        "Interpolation Search guesses where the target should sit from the values at the ends of the "
+        "window, like opening a phone book near the right letter.",
+        "O(1)", "O(log log n)", "O(n)"),
+    "Ternary Search": (
+        "Ternary Search splits the sorted window into thirds with two probes and keeps the third "
+        "that can still hold the target.",
+        "O(1)", "O(log<sub>3</sub> n)", "O(log<sub>3</sub> n)"),
+    "Eytzinger Binary Search": (
+        "Eytzinger Binary Search stores the sorted array in breadth-first tree order (children of "
+        "position k at 2k+1 and 2k+2) and descends without branching on the comparison. Indices are "
+        "positions in that layout; the top levels of the tree share the first few cache lines.",
+        "O(log n)", "O(log n)", "O(log n)"),
+}
 
 
 class SearchingVisualizer(QWidget):
@@ -17,14 +72,37 @@ class SearchingVisualizer(QWidget):
         self.setGeometry(100, 80, 1000, 700)
 
         # Internal state
-        self.arr = []
-        self.sorted_arr = []
+        self.arr = np.empty(0, dtype=np.int64)
+        self.sorted_arr = None   # sorted copy of self.arr, made on first sorted search
+        self.layouts = {}        # algorithm -> reordered sorted_arr (SEARCH_LAYOUTS)
+        self.source = None       # input text or array self.arr was built from
+        self.input_array = None  # generated or loaded array, used when the input box is empty
+        self.loader = None       # chunked text-file parser while a file is loading
+        self.load_parts = []
+        self.target_file = None  # (name, targets) loaded for batch mode
+        self.batch = None        # (algorithm, targets, found, probes) of the last batch run
         self.target = None
-        self.steps = []          # list of (current_index, found_index, color_list)
+        self.steps = []          # TraceBuffer of (op, index, probes) steps
+        self.stream = None       # StepStream/BackgroundStream feeding self.steps
         self.step_ptr = 0
-        self.colors = []
+        self.bars = None         # BarContainer, created once per array (None for an envelope)
+        self.markers = []        # highlight lines drawn over an envelope
+        self.shades = []         # two patches greying out what lies outside self.window
+        self.window = None       # (low, high) search window of the last step drawn
+        self.painted = {}        # bar index -> highlight color currently shown
+        self.background = None   # cached canvas region with every bar in DEFAULT_COLOR
         self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.step_animation)
+        self.budget = FrameBudget()
+        self.frame_stats = FrameProfiler()
+        self.load_timer = QTimer(self)
+        self.load_timer.timeout.connect(self.load_next_chunk)
+        self.profile = None      # BackgroundProfile measuring the real cost of the current search
+        self.explained = False   # the end-of-search explanation is showing
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setInterval(100)
+        self.profile_timer.timeout.connect(self.poll_profile)
 
         # UI setup
         self.setup_ui()
@@ -44,8 +122,8 @@ class SearchingVisualizer(QWidget):
         controls.setSpacing(10)
 
         self.algo_box = QComboBox()
-        self.algo_box.addItems(["Linear Search", "Binary Search"])
-        self.algo_box.setFixedWidth(180)
+        self.algo_box.addItems(list(SEARCH_ALGORITHMS))
+        self.algo_box.setFixedWidth(200)
         controls.addWidget(self.algo_box)
 
         self.array_input = QLineEdit()
@@ -59,6 +137,88 @@ class SearchingVisualizer(QWidget):
 
         main.addLayout(controls)
 
+        # Generated input row: distribution, size and seed ("auto" = fresh every time)
+        inputs = QHBoxLayout()
+        inputs.setSpacing(10)
+        inputs.addWidget(QLabel("Generate:"))
+
+        self.dist_box = QComboBox()
+        self.dist_box.addItems(DISTRIBUTIONS)
+        self.dist_box.setFixedWidth(140)
+        inputs.addWidget(self.dist_box)
+
+        self.size_spin = QSpinBox()
+        self.size_spin.setRange(1, 10000000)
+        self.size_spin.setValue(30)
+        self.size_spin.setPrefix("n = ")
+        self.size_spin.setFixedWidth(130)
+        inputs.addWidget(self.size_spin)
+
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(-1, 999999)
+        self.seed_spin.setSpecialValueText("auto")
+        self.seed_spin.setValue(-1)
+        self.seed_spin.setPrefix("seed ")
+        self.seed_spin.setFixedWidth(110)
+        inputs.addWidget(self.seed_spin)
+
+        self.generate_btn = QPushButton("Generate Array")
+        self.generate_btn.setFixedWidth(140)
+        self.generate_btn.clicked.connect(self.generate_array)
+        inputs.addWidget(self.generate_btn)
+
+        self.load_array_btn = QPushButton("Load Array File")
+        self.load_array_btn.setFixedWidth(140)
+        self.load_array_btn.clicked.connect(self.load_array_dialog)
+        inputs.addWidget(self.load_array_btn)
+        inputs.addStretch(1)
+
+        main.addLayout(inputs)
+
+        # Batch row: many targets at once, then replay any single query
+        batch = QHBoxLayout()
+        batch.setSpacing(10)
+        batch.addWidget(QLabel("Batch:"))
+
+        self.targets_box = QComboBox()
+        self.targets_box.addItem("array values")
+        self.targets_box.addItems(DISTRIBUTIONS)
+        self.targets_box.setToolTip("Where the batch targets come from")
+        self.targets_box.setFixedWidth(160)
+        batch.addWidget(self.targets_box)
+
+        self.batch_size_spin = QSpinBox()
+        self.batch_size_spin.setRange(1, 1000000)
+        self.batch_size_spin.setValue(1000)
+        self.batch_size_spin.setPrefix("targets ")
+        self.batch_size_spin.setFixedWidth(150)
+        batch.addWidget(self.batch_size_spin)
+
+        self.load_targets_btn = QPushButton("Load Targets")
+        self.load_targets_btn.setFixedWidth(120)
+        self.load_targets_btn.clicked.connect(self.load_targets_dialog)
+        batch.addWidget(self.load_targets_btn)
+
+        self.batch_btn = QPushButton("Run Batch")
+        self.batch_btn.setFixedWidth(110)
+        self.batch_btn.clicked.connect(self.run_batch)
+        batch.addWidget(self.batch_btn)
+
+        self.query_spin = QSpinBox()
+        self.query_spin.setPrefix("query #")
+        self.query_spin.setFixedWidth(130)
+        self.query_spin.setEnabled(False)
+        batch.addWidget(self.query_spin)
+
+        self.replay_query_btn = QPushButton("Replay Query")
+        self.replay_query_btn.setFixedWidth(120)
+        self.replay_query_btn.setEnabled(False)
+        self.replay_query_btn.clicked.connect(self.replay_query)
+        batch.addWidget(self.replay_query_btn)
+        batch.addStretch(1)
+
+        main.addLayout(batch)
+
         # Speed slider and buttons row
         row2 = QHBoxLayout()
         row2.setSpacing(10)
@@ -68,16 +228,32 @@ class SearchingVisualizer(QWidget):
         row2.addWidget(speed_label)
 
         self.speed_slider = QSlider(Qt.Horizontal)
-        self.speed_slider.setMinimum(100)   # fast
-        self.speed_slider.setMaximum(1000)  # slow
-        self.speed_slider.setValue(400)
+        self.speed_slider.setMinimum(0)     # log scale: 1 steps/s
+        self.speed_slider.setMaximum(MAX_RATE_POSITION)    # .. 100,000 steps/s
+        self.speed_slider.setValue(4)
+        self.speed_slider.valueChanged.connect(self.on_speed_changed)
         row2.addWidget(self.speed_slider, 1)
 
+        self.speed_value_label = QLabel()
+        self.speed_value_label.setFixedWidth(120)
+        row2.addWidget(self.speed_value_label)
+        self.on_speed_changed()
+
         self.start_btn = QPushButton("Start Search")
         self.start_btn.setFixedWidth(140)
         self.start_btn.clicked.connect(self.on_start)
         row2.addWidget(self.start_btn)
 
+        self.save_trace_btn = QPushButton("Save Trace")
+        self.save_trace_btn.setFixedWidth(110)
+        self.save_trace_btn.clicked.connect(self.save_trace_dialog)
+        row2.addWidget(self.save_trace_btn)
+
+        self.load_trace_btn = QPushButton("Load Trace")
+        self.load_trace_btn.setFixedWidth(110)
+        self.load_trace_btn.clicked.connect(self.load_trace_dialog)
+        row2.addWidget(self.load_trace_btn)
+
         self.back_btn = QPushButton("Back to Home")
         self.back_btn.setFixedWidth(140)
         self.back_btn.clicked.connect(self.on_back)
@@ -85,18 +261,43 @@ class SearchingVisualizer(QWidget):
 
         main.addLayout(row2)
 
-        # Result label
+        # Result label, with the frame stats toggles beside it
+        status = QHBoxLayout()
         self.result_label = QLabel("")
         self.result_label.setFont(QFont("Arial", 12, QFont.Bold))
         self.result_label.setAlignment(Qt.AlignCenter)
-        main.addWidget(self.result_label)
+        status.addWidget(self.result_label, 1)
+
+        self.stats_btn = QPushButton("Frame Stats")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setFixedWidth(110)
+        self.stats_btn.toggled.connect(self.toggle_frame_stats)
+        status.addWidget(self.stats_btn)
+
+        self.frame_log_btn = QPushButton("Log Frames...")
+        self.frame_log_btn.setCheckable(True)
+        self.frame_log_btn.setFixedWidth(120)
+        self.frame_log_btn.toggled.connect(self.toggle_frame_log)
+        status.addWidget(self.frame_log_btn)
+        main.addLayout(status)
 
         # Matplotlib figure (embedded)
         self.figure, self.ax = plt.subplots(figsize=(9, 3.8))
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.canvas.mpl_connect("draw_event", self.on_canvas_draw)
         main.addWidget(self.canvas)
 
+        # Frame stats overlay, a plain label on top of the canvas so blitting never touches it
+        self.stats_overlay = QLabel(self.canvas)
+        self.stats_overlay.setStyleSheet(
+            "background: rgba(0, 0, 0, 160); color: white; padding: 4px; font-family: monospace;")
+        self.stats_overlay.move(8, 8)
+        self.stats_overlay.hide()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(250)
+        self.stats_timer.timeout.connect(self.refresh_frame_stats)
+
         # Explanation text area
         self.explanation = QTextEdit()
         self.explanation.setReadOnly(True)
@@ -111,30 +312,224 @@ class SearchingVisualizer(QWidget):
         self.show_static_array(self.default_array)
 
     # ---------------------------
+    def generate_array(self):
+        dist = self.dist_box.currentText()
+        n = self.size_spin.value()
+        seed = self.seed_spin.value()
+        self.use_array(generate(dist, n, None if seed < 0 else seed), f"generated {dist} array")
+
+    def use_array(self, arr, description):
+        """Search arr (generated or loaded) whenever the input box is left empty."""
+        self.input_array = arr
+        self.array_input.clear()
+        self.array_input.setPlaceholderText(
+            f"Using {description} of {len(arr):,} values - type values here to override")
+        self.show_static_array(arr)
+
+    def load_array_dialog(self):
+        path, chosen = QFileDialog.getOpenFileName(
+            self, "Load Array", "",
+            "Text or CSV (*.txt *.csv);;Raw int32 (*.i32 *.bin);;Raw int64 (*.i64 *.bin);;All files (*)")
+        if not path:
+            return
+        ext = os.path.splitext(path)[1].lower()
+        dtype = BINARY_DTYPES.get(ext)
+        if dtype is None and ext == ".bin":
+            dtype = np.int32 if "int32" in chosen else np.int64
+        try:
+            if dtype is not None:
+                self.use_array(map_binary(path, dtype), f"memory-mapped {os.path.basename(path)}")
+            else:
+                self.start_text_load(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Load Failed", str(e))
+
+    def start_text_load(self, path):
+        """Parse a text/CSV file a chunk per timer tick so the window stays responsive."""
+        self.loader = iter_text_chunks(path)
+        self.load_path = path
+        self.load_parts = []
+        self.start_btn.setEnabled(False)
+        self.load_timer.start(0)
+
+    def load_next_chunk(self):
+        try:
+            values, fraction = next(self.loader)
+        except ValueError as e:
+            self.finish_text_load()
+            QMessageBox.warning(self, "Load Failed", f"{os.path.basename(self.load_path)}: {e}")
+            return
+        self.load_parts.append(values)
+        self.result_label.setText(f"Loading {os.path.basename(self.load_path)}: {fraction:.0%}")
+        if fraction >= 1.0:
+            arr = np.concatenate(self.load_parts)
+            self.finish_text_load()
+            self.result_label.setText("")
+            self.use_array(arr, os.path.basename(self.load_path))
+
+    def finish_text_load(self):
+        self.load_timer.stop()
+        self.loader = None
+        self.load_parts = []
+        self.start_btn.setEnabled(True)
+
     def parse_input(self):
+        """Return the array to search, re-parsing only when the input changed."""
         text = self.array_input.text().strip()
-        if not text:
-            arr = list(self.default_array)
+        if text:
+            if not isinstance(self.source, str) or text != self.source:
+                self.arr = parse_values(text)
+                self.source = text
+                self.sorted_arr = None
+                self.layouts = {}
         else:
-            try:
-                arr = [int(x.strip()) for x in text.split(",") if x.strip() != ""]
-            except ValueError:
-                raise ValueError("Array values must be integers separated by commas.")
-        self.arr = arr
-        self.sorted_arr = sorted(arr)
-        return arr
+            source = self.input_array if self.input_array is not None else self.default_array
+            if source is not self.source:
+                self.arr = np.asarray(source, dtype=np.int64) if isinstance(source, list) else source
+                self.source = source
+                self.sorted_arr = None
+                self.layouts = {}
+        return self.arr
+
+    def sorted_array(self):
+        """Sorted copy of the current input, computed once until the input changes."""
+        if self.sorted_arr is None:
+            self.sorted_arr = sorted_copy(self.arr)
+        return self.sorted_arr
+
+    def search_data(self, algo):
+        """The array algo searches: the input, its sorted copy, or a cached layout of it."""
+        if algo in UNSORTED_SEARCHES:
+            return self.arr
+        if algo not in SEARCH_LAYOUTS:
+            return self.sorted_array()
+        if algo not in self.layouts:
+            self.layouts[algo] = search_input(algo, self.arr, self.sorted_array())
+        return self.layouts[algo]
+
+    # ---------------------------
+    def load_targets_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Targets", "", "Text or CSV (*.txt *.csv);;Raw int32 (*.i32);;Raw int64 (*.i64);;All files (*)")
+        if not path:
+            return
+        name = os.path.basename(path)
+        try:
+            dtype = BINARY_DTYPES.get(os.path.splitext(path)[1].lower())
+            if dtype is not None:
+                targets = np.array(map_binary(path, dtype), dtype=np.int64)
+            else:
+                with open(path) as f:
+                    targets = parse_values(f.read())
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Load Failed", str(e))
+            return
+        self.target_file = (f"file: {name}", targets)
+        if self.targets_box.findText(self.target_file[0]) < 0:
+            self.targets_box.addItem(self.target_file[0])
+        self.targets_box.setCurrentText(self.target_file[0])
+
+    def batch_targets(self, arr):
+        """Targets for a batch run: a loaded file, samples of arr, or a distribution over its range."""
+        source = self.targets_box.currentText()
+        if self.target_file is not None and source == self.target_file[0]:
+            return self.target_file[1]
+        count = self.batch_size_spin.value()
+        seed = self.seed_spin.value()
+        seed = None if seed < 0 else seed
+        if source == "array values":
+            # every target is present: lookups of existing keys
+            return np.asarray(arr[np.random.default_rng(seed).integers(0, len(arr), count)], dtype=np.int64)
+        return generate(source, count, seed, low=int(arr.min()), high=int(arr.max()))
+
+    def run_batch(self):
+        """Search every batch target in one vectorized pass and summarize the probes."""
+        if self.timer.isActive():
+            self.timer.stop()
+        self.close_stream()
+        try:
+            arr = self.parse_input()
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
+            return
+        if not len(arr):
+            QMessageBox.warning(self, "Input Required", "The array to search is empty.")
+            return
+        algo = self.algo_box.currentText()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            targets = self.batch_targets(arr)
+            data = self.search_data(algo)
+            found, probes, lines = batch_search(algo, data, targets, data.dtype.itemsize)
+        except (ValueError, MemoryError) as e:
+            self.result_label.setStyleSheet("color: red; font-weight: bold;")
+            self.result_label.setText(f"Batch search failed: {str(e) or type(e).__name__}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.batch = (algo, targets, found, probes)
+        summary = probe_summary(found, probes, lines)
+        if summary is None:
+            self.result_label.setText("No targets to search.")
+            return
+        self.query_spin.setRange(0, len(targets) - 1)
+        self.query_spin.setEnabled(True)
+        self.replay_query_btn.setEnabled(True)
+        self.show_batch_histogram(algo, summary)
+        self.result_label.setStyleSheet("")
+        self.result_label.setText(
+            f"{summary['hits']:,} of {summary['queries']:,} targets found ({summary['hit_rate']:.1%})")
+        self.explanation.setHtml(
+            f"<b>Batch search:</b> {algo} over {summary['queries']:,} targets "
+            f"({self.targets_box.currentText()}) in an array of {len(arr):,}<br><br>"
+            f"<b>Hit rate:</b> {summary['hit_rate']:.1%} ({summary['hits']:,} of {summary['queries']:,})<br>"
+            f"<b>Probes per query:</b> min {summary['min']:,} · mean {summary['mean']:,.1f} · "
+            f"p50 {summary['p50']:,.0f} · p99 {summary['p99']:,.0f} · max {summary['max']:,}<br>"
+            f"<b>Distinct {LINE_BYTES}-byte cache lines per query:</b> mean {summary['lines_mean']:,.1f} · "
+            f"p99 {summary['lines_p99']:,.0f}<br><br>"
+            "Pick a query number and press Replay Query to animate that search step by step."
+        )
+
+    def show_batch_histogram(self, algo, summary):
+        ax = self.figure_axes()
+        ax.clear()
+        self.bars = None
+        self.markers = []
+        self.shades = []
+        self.painted = {}
+        counts, edges = summary["histogram"]
+        ax.stairs(counts, edges, fill=True, color=DEFAULT_COLOR)
+        ax.axvline(summary["mean"], color=PROBE_COLOR, label=f"mean {summary['mean']:,.1f}")
+        ax.axvline(summary["p99"], color=FOUND_COLOR, label=f"p99 {summary['p99']:,.0f}")
+        ax.set_xlabel("probes per query")
+        ax.set_ylabel("queries")
+        ax.legend(loc="upper right")
+        ax.set_title(f"{algo}: probe histogram")
+        self.canvas.draw()
+
+    def replay_query(self):
+        """Animate one query of the last batch with the normal step-by-step search."""
+        if self.batch is None:
+            return
+        algo, targets, found, probes = self.batch
+        k = self.query_spin.value()
+        self.algo_box.setCurrentText(algo)
+        self.target_input.setText(str(int(targets[k])))
+        self.on_start()
+        self.explanation.setHtml(f"Replaying batch query #{k:,}: target {int(targets[k])}, "
+                                 f"{int(probes[k]):,} probes in the batch run.")
 
     # ---------------------------
     def on_start(self):
         if self.timer.isActive():
             self.timer.stop()
+        self.close_stream()
         self.step_ptr = 0
         self.steps = []
-        self.colors = []
 
-        # parse array
+        # parse array (search_data reads the parsed self.arr)
         try:
-            arr = self.parse_input()
+            self.parse_input()
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Input", str(e))
             return
@@ -151,102 +546,238 @@ class SearchingVisualizer(QWidget):
             return
 
         algo = self.algo_box.currentText()
-        if algo == "Linear Search":
-            self.prepare_linear_steps(arr, self.target)
-        else:
-            self.prepare_binary_steps(self.sorted_arr, self.target)
+        self.prepare_steps(algo, self.search_data(algo), self.target)
 
-        interval = self.speed_slider.value()
-        self.timer.start(interval)
+        self.start_playback()
 
-    # ---------------------------
-    def prepare_linear_steps(self, arr, target):
-        self.steps = []
-        base_colors = ["#7fb3ff"] * len(arr)
+    def start_playback(self):
+        self.budget.frame_ms = frame_interval_ms(QGuiApplication.primaryScreen().refreshRate())
+        self.budget.start()
+        self.frame_stats.start(self.budget.frame_ms)
+        self.timer.start(self.budget.frame_ms)
 
-        for i in range(len(arr)):
-            colors_copy = list(base_colors)
-            colors_copy[i] = "#ffa500"  # orange for current
-            self.steps.append((i, -1, colors_copy))
+    def on_speed_changed(self):
+        rate = slider_rate(self.speed_slider.value())
+        self.budget.steps_per_second = rate
+        self.speed_value_label.setText(f"{rate:,.0f} steps/s" if rate >= 10 else f"{rate:.1f} steps/s")
 
-            if arr[i] == target:
-                colors_found = list(colors_copy)
-                colors_found[i] = "#6fe07f"  # green for found
-                self.steps.append((i, i, colors_found))
-                break
-        else:
-            self.steps.append((-1, -1, list(base_colors)))
-
-        self.visual_array = list(arr)
+    # ---------------------------
+    def prepare_steps(self, algo, data, target):
+        self.visual_array = data
+        self.open_stream(algo, self.visual_array, target)
+        self.start_profile(algo, self.visual_array, target)
+        self.result_index = -1
         self.result_label.setText("")
         self.explanation.clear()
-        self.redraw_from_step(0)
+        self.build_bars("Visualization")
 
     # ---------------------------
-    def prepare_binary_steps(self, sorted_arr, target):
-        arr = list(sorted_arr)
-        self.visual_array = arr
-        self.steps = []
-        self.colors = ["#7fb3ff"] * len(arr)
-
-        low = 0
-        high = len(arr) - 1
-        found = False
-
-        while low <= high:
-            mid = (low + high) // 2
-            colors_copy = list(self.colors)
-            colors_copy[mid] = "#ffa500"  # orange mid
-            self.steps.append((mid, -1, colors_copy))
-
-            if arr[mid] == target:
-                colors_found = list(colors_copy)
-                colors_found[mid] = "#6fe07f"  # green found
-                self.steps.append((mid, mid, colors_found))
-                found = True
-                break
-            elif arr[mid] < target:
-                low = mid + 1
-            else:
-                high = mid - 1
+    def open_stream(self, algo, arr, target):
+        """Start producing steps lazily, in a worker process for large arrays."""
+        self.steps = TraceBuffer(SEARCH_COLUMNS)
+        if len(arr) >= BACKGROUND_MIN_SIZE:
+            self.stream = BackgroundStream("search", algo, (arr, target), width=5, trace=self.steps)
+        else:
+            self.stream = StepStream(SEARCH_ALGORITHMS[algo](arr, target), trace=self.steps)
+
+    def close_stream(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self.profile_timer.stop()
+        if self.profile is not None:
+            self.profile.close()
+            self.profile = None
+        self.explained = False
 
-        if not found:
-            self.steps.append((-1, -1, list(self.colors)))
+    # ---------------------------
+    def start_profile(self, algo, arr, target):
+        """Time the bare search, its trace recording and its peak memory in a worker."""
+        self.profile = BackgroundProfile("search", algo, (arr, target))
+        self.profile_timer.start()
 
-        self.result_label.setText("")
-        self.explanation.clear()
-        self.redraw_from_step(0)
+    def poll_profile(self):
+        if self.profile is None or not self.profile.done:
+            return
+        self.profile_timer.stop()
+        if self.explained:
+            self.show_explanation_after_steps()
+
+    def profile_html(self):
+        if self.profile is None:
+            return ""
+        if not self.profile.done:
+            return "<b>Measured cost:</b> still measuring in a background process...<br><br>"
+        if self.profile.error:
+            return f"<b>Measured cost:</b> unavailable ({self.profile.error})<br><br>"
+        lines = "".join(f"• {line}<br>" for line in profile_lines(self.profile.result))
+        return f"<b>Measured cost:</b><br>{lines}<br>"
 
     # ---------------------------
     def step_animation(self):
-        if self.step_ptr >= len(self.steps):
-            self.timer.stop()
-            self.show_explanation_after_steps()
-            return
+        """Advance by every step due this frame and redraw only the last one."""
+        self.frame_stats.begin()
+        first_step = self.step_ptr
+        due = self.budget.steps_due()
+        deadline = self.budget.deadline()
+        advanced = False
+        current = found = -1
+        while due > 0:
+            step = self.stream.next_step()
+            if step is None:
+                break
+            op, current = step[0], step[1]
+            found = current if op == OP_FOUND else -1
+            last = step
+            self.step_ptr += 1
+            due -= 1
+            advanced = True
+            if found != -1:
+                break
+            if due & 1023 == 0 and time.perf_counter() > deadline:
+                break
 
-        current, found, colors = self.steps[self.step_ptr]
-        self.current_index = current
-        self.result_index = found
-        self.colors = colors
-        self.redraw_from_step(self.step_ptr)
-        self.step_ptr += 1
+        self.frame_stats.applied()
+        if advanced:
+            self.current_index = current
+            self.result_index = found
+            # traces saved before steps carried a window have only three fields
+            self.window = (last[3], last[4]) if len(last) > 3 and last[3] >= 0 else None
+            self.redraw_from_step(self.step_ptr - 1)
+        self.frame_stats.end(self.step_ptr - first_step)
 
-        if found != -1:
+        if isinstance(self.stream, BackgroundStream) and self.stream.state == BackgroundStream.FAILED:
+            self.timer.stop()
+            self.result_label.setText(f"Trace generation failed: {self.stream.error}")
+            return
+        if found != -1 or self.stream.finished:
             self.timer.stop()
             self.show_explanation_after_steps()
 
     # ---------------------------
-    def redraw_from_step(self, step_idx):
-        self.ax = self.figure_axes()
-        self.ax.clear()
-        x_positions = range(len(self.visual_array))
-        self.ax.bar(x_positions, self.visual_array, color=self.colors, edgecolor="black")
-        for i, val in enumerate(self.visual_array):
-            self.ax.text(i, val + max(self.visual_array) * 0.03, str(val),
-                         ha="center", va="bottom", fontsize=8)
-        self.ax.set_xticks([])
-        self.ax.set_title("Visualization")
+    def step_highlight(self, current, found):
+        highlight = {}
+        if current != -1:
+            highlight[current] = PROBE_COLOR
+        if found != -1:
+            highlight[found] = FOUND_COLOR
+        return highlight
+
+    # ---------------------------
+    def build_bars(self, title, labels=True):
+        """Create the bar container and value labels once for self.visual_array.
+
+        Arrays longer than MAX_BARS are drawn as a per-pixel-column min/max
+        envelope instead, with highlights as animated marker lines on top.
+        """
+        start = time.perf_counter()
+        ax = self.figure_axes()
+        ax.clear()
+        arr = self.visual_array
+        self.markers = []
+        if len(arr) > MAX_BARS:
+            self.bars = None
+            starts, mins, maxs = column_envelope(arr, max(1, int(ax.bbox.width)))
+            edges = np.append(starts, len(arr))
+            ax.fill_between(edges, np.append(mins, mins[-1]), np.append(maxs, maxs[-1]),
+                            step="post", color=DEFAULT_COLOR, linewidth=0)
+            ax.set_xlim(0, len(arr))
+        else:
+            self.bars = ax.bar(range(len(arr)), arr, color=DEFAULT_COLOR, edgecolor="black")
+            if labels and len(arr):
+                offset = max(arr) * 0.03
+                for i, val in enumerate(arr):
+                    ax.text(i, val + offset, str(val), ha="center", va="bottom", fontsize=8)
+            ax.set_xticks([])
+        # the search window is shown by greying both sides of it with animated patches
+        self.shades = [ax.add_patch(Rectangle((0, 0), 0, 1, transform=ax.get_xaxis_transform(),
+                                              color=ELIMINATED_COLOR, alpha=0.55, linewidth=0,
+                                              animated=True))
+                       for _ in range(2)]
+        self.window = None
+        ax.set_title(title)
+        self.painted = {}
+        self.background = None
+        self.canvas.draw()   # on_canvas_draw caches the background
+        self.frame_stats.rebuild((time.perf_counter() - start) * 1000)
+
+    def on_canvas_draw(self, event):
+        if self.painted and self.bars is not None:
+            # a full redraw (e.g. resize) included highlighted bars; retake a clean background
+            QTimer.singleShot(0, self.refresh_background)
+        else:
+            # envelope markers are animated, so full redraws leave them out
+            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+            if self.painted:
+                QTimer.singleShot(0, lambda: self.paint_bars(self.painted))
+
+    def refresh_background(self):
+        painted = self.painted
+        for i in painted:
+            self.bars[i].set_facecolor(DEFAULT_COLOR)
+        self.painted = {}
         self.canvas.draw()
+        self.paint_bars(painted)
+
+    def paint_bars(self, highlight):
+        """Recolor only the highlighted bars and blit them over the cached background."""
+        if self.bars is None:
+            self.paint_markers(highlight)
+            return
+        for i in self.painted:
+            if i not in highlight:
+                self.bars[i].set_facecolor(DEFAULT_COLOR)
+        for i, color in highlight.items():
+            self.bars[i].set_facecolor(color)
+        self.painted = highlight
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for i in highlight:
+            self.ax.draw_artist(self.bars[i])
+        self.paint_window()
+        self.canvas.blit(self.ax.bbox)
+
+    def paint_markers(self, highlight):
+        """Envelope mode: one vertical line per highlighted index, blitted."""
+        while len(self.markers) < len(highlight):
+            self.markers.append(self.ax.axvline(0, linewidth=1.5, animated=True))
+        for marker, (i, color) in zip(self.markers, highlight.items()):
+            marker.set_xdata([i, i])
+            marker.set_color(color)
+        for k, marker in enumerate(self.markers):
+            marker.set_visible(k < len(highlight))
+        self.painted = highlight
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.paint_window()
+        for marker in self.markers[:len(highlight)]:
+            self.ax.draw_artist(marker)
+        self.canvas.blit(self.ax.bbox)
+
+    def paint_window(self):
+        """Draw the shades over everything outside self.window (no blit)."""
+        if self.window is None or not self.shades:
+            return
+        n = len(self.visual_array)
+        low, high = self.window
+        low = min(max(low, 0), n)
+        stop = min(max(high + 1, 0), n)
+        # bars are centred on their index; envelope column i spans [i, i + 1]
+        start = -0.5 if self.bars is not None else 0
+        left, right = self.shades
+        left.set_bounds(start, 0, low, 1)
+        right.set_bounds(start + stop, 0, n - stop, 1)
+        for shade in self.shades:
+            if shade.get_width() > 0:
+                self.ax.draw_artist(shade)
+
+    # ---------------------------
+    def redraw_from_step(self, step_idx):
+        self.paint_bars(self.step_highlight(self.current_index, self.result_index))
 
         if hasattr(self, "result_index") and self.result_index != -1:
             idx = self.result_index
@@ -258,53 +789,39 @@ class SearchingVisualizer(QWidget):
     # ---------------------------
     def show_explanation_after_steps(self):
         algo = self.algo_box.currentText()
-        found_index = -1
-        for _, fidx, _ in self.steps:
-            if fidx != -1:
-                found_index = fidx
-                break
+        metrics = trace_search_metrics(self.steps, self.visual_array.dtype.itemsize)
+        found_index = metrics["found_index"]
+        if algo in UNSORTED_SEARCHES:
+            where = "list"
+        elif algo in SEARCH_LAYOUTS:
+            where = "Eytzinger layout of the sorted array"
+        else:
+            where = "sorted array"
 
-        if algo == "Linear Search":
-            arr = self.arr if self.arr else self.default_array
-            if found_index != -1:
-                msg = f"The algorithm found the target {self.target} at index {found_index}."
-                self.result_label.setText(f"Target {self.target} found at index {found_index}")
-            else:
-                msg = f"The target {self.target} was not found in the list."
-                self.result_label.setText(msg)
-                self.result_label.setStyleSheet("color: red; font-weight: bold;")
-
-            explanation = (
-                "<b>Algorithm Used:</b> Linear Search<br><br>"
-                "Linear Search checks each element in the list sequentially until the target value is found or the list ends.<br><br>"
-                "<b>Time Complexity:</b><br>"
-                "• Best Case: O(1)<br>"
-                "• Average Case: O(n/2)<br>"
-                "• Worst Case: O(n)<br><br>"
-                f"{msg}"
-            )
-            self.explanation.setHtml(explanation)
-
-        else:  # Binary
-            arr = self.visual_array
-            if found_index != -1:
-                msg = f"The algorithm found the target {self.target} at index {found_index} (in the sorted array)."
-                self.result_label.setText(f"Target {self.target} found at index {found_index}")
-            else:
-                msg = f"The target {self.target} was not found in the sorted list."
-                self.result_label.setText(msg)
-                self.result_label.setStyleSheet("color: red; font-weight: bold;")
-
-            explanation = (
-                "<b>Algorithm Used:</b> Binary Search<br><br>"
-                "Binary Search works on sorted arrays by repeatedly dividing the search interval in half.<br><br>"
-                "<b>Time Complexity:</b><br>"
-                "• Best Case: O(1)<br>"
-                "• Average Case: O(log n)<br>"
-                "• Worst Case: O(log n)<br><br>"
-                f"{msg}"
-            )
-            self.explanation.setHtml(explanation)
+        if found_index != -1:
+            msg = f"The algorithm found the target {self.target} at index {found_index}"
+            msg += "." if algo in UNSORTED_SEARCHES else f" (in the {where})."
+            self.result_label.setText(f"Target {self.target} found at index {found_index}")
+        else:
+            msg = f"The target {self.target} was not found in the {where}."
+            self.result_label.setText(msg)
+            self.result_label.setStyleSheet("color: red; font-weight: bold;")
+
+        how, best, average, worst = SEARCH_INFO[algo]
+        explanation = (
+            f"<b>Algorithm Used:</b> {algo}<br><br>"
+            f"{how}<br><br>"
+            "<b>Time Complexity:</b><br>"
+            f"• Best Case: {best}<br>"
+            f"• Average Case: {average}<br>"
+            f"• Worst Case: {worst}<br><br>"
+            f"<b>This search:</b> {metrics['probes']:,} probes touching {metrics['cache_lines']:,} "
+            f"distinct {LINE_BYTES}-byte cache lines<br><br>"
+            f"{self.profile_html()}"
+            f"{msg}"
+        )
+        self.explanation.setHtml(explanation)
+        self.explained = True
 
     # ---------------------------
     def figure_axes(self):
@@ -314,16 +831,103 @@ class SearchingVisualizer(QWidget):
 
     def show_static_array(self, arr):
         self.visual_array = arr
-        self.colors = ["#7fb3ff"] * len(arr)
-        self.figure_axes().clear()
-        self.figure_axes().bar(range(len(arr)), arr, color=self.colors, edgecolor="black")
-        self.figure_axes().set_title("Initial Array")
-        self.canvas.draw()
+        self.build_bars("Initial Array", labels=False)
+
+    # ---------------------------
+    def save_trace_dialog(self):
+        if not len(self.steps):
+            QMessageBox.information(self, "No Trace", "Run a search before saving its trace.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "search.aqt", "Trace (*.aqt);;Compressed trace (*.aqtz)")
+        if not path:
+            return
+        metrics = trace_search_metrics(self.steps, self.visual_array.dtype.itemsize)
+        try:
+            save_trace(path, self.steps, "search", self.algo_box.currentText(), self.visual_array,
+                       target=self.target, counters={"probes": metrics["probes"],
+                                                     "found_index": metrics["found_index"],
+                                                     "cache_lines": metrics["cache_lines"]})
+        except OSError as e:
+            QMessageBox.warning(self, "Save Failed", str(e))
+
+    def load_trace_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Trace", "", "Traces (*.aqt *.aqtz);;All files (*)")
+        if not path:
+            return
+        try:
+            trace = TraceFile(path)
+        except (OSError, TraceFileError) as e:
+            QMessageBox.warning(self, "Load Failed", str(e))
+            return
+        if trace.kind != "search":
+            trace.close()
+            QMessageBox.warning(self, "Load Failed", f"{path} is a {trace.kind} trace, not a search trace.")
+            return
+        self.replay_trace(trace)
+
+    def replay_trace(self, trace):
+        """Play a saved search trace without re-running the search."""
+        if self.timer.isActive():
+            self.timer.stop()
+        self.close_stream()
+        self.step_ptr = 0
+        if trace.algorithm in SEARCH_ALGORITHMS:
+            self.algo_box.setCurrentText(trace.algorithm)
+        self.target = trace.target
+        self.target_input.setText(str(trace.target))
+        self.visual_array = np.array(trace.input)   # copy: the trace's mmap closes with it
+        self.steps = trace
+        self.stream = StepStream(trace.iter_from(0))
+        if trace.algorithm in SEARCH_ALGORITHMS:
+            self.start_profile(trace.algorithm, self.visual_array, self.target)
+        self.result_index = -1
+        self.result_label.setText("")
+        self.explanation.clear()
+        self.build_bars("Visualization")
+        self.start_playback()
+
+    # ---------------------------
+    def toggle_frame_stats(self, on):
+        self.stats_overlay.setVisible(on)
+        if on:
+            self.refresh_frame_stats()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+
+    def refresh_frame_stats(self):
+        self.stats_overlay.setText(self.frame_stats.summary_text())
+        self.stats_overlay.adjustSize()
+        self.stats_overlay.raise_()
+
+    def toggle_frame_log(self, on):
+        """Write per-frame timings as JSON lines while the button is down."""
+        if not on:
+            self.frame_stats.close_log()
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Log Frame Timings", "search-frames.jsonl", "JSON lines (*.jsonl);;All files (*)")
+        if path:
+            try:
+                self.frame_stats.open_log(path, widget="search", algorithm=self.algo_box.currentText(),
+                                          size=len(self.arr), steps_per_second=self.budget.steps_per_second)
+                return
+            except OSError as e:
+                QMessageBox.warning(self, "Log Failed", str(e))
+        # cancelled or failed: pop the button back up
+        self.frame_log_btn.blockSignals(True)
+        self.frame_log_btn.setChecked(False)
+        self.frame_log_btn.blockSignals(False)
 
     # ---------------------------
     def on_back(self):
         if self.timer.isActive():
             self.timer.stop()
+        self.close_stream()
+        self.frame_stats.close_log()
+        self.finish_text_load()
         self.close()
         self.backToHomeSignal.emit()
 
@@ -331,7 +935,6 @@ class SearchingVisualizer(QWidget):
 # Standalone test
 if __name__ == "__main__":
     import sys
-    from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
     win = SearchingVisualizer()
     win.show()
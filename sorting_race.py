@@ -0,0 +1,279 @@
+# sorting_race.py
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QLabel, QSlider,
+    QGraphicsView, QGraphicsScene, QListWidget, QListWidgetItem, QSizePolicy, QMessageBox
+)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont, QGuiApplication
+import time
+
+from engine import (
+    MAX_RATE_POSITION, OP_SWAP, OP_WRITE, SORTING_ALGORITHMS, BackgroundStream, FrameBudget, apply_step,
+    counter_labels, finish_places, frame_interval_ms, slider_rate,
+)
+from sorting_visualizer import BarChart
+
+MIN_LANES = 2
+MAX_LANES = 6
+
+# Steps applied to one lane before moving on to the next, so that when a
+# frame runs out of time every lane has advanced by (almost) the same amount
+ROUND_STEPS = 256
+
+
+class RaceLane:
+    """One algorithm in the race: its worker stream, array copy and pane."""
+
+    def __init__(self, algo, data, options):
+        self.algo = algo
+        self.data = list(data)
+        self.stream = BackgroundStream("sort", algo, (list(data),), options)
+        self.step = 0
+        self.comparisons = 0
+        self.swaps = 0
+        self.place = None         # finishing position by total steps, once the stream is exhausted
+        self.failed = False
+        self.changed = set()
+        self.highlight = None
+
+        self.scene = QGraphicsScene()
+        self.view = QGraphicsView(self.scene)
+        self.view.setMinimumHeight(170)
+        self.view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.chart = BarChart(self.scene, self.view)
+        self.chart.maxh = 150
+        self.title = QLabel(algo)
+        self.title.setFont(QFont("Arial", 12, QFont.Bold))
+        self.counters = QLabel("")
+        self.counters.setFont(QFont("Arial", 10))
+        self.counters.setWordWrap(True)
+
+    @property
+    def running(self):
+        return self.place is None and not self.failed
+
+    def advance(self, target):
+        """Apply steps until this lane reaches step `target`; False if it had to wait."""
+        data = self.data
+        while self.step < target:
+            step = self.stream.next_step()
+            if step is None:
+                return False
+            highlight = apply_step(data, step)
+            if step[0] == OP_SWAP or step[0] == OP_WRITE:
+                self.changed.update(highlight)
+            self.highlight = highlight
+            self.comparisons = step[3]
+            self.swaps = step[4]
+            self.step += 1
+        return True
+
+    def build(self):
+        self.chart.build(self.data)
+        # BarChart pads its scene to at least 800px; squeeze that into the pane
+        self.view.fitInView(self.scene.sceneRect(), Qt.IgnoreAspectRatio)
+
+    def draw(self):
+        if self.highlight is not None:
+            self.chart.update(self.data, self.highlight, self.changed)
+            self.changed = set()
+            self.highlight = None
+
+    def show_counters(self):
+        first, second = counter_labels(self.algo)
+        text = f"{first}: {self.comparisons:,}   {second}: {self.swaps:,}   steps: {self.step:,}"
+        if self.failed:
+            text = f"failed: {self.stream.error}"
+        elif self.place is not None:
+            text = f"#{self.place} finished - " + text
+        self.counters.setText(text)
+
+    def close(self):
+        self.stream.close()
+
+
+class SortingRace(QWidget):
+    """Plays several sorting algorithms on the same input side by side.
+
+    Every lane generates its trace in its own worker process. One timer and
+    one FrameBudget drive all panes, and each frame moves every lane to the
+    same step number, so the panes show the same amount of work and the
+    algorithm needing fewer steps visibly finishes first.
+    """
+
+    def __init__(self, data, selected=(), options=None):
+        super().__init__()
+        self.setWindowTitle("Sorting Race - algoQUIST")
+        self.setGeometry(120, 60, 1200, 820)
+        self.input = list(data)
+        self.options = options or {}
+        self.lanes = []
+        self.target = 0           # step number every lane is being moved to
+        self.finished = 0
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.play_frame)
+        self.budget = FrameBudget()
+        self.initUI(selected)
+
+    def initUI(self, selected):
+        main_layout = QVBoxLayout()
+
+        title = QLabel(f"Sorting Race - {len(self.input):,} elements")
+        title.setFont(QFont("Arial", 18, QFont.Bold))
+        title.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.algo_list = QListWidget()
+        self.algo_list.setFixedHeight(64)
+        self.algo_list.setFlow(QListWidget.LeftToRight)
+        self.algo_list.setWrapping(True)
+        for algo in SORTING_ALGORITHMS:
+            item = QListWidgetItem(algo)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if algo in selected else Qt.Unchecked)
+            self.algo_list.addItem(item)
+        controls.addWidget(self.algo_list, 1)
+
+        buttons = QVBoxLayout()
+        self.start_btn = QPushButton("Start Race")
+        self.start_btn.clicked.connect(self.start_race)
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.close)
+        for btn in (self.start_btn, self.pause_btn, self.close_btn):
+            buttons.addWidget(btn)
+        controls.addLayout(buttons)
+        main_layout.addLayout(controls)
+
+        speed_layout = QHBoxLayout()
+        speed_layout.addWidget(QLabel("Speed:"))
+        self.speed_slider = QSlider(Qt.Horizontal)
+        self.speed_slider.setRange(0, MAX_RATE_POSITION)     # log scale: 1 .. 100,000 steps/s
+        self.speed_slider.setValue(25)
+        self.speed_slider.valueChanged.connect(self.on_speed_changed)
+        self.speed_value_label = QLabel()
+        self.speed_value_label.setFixedWidth(120)
+        speed_layout.addWidget(self.speed_slider, 1)
+        speed_layout.addWidget(self.speed_value_label)
+        main_layout.addLayout(speed_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        main_layout.addWidget(self.status_label)
+
+        self.grid = QGridLayout()
+        main_layout.addLayout(self.grid, 1)
+        self.setLayout(main_layout)
+        self.on_speed_changed()
+
+    # ---------------- Race orchestration ----------------
+
+    def checked_algorithms(self):
+        items = (self.algo_list.item(i) for i in range(self.algo_list.count()))
+        return [item.text() for item in items if item.checkState() == Qt.Checked]
+
+    def start_race(self):
+        algos = self.checked_algorithms()
+        if not MIN_LANES <= len(algos) <= MAX_LANES:
+            QMessageBox.warning(self, "Pick Algorithms",
+                                f"Choose between {MIN_LANES} and {MAX_LANES} algorithms to race.")
+            return
+        self.stop_race()
+        columns = 2 if len(algos) <= 4 else 3
+        for k, algo in enumerate(algos):
+            lane = RaceLane(algo, self.input, self.options.get(algo, {}))
+            pane = QVBoxLayout()
+            pane.addWidget(lane.title)
+            pane.addWidget(lane.view, 1)
+            pane.addWidget(lane.counters)
+            self.grid.addLayout(pane, k // columns, k % columns)
+            self.lanes.append(lane)
+        # let the grid lay out first so each chart sizes itself to its pane
+        QApplication.processEvents()
+        for lane in self.lanes:
+            lane.build()
+            lane.show_counters()
+        self.target = 0
+        self.finished = 0
+        self.status_label.setText("")
+        self.resume()
+
+    def stop_race(self):
+        self.timer.stop()
+        for lane in self.lanes:
+            lane.close()
+        self.lanes = []
+        while self.grid.count():
+            pane = self.grid.takeAt(0).layout()
+            while pane.count():
+                widget = pane.takeAt(0).widget()
+                widget.deleteLater()
+            pane.deleteLater()
+
+    def resume(self):
+        self.budget.frame_ms = frame_interval_ms(QGuiApplication.primaryScreen().refreshRate())
+        self.budget.start()
+        self.timer.start(self.budget.frame_ms)
+        self.pause_btn.setText("Pause")
+
+    def toggle_pause(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.pause_btn.setText("Resume")
+        elif self.lanes and self.finished < len(self.lanes):
+            self.resume()
+
+    def on_speed_changed(self):
+        rate = slider_rate(self.speed_slider.value())
+        self.budget.steps_per_second = rate
+        self.speed_value_label.setText(f"{rate:,.0f} steps/s" if rate >= 10 else f"{rate:.1f} steps/s")
+
+    def play_frame(self):
+        """Move every running lane to the same step, round-robin, within the frame budget."""
+        goal = self.target + self.budget.steps_due()
+        deadline = self.budget.deadline()
+        running = [lane for lane in self.lanes if lane.running]
+        while running and self.target < goal and time.perf_counter() < deadline:
+            self.target = min(goal, self.target + ROUND_STEPS)
+            for lane in running:
+                lane.advance(self.target)
+            running = [lane for lane in running if not self.check_finished(lane)]
+        # never run ahead of the lanes: steps not applied this frame are dropped, not queued
+        if running:
+            self.target = min(self.target, max(lane.step for lane in running))
+        for lane in self.lanes:
+            lane.draw()
+            lane.show_counters()
+        if self.finished == len(self.lanes):
+            self.timer.stop()
+            order = sorted((lane for lane in self.lanes if not lane.failed), key=lambda lane: lane.place)
+            self.status_label.setText("Finish order: " + ", ".join(
+                f"{lane.place}. {lane.algo} ({lane.step:,} steps)" for lane in order))
+
+    def check_finished(self, lane):
+        """Mark a lane done once its stream is exhausted (or failed) and re-rank the finishers.
+
+        Places follow each finisher's total step count, not the frame in which
+        its worker happened to be seen done; failed lanes take no place.
+        """
+        if lane.stream.state == BackgroundStream.FAILED:
+            self.finished += 1
+            lane.failed = True
+            return True
+        if lane.stream.finished:
+            self.finished += 1
+            lane.highlight = []
+            done = [other for other in self.lanes if other.place is not None] + [lane]
+            for other, place in zip(done, finish_places([other.step for other in done])):
+                other.place = place
+            return True
+        return False
+
+    def closeEvent(self, event):
+        self.stop_race()
+        super().closeEvent(event)
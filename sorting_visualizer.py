@@ -1,13 +1,136 @@
 # sorting_visualizer.py
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QSlider,
-    QGraphicsView, QGraphicsScene, QSpinBox, QTextEdit, QSizePolicy
+    QGraphicsView, QGraphicsScene, QSpinBox, QTextEdit, QSizePolicy, QFileDialog, QMessageBox
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QBrush, QColor, QPen, QFont
-import random
+from PyQt5.QtGui import QBrush, QColor, QPen, QFont, QGuiApplication
+from itertools import islice
+import os
 import time
-import copy
+
+from engine import (
+    CACHE_MAX_BYTES, CACHE_MIN_STEPS, DISTRIBUTIONS, MAX_RATE_POSITION, OP_SWAP, OP_WRITE, SORT_COLUMNS,
+    SORTING_ALGORITHMS, BackgroundProfile, BackgroundStream, ColumnSummary, FrameBudget, FrameProfiler, StepStream,
+    Timeline, TraceBuffer, TraceFile, TraceFileError, TraceWriter, apply_step,
+    DISTRIBUTION_SORTS, PIVOT_STRATEGIES, aux_cells, cache_path, counter_labels, format_ns, frame_interval_ms,
+    save_trace, generate, pivot_quality, profile_lines, slider_rate, trace_passes,
+)
+
+# Arrays at least this large generate their trace in a worker process
+BACKGROUND_MIN_SIZE = 2000
+
+
+class BarChart:
+    """Retained bar items for one array in a QGraphicsScene.
+
+    build() creates one rect (and label, for small arrays) per element; update()
+    then only repositions and recolors the bars whose value or highlight changed.
+    When the array has more elements than the view has pixels, build() switches
+    to one min/max column per pixel backed by a ColumnSummary, so the item count
+    and the per-step cost depend on the view width rather than on n.
+    """
+
+    spacing = 4
+    maxh = 360
+
+    def __init__(self, scene, view):
+        self.scene = scene
+        self.view = view
+        self.pen = QPen(Qt.black)
+        self.default_brush = QBrush(QColor(100, 149, 237))   # default blue
+        self.range_brush = QBrush(QColor(176, 196, 222))     # min..max spread of a column
+        self.highlight_brush = QBrush(QColor(255, 99, 71))   # red highlight
+        self.rects = []
+        self.labels = []
+        self.ranges = []
+        self.highlight = set()
+        self.summary = None
+        self.width = 6
+        self.max_val = 1
+
+    def build(self, data, highlight=None):
+        self.scene.clear()
+        self.rects = []
+        self.labels = []
+        self.ranges = []
+        self.summary = None
+        self.highlight = set(highlight or [])
+        n = len(data)
+        self.max_val = max(data) if data else 1
+        columns = self.view.viewport().width()
+        if n > columns:
+            self._build_columns(data, columns)
+            return
+        if n * (6 + self.spacing) <= columns:
+            self.bar_pen = self.pen
+            self.bar_spacing = self.spacing
+            self.width = max(6, int(self.view.width() / (n + 1)))  # adaptive bar width
+        else:
+            # too many bars for outlines and gaps: pack them edge to edge
+            self.bar_pen = QPen(Qt.NoPen)
+            self.bar_spacing = 0
+            self.width = max(1, columns // n)
+        for i, val in enumerate(data):
+            brush = self.highlight_brush if i in self.highlight else self.default_brush
+            x, y, h = self._geometry(i, val)
+            self.rects.append(self.scene.addRect(x, y, self.width, h, self.bar_pen, brush))
+            # draw value label if few elements
+            if n <= 20:
+                label = self.scene.addText(str(val))
+                label.setPos(x, y - 18)
+                self.labels.append(label)
+        self.view.setSceneRect(0, 0, max(800, n * (self.width + self.bar_spacing)), self.maxh + 50)
+        self.view.update()
+
+    def update(self, data, highlight, changed=()):
+        highlight = set(highlight)
+        if self.summary is not None:
+            self._update_columns(data, highlight, changed)
+            return
+        for i in self.highlight.union(highlight, changed):
+            x, y, h = self._geometry(i, data[i])
+            rect = self.rects[i]
+            rect.setRect(x, y, self.width, h)
+            rect.setBrush(self.highlight_brush if i in highlight else self.default_brush)
+            if self.labels:
+                self.labels[i].setPlainText(str(data[i]))
+                self.labels[i].setPos(x, y - 18)
+        self.highlight = highlight
+
+    def _geometry(self, i, val):
+        h = int((val / self.max_val) * self.maxh)
+        return i * (self.width + self.bar_spacing), self.maxh - h, h
+
+    # ----- aggregated (level-of-detail) mode -----
+
+    def _build_columns(self, data, columns):
+        self.summary = ColumnSummary(data, columns)
+        no_pen = QPen(Qt.NoPen)
+        hot = {self.summary.column_of(i) for i in self.highlight}
+        for c in range(self.summary.columns):
+            # light bar up to the column max, solid bar up to the column min
+            self.ranges.append(self.scene.addRect(0, 0, 1, 0, no_pen, self.range_brush))
+            self.rects.append(self.scene.addRect(0, 0, 1, 0, no_pen, self.default_brush))
+            self._set_column(c, c in hot)
+        self.view.setSceneRect(0, 0, max(800, self.summary.columns), self.maxh + 50)
+        self.view.update()
+
+    def _update_columns(self, data, highlight, changed):
+        touched = self.summary.refresh(data, self.highlight.union(highlight, changed))
+        hot = {self.summary.column_of(i) for i in highlight}
+        for c in touched:
+            self._set_column(c, c in hot)
+        self.highlight = highlight
+
+    def _set_column(self, c, hot):
+        hi = int((self.summary.maxs[c] / self.max_val) * self.maxh)
+        lo = int((self.summary.mins[c] / self.max_val) * self.maxh)
+        self.ranges[c].setRect(c, self.maxh - hi, 1, hi)
+        self.rects[c].setRect(c, self.maxh - lo, 1, lo)
+        self.ranges[c].setBrush(self.highlight_brush if hot else self.range_brush)
+        self.rects[c].setBrush(self.highlight_brush if hot else self.default_brush)
+
 
 class SortingVisualizer(QWidget):
     backToHomeSignal = pyqtSignal()
@@ -35,20 +158,27 @@ class SortingVisualizer(QWidget):
         # === Algorithm selection ===
         algo_label = QLabel("Algorithm:")
         self.algo_combo = QComboBox()
-        self.algo_combo.addItems(["Bubble Sort", "Selection Sort", "Insertion Sort", "Quick Sort", "Merge Sort"])
+        self.algo_combo.addItems(list(SORTING_ALGORITHMS))
         self.algo_combo.setFixedWidth(160)
         algo_layout.addWidget(algo_label)
         algo_layout.addWidget(self.algo_combo)
 
+        # pivot strategy, only used by Introsort
+        self.pivot_combo = QComboBox()
+        self.pivot_combo.addItems(PIVOT_STRATEGIES)
+        self.pivot_combo.setToolTip("Introsort pivot strategy")
+        self.pivot_combo.setFixedWidth(130)
+        algo_layout.addWidget(self.pivot_combo)
+
         # === Array size slider + spinbox ===
         size_label = QLabel("Array size:")
         self.size_spin = QSpinBox()
-        self.size_spin.setRange(5, 40)
+        self.size_spin.setRange(5, 1000000)
         self.size_spin.setValue(20)
-        self.size_spin.setFixedWidth(70)
+        self.size_spin.setFixedWidth(90)
 
         self.size_slider = QSlider(Qt.Horizontal)
-        self.size_slider.setRange(5, 40)
+        self.size_slider.setRange(5, 1000000)
         self.size_slider.setValue(20)
         self.size_slider.setFixedWidth(220)
         self.size_slider.valueChanged.connect(self.size_spin.setValue)
@@ -60,10 +190,24 @@ class SortingVisualizer(QWidget):
         size_layout.addWidget(self.size_spin)
         algo_layout.addLayout(size_layout)
 
+        # === Input distribution + seed ("auto" draws a fresh array every time) ===
+        self.dist_combo = QComboBox()
+        self.dist_combo.addItems(DISTRIBUTIONS)
+        self.dist_combo.setToolTip("Input distribution")
+        self.dist_combo.setFixedWidth(120)
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(-1, 999999)
+        self.seed_spin.setSpecialValueText("auto")
+        self.seed_spin.setValue(-1)
+        self.seed_spin.setPrefix("seed ")
+        self.seed_spin.setFixedWidth(100)
+        algo_layout.addWidget(self.dist_combo)
+        algo_layout.addWidget(self.seed_spin)
+
         control_layout.addLayout(algo_layout)
 
         # === Generate / Start / Reset buttons ===
-        self.generate_btn = QPushButton("Generate Random Array")
+        self.generate_btn = QPushButton("Generate Array")
         self.generate_btn.clicked.connect(self.generate_array)
         self.start_btn = QPushButton("Start Sorting")
         self.start_btn.clicked.connect(self.start_sorting)
@@ -72,16 +216,32 @@ class SortingVisualizer(QWidget):
         control_layout.addWidget(self.generate_btn)
         control_layout.addWidget(self.start_btn)
         control_layout.addWidget(self.reset_btn)
+        self.race_btn = QPushButton("Race...")
+        self.race_btn.setToolTip("Play several algorithms side by side on this array")
+        self.race_btn.clicked.connect(self.open_race)
+        control_layout.addWidget(self.race_btn)
+
+        # === Trace export / import ===
+        self.save_trace_btn = QPushButton("Save Trace")
+        self.save_trace_btn.clicked.connect(self.save_trace_dialog)
+        self.load_trace_btn = QPushButton("Load Trace")
+        self.load_trace_btn.clicked.connect(self.load_trace_dialog)
+        control_layout.addWidget(self.save_trace_btn)
+        control_layout.addWidget(self.load_trace_btn)
 
         # === Speed control ===
         speed_label = QLabel("Speed:")
         self.speed_slider = QSlider(Qt.Horizontal)
-        self.speed_slider.setRange(1, 1000)   # maps to timer interval ms (fast -> small ms)
-        self.speed_slider.setValue(200)
+        self.speed_slider.setRange(0, MAX_RATE_POSITION)     # log scale: 1 .. 100,000 steps/s
+        self.speed_slider.setValue(7)
         self.speed_slider.setFixedWidth(200)
+        self.speed_value_label = QLabel()
+        self.speed_value_label.setFixedWidth(120)
+        self.speed_slider.valueChanged.connect(self.on_speed_changed)
         speed_layout = QHBoxLayout()
         speed_layout.addWidget(speed_label)
         speed_layout.addWidget(self.speed_slider)
+        speed_layout.addWidget(self.speed_value_label)
         control_layout.addLayout(speed_layout)
 
         # === Back button ===
@@ -97,6 +257,41 @@ class SortingVisualizer(QWidget):
         self.view.setMinimumHeight(420)
         self.view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         viz_layout.addWidget(self.view)
+        self.chart = BarChart(self.scene, self.view)
+
+        # frame stats overlay: a widget over the view, not a scene item, so it never dirties the scene
+        self.stats_overlay = QLabel(self.view)
+        self.stats_overlay.setStyleSheet(
+            "background: rgba(0, 0, 0, 160); color: white; padding: 4px; font-family: monospace;")
+        self.stats_overlay.move(8, 8)
+        self.stats_overlay.hide()
+
+        # === Timeline: scrub, step back/forward, pause ===
+        timeline_layout = QHBoxLayout()
+        self.step_back_btn = QPushButton("◀ Step")
+        self.step_back_btn.clicked.connect(self.step_backward)
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.step_fwd_btn = QPushButton("Step ▶")
+        self.step_fwd_btn.clicked.connect(self.step_forward)
+        self.timeline_slider = QSlider(Qt.Horizontal)
+        self.timeline_slider.setRange(0, 0)
+        self.timeline_slider.valueChanged.connect(self.seek)
+        self.position_label = QLabel("Step 0 / 0")
+        self.position_label.setFixedWidth(200)
+        for w in (self.step_back_btn, self.pause_btn, self.step_fwd_btn):
+            timeline_layout.addWidget(w)
+        timeline_layout.addWidget(self.timeline_slider, 1)
+        timeline_layout.addWidget(self.position_label)
+        self.stats_btn = QPushButton("Frame Stats")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.toggled.connect(self.toggle_frame_stats)
+        self.frame_log_btn = QPushButton("Log Frames...")
+        self.frame_log_btn.setCheckable(True)
+        self.frame_log_btn.toggled.connect(self.toggle_frame_log)
+        timeline_layout.addWidget(self.stats_btn)
+        timeline_layout.addWidget(self.frame_log_btn)
+        viz_layout.addLayout(timeline_layout)
 
         # === Info & Metrics area ===
         info_metrics_layout = QHBoxLayout()
@@ -112,8 +307,9 @@ class SortingVisualizer(QWidget):
         metrics_panel = QVBoxLayout()
         self.comparisons_label = QLabel("Comparisons: 0")
         self.swaps_label = QLabel("Swaps/Assignments: 0")
-        self.time_label = QLabel("Elapsed (simulated): 0.00s")
-        for lbl in (self.comparisons_label, self.swaps_label, self.time_label):
+        self.time_label = QLabel("Animation: 0.00s")
+        self.progress_label = QLabel("")
+        for lbl in (self.comparisons_label, self.swaps_label, self.time_label, self.progress_label):
             lbl.setFont(QFont("Arial", 11))
             metrics_panel.addWidget(lbl)
         metrics_panel.addStretch()
@@ -138,11 +334,34 @@ class SortingVisualizer(QWidget):
 
         # === Internal state ===
         self.data = []
-        self.steps = []               # list of tuples (arr_copy, highlight_indices, comps, swaps)
+        self.steps = None             # StepStream/BackgroundStream of delta steps (op, a, b, comps, swaps)
+        self.trace = None             # TraceBuffer recording every step played
+        self.timeline = None          # keyframe index over self.trace for seeking
+        self.played = 0               # steps pulled from self.steps so far
+        self.replay = None            # iterator over self.trace while replaying played steps
+        self.trace_cache = None       # TraceWriter streaming a long fresh trace into the cache
+        self.cache_settled = False    # the current trace is cached, or will not be
+        self.cached_chunks = 0        # chunks of self.trace already written to self.trace_cache
+        self.run_algo = None          # algorithm, input and options of the current trace, for saving
+        self.run_input = []
+        self.run_options = {}
         self.step_index = 0
         self.timer = QTimer()
-        self.timer.timeout.connect(self.play_step)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.play_frame)
+        self.budget = FrameBudget()
+        self.frame_stats = FrameProfiler()
+        self.stats_timer = QTimer()
+        self.stats_timer.setInterval(250)
+        self.stats_timer.timeout.connect(self.refresh_frame_stats)
         self.start_time = 0.0
+        self.animation_time = 0.0
+        self.race = None              # SortingRace window, if one is open
+        self.profile = None           # BackgroundProfile measuring the real cost of the current run
+        self.profile_timer = QTimer()
+        self.profile_timer.setInterval(100)
+        self.profile_timer.timeout.connect(self.poll_profile)
+        self.on_speed_changed()
 
         # Prepare default array
         self.generate_array()
@@ -155,15 +374,20 @@ class SortingVisualizer(QWidget):
 
     def generate_array(self):
         n = self.size_spin.value()
-        # generate random numbers within range so bars fit nicely
-        self.data = [random.randint(10, 100) for _ in range(n)]
+        seed = self.seed_spin.value()
+        # values stay within 10..100 so bars fit nicely
+        self.data = generate(self.dist_combo.currentText(), n, None if seed < 0 else seed).tolist()
         self.draw_bars()
         # reset metrics & steps
-        self.steps = []
+        self.close_stream()
+        self.close_profile()
+        self.clear_trace()
         self.step_index = 0
         self.comparisons = 0
         self.swaps = 0
         self.update_metrics()
+        self.update_timeline()
+        self.progress_label.setText("")
         self.summary_text.clear()
 
     def reset_all(self):
@@ -173,30 +397,14 @@ class SortingVisualizer(QWidget):
         self.summary_text.clear()
 
     def draw_bars(self, highlight=None):
-        """Draw bars according to self.data. 'highlight' is a list of indices to color."""
-        if highlight is None:
-            highlight = []
-        self.scene.clear()
-        n = len(self.data)
-        width = max(6, int(self.view.width() / (n + 1)))  # adaptive bar width
-        spacing = 4
-        maxh = 360
-        max_val = max(self.data) if self.data else 1
-        for i, val in enumerate(self.data):
-            # scale height
-            h = int((val / max_val) * maxh)
-            x = i * (width + spacing)
-            y = maxh - h
-            color = QColor(100, 149, 237)  # default blue
-            if i in highlight:
-                color = QColor(255, 99, 71)  # red highlight
-            rect = self.scene.addRect(x, y, width, h, QPen(Qt.black), QBrush(color))
-            # draw value label if few elements
-            if n <= 20:
-                self.scene.addText(str(val)).setPos(x, y - 18)
-        # force update
-        self.view.setSceneRect(0, 0, max(800, n * (width + spacing)), maxh + 50)
-        self.view.update()
+        """Rebuild the bar items for self.data. 'highlight' is a list of indices to color."""
+        start = time.perf_counter()
+        self.chart.build(self.data, highlight)
+        self.frame_stats.rebuild((time.perf_counter() - start) * 1000)
+
+    def update_bars(self, highlight, changed=()):
+        """Refresh only the bars changed during the frame and the old/new highlight."""
+        self.chart.update(self.data, highlight, changed)
 
     # ---------------- Sorting orchestration ----------------
 
@@ -204,222 +412,436 @@ class SortingVisualizer(QWidget):
         if self.timer.isActive():
             return  # ignore if already running
         algo = self.algo_combo.currentText()
-        # prepare steps anew from current self.data (do not modify displayed array until animation)
-        self.steps = []
+        # steps are generated lazily from a copy of self.data while the animation plays
         self.comparisons = 0
         self.swaps = 0
-        arr_copy = self.data.copy()
+        if algo not in SORTING_ALGORITHMS:
+            return
 
-        if algo == "Bubble Sort":
-            self.steps = self._bubble_steps(arr_copy)
-        elif algo == "Selection Sort":
-            self.steps = self._selection_steps(arr_copy)
-        elif algo == "Insertion Sort":
-            self.steps = self._insertion_steps(arr_copy)
-        elif algo == "Quick Sort":
-            self.steps = self._quick_steps(arr_copy)
-        elif algo == "Merge Sort":
-            self.steps = self._merge_steps(arr_copy)
+        options = self.algorithm_options(algo)
+        cached = cache_path("sort", algo, self.data, options=options)
+        if os.path.exists(cached):
+            # computed before: replay the saved trace instead of regenerating it
+            try:
+                os.utime(cached)   # mark it recently used for prune_cache
+                self.load_trace_file(cached)
+                return
+            except (OSError, TraceFileError):
+                pass
+
+        self.run_algo = algo
+        self.run_input = self.data.copy()
+        self.run_options = options
+        self.close_stream()
+        self.clear_trace()
+        self.trace = TraceBuffer()
+        self.cache_settled = False
+        if len(self.data) >= BACKGROUND_MIN_SIZE:
+            # keep the GUI responsive: a worker streams steps back through shared memory
+            self.steps = BackgroundStream("sort", algo, (self.data.copy(),), options, trace=self.trace)
         else:
+            self.steps = StepStream(SORTING_ALGORITHMS[algo](self.data.copy(), **options), trace=self.trace)
+        self.timeline = Timeline(self.data, self.trace)
+        self.played = 0
+        self.draw_bars()
+        self.step_index = 0
+        self.start_time = time.time()
+        self.start_profile()
+        self.resume()
+
+    def algorithm_options(self, algo):
+        """Keyword options passed to the step generator (and keyed into the trace cache)."""
+        if algo == "Introsort":
+            return {"pivot": self.pivot_combo.currentText()}
+        return {}
+
+    def resume(self):
+        self.budget.frame_ms = frame_interval_ms(QGuiApplication.primaryScreen().refreshRate())
+        self.budget.start()
+        self.frame_stats.start(self.budget.frame_ms)
+        self.timer.start(self.budget.frame_ms)
+        self.pause_btn.setText("Pause")
+
+    def on_speed_changed(self):
+        rate = slider_rate(self.speed_slider.value())
+        self.budget.steps_per_second = rate
+        self.speed_value_label.setText(f"{rate:,.0f} steps/s" if rate >= 10 else f"{rate:.1f} steps/s")
+
+    def play_frame(self):
+        """Apply every step due this frame, then draw only the resulting state."""
+        if self.steps is None:
+            self.timer.stop()
+            return
+        self.frame_stats.begin()
+        first_step = self.step_index
+        due = self.budget.steps_due()
+        deadline = self.budget.deadline()
+        data = self.data
+        changed = set()
+        highlight = None
+        last = None
+        finished = False
+        next_keyframe = self.timeline.next_keyframe
+        for k in range(due):
+            step = self.next_step()
+            if step is None:
+                # a background stream may just not have produced the next chunk yet
+                finished = self.steps.finished
+                break
+            highlight = apply_step(data, step)
+            if step[0] == OP_SWAP or step[0] == OP_WRITE:
+                changed.update(highlight)
+            last = step
+            self.step_index += 1
+            if self.step_index == next_keyframe:
+                self.timeline.record(self.step_index, data)
+                next_keyframe = self.timeline.next_keyframe
+            # stop early rather than overrun the frame on very high rates
+            if k & 1023 == 1023 and time.perf_counter() > deadline:
+                break
+        self.frame_stats.applied()
+        if last is not None:
+            self.comparisons = last[3]
+            self.swaps = last[4]
+            self.update_bars(highlight, changed)
+            self.update_metrics()
+            self.update_timeline()
+        self.frame_stats.end(self.step_index - first_step)
+        self.update_cache()
+        if isinstance(self.steps, BackgroundStream) and not self.show_progress():
+            return
+        if finished:
+            self.finish_sorting()
+
+    def next_step(self):
+        """Next step to play: replayed from the trace after a seek, else pulled from the stream."""
+        if self.step_index < self.played:
+            if self.replay is None:
+                self.replay = self.trace.iter_from(self.step_index)
+            step = next(self.replay)
+            if self.step_index + 1 == self.played:
+                self.replay = None
+            return step
+        step = self.steps.next_step()
+        if step is not None:
+            self.played += 1
+        return step
+
+    # ---------------- Timeline (seek / step / pause) ----------------
+
+    def update_timeline(self):
+        self.timeline_slider.blockSignals(True)
+        self.timeline_slider.setMaximum(self.played)
+        self.timeline_slider.setValue(self.step_index)
+        self.timeline_slider.blockSignals(False)
+        self.position_label.setText(f"Step {self.step_index:,} / {self.played:,}")
+
+    def seek(self, position):
+        """Jump to the state after `position` played steps (keyframe + replayed deltas)."""
+        if self.timeline is None:
             return
+        self.pause()
+        self.replay = None
+        self.data, highlight, self.comparisons, self.swaps = self.timeline.seek(min(position, self.played))
+        self.step_index = min(position, self.played)
+        self.draw_bars(highlight)
+        self.update_metrics()
+        self.update_timeline()
+
+    def step_backward(self):
+        if self.step_index > 0:
+            self.seek(self.step_index - 1)
 
-        if not self.steps:
+    def step_forward(self):
+        if self.steps is None:
             return
+        self.pause()
+        step = self.next_step()
+        if step is None:
+            if self.steps.finished:
+                self.finish_sorting()
+            return
+        highlight = apply_step(self.data, step)
+        self.step_index += 1
+        if self.step_index == self.timeline.next_keyframe:
+            self.timeline.record(self.step_index, self.data)
+        self.comparisons, self.swaps = step[3], step[4]
+        self.update_bars(highlight)
+        self.update_metrics()
+        self.update_timeline()
 
-        self.step_index = 0
-        self.start_time = time.time()
-        interval = max(10, self.speed_slider.value())  # ms
-        self.timer.start(interval)
+    def pause(self):
+        self.timer.stop()
+        self.pause_btn.setText("Resume")
 
-    def play_step(self):
-        if self.step_index >= len(self.steps):
+    def toggle_pause(self):
+        if self.timer.isActive():
+            self.pause()
+        elif self.steps is not None:
+            self.resume()
+
+    def show_progress(self):
+        """Show background generation progress; False if the worker failed."""
+        state = self.steps.state
+        if state == BackgroundStream.FAILED:
             self.timer.stop()
-            elapsed = time.time() - self.start_time
-            self.time_label.setText(f"Elapsed (simulated): {elapsed:.3f}s")
-            # final draw to ensure sorted array shown
-            if self.steps:
-                final_arr = self.steps[-1][0]
-                self.data = final_arr.copy()
-                self.draw_bars(highlight=[])
-            # show summary and final metrics
-            self.update_metrics(final=True)
+            self.progress_label.setText(f"Trace generation failed: {self.steps.error}")
+            return False
+        if state == BackgroundStream.RUNNING:
+            self.progress_label.setText(f"Generating trace: {self.steps.produced:,} steps")
+        else:
+            self.progress_label.setText(f"Trace generated: {self.steps.produced:,} steps")
+        return True
+
+    def finish_sorting(self):
+        self.timer.stop()
+        self.animation_time = time.time() - self.start_time
+        self.show_times()
+        # final draw to ensure sorted array shown
+        if self.step_index:
+            self.draw_bars(highlight=[])
+        # show summary and final metrics
+        self.update_metrics(final=True)
+        self.show_execution_summary()
+
+    def open_race(self):
+        """Race several algorithms on the current array in a separate window."""
+        from sorting_race import SortingRace   # imported on first use, like the hub's visualizers
+        current = self.algo_combo.currentText()
+        selected = [current] + [a for a in ("Quick Sort", "Merge Sort") if a != current]
+        options = {"Introsort": self.algorithm_options("Introsort")}
+        if self.race is not None:
+            self.race.close()
+        self.race = SortingRace(self.data, selected, options)
+        self.race.show()
+
+    # ---------------- Real cost (measured off the GUI thread) ----------------
+
+    def start_profile(self):
+        """Time the bare algorithm, its trace recording and its peak memory in a worker."""
+        self.close_profile()
+        if self.run_algo in SORTING_ALGORITHMS:
+            self.profile = BackgroundProfile("sort", self.run_algo, (self.run_input,), self.run_options)
+            self.profile_timer.start()
+
+    def poll_profile(self):
+        if self.profile is None or not self.profile.done:
+            return
+        self.profile_timer.stop()
+        if self.animation_time:
+            self.show_times()
+        if self.summary_text.toPlainText():
             self.show_execution_summary()
+
+    def close_profile(self):
+        self.profile_timer.stop()
+        if self.profile is not None:
+            self.profile.close()
+            self.profile = None
+        self.animation_time = 0.0
+
+    def show_times(self):
+        """Animation wall time next to the measured algorithm time, once known."""
+        text = f"Animation: {self.animation_time:.3f}s"
+        if self.profile is not None and self.profile.result is not None:
+            result = self.profile.result
+            # a cut-short profile only gives a lower bound
+            text += f" · algorithm: {'' if result['complete'] else 'over '}{format_ns(result['bare_ns'])}"
+        self.time_label.setText(text)
+
+    def profile_text(self):
+        if self.profile is None:
+            return ""
+        if not self.profile.done:
+            return "Measured cost: still measuring in a background process...\n"
+        if self.profile.error:
+            return f"Measured cost: unavailable ({self.profile.error})\n"
+        return "".join(line + "\n" for line in profile_lines(self.profile.result))
+
+    # ---------------- Frame stats (render/playback profiling) ----------------
+
+    def toggle_frame_stats(self, on):
+        self.stats_overlay.setVisible(on)
+        if on:
+            self.refresh_frame_stats()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+
+    def refresh_frame_stats(self):
+        self.stats_overlay.setText(self.frame_stats.summary_text())
+        self.stats_overlay.adjustSize()
+        self.stats_overlay.raise_()
+
+    def toggle_frame_log(self, on):
+        """Write per-frame timings as JSON lines while the button is down."""
+        if not on:
+            self.frame_stats.close_log()
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Log Frame Timings", "sort-frames.jsonl", "JSON lines (*.jsonl);;All files (*)")
+        if path:
+            try:
+                self.frame_stats.open_log(path, widget="sort", algorithm=self.algo_combo.currentText(),
+                                          size=len(self.data), steps_per_second=self.budget.steps_per_second)
+                return
+            except OSError as e:
+                QMessageBox.warning(self, "Log Failed", str(e))
+        # cancelled or failed: pop the button back up
+        self.frame_log_btn.blockSignals(True)
+        self.frame_log_btn.setChecked(False)
+        self.frame_log_btn.blockSignals(False)
+
+    # ---------------- Trace files ----------------
+
+    def update_cache(self):
+        """Write long fresh traces to the cache as they are generated, so the next run replays them.
+
+        Writing starts once the trace reaches CACHE_MIN_STEPS and each full
+        chunk is copied as soon as it is recorded; the file is completed when
+        the generator is exhausted, before playback ends, and dropped if the
+        run is abandoned first. Completing a file prunes the cache back to
+        CACHE_MAX_BYTES, least recently used traces first.
+        """
+        trace = self.trace
+        if not isinstance(trace, TraceBuffer) or self.steps is None or self.cache_settled:
+            return
+        try:
+            if self.trace_cache is None:
+                if len(trace) < CACHE_MIN_STEPS:
+                    return
+                path = cache_path("sort", self.run_algo, self.run_input, options=self.run_options)
+                if os.path.exists(path):
+                    self.cache_settled = True
+                    return
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.trace_cache = TraceWriter(path, "sort", self.run_algo, self.run_input, SORT_COLUMNS,
+                                               options=self.run_options, budget=CACHE_MAX_BYTES)
+                self.cached_chunks = 0
+            writer = self.trace_cache
+            for chunk in trace.chunks[self.cached_chunks:]:
+                writer.write_columns(chunk)
+                self.cached_chunks += 1
+            if self.steps.exhausted:
+                # the steps not yet sealed into a chunk are iter_chunks()'s last entry
+                for arrays in islice(trace.iter_chunks(), self.cached_chunks, None):
+                    writer.write_columns(arrays)
+                last = trace[len(trace) - 1]
+                self.trace_cache = None
+                self.cache_settled = True
+                writer.close(counters={"comparisons": last[3], "swaps": last[4]})
+        except OSError:
+            self.abort_cache()   # caching is best effort
+            self.cache_settled = True
+
+    def abort_cache(self):
+        """Drop a cache file still being written (the run ended before its generator did)."""
+        if self.trace_cache is None:
             return
+        writer, self.trace_cache = self.trace_cache, None
+        try:
+            writer.abort()
+        except OSError:
+            pass
 
-        arr_state, highlight, comps, swaps = self.steps[self.step_index]
-        # update running comps/swaps
-        self.comparisons = comps
-        self.swaps = swaps
-        # set data shown to current arr_state
-        self.data = arr_state.copy()
-        self.draw_bars(highlight=highlight)
-        self.update_metrics()
-        self.step_index += 1
+    def write_trace(self, path):
+        save_trace(path, self.trace, "sort", self.run_algo, self.run_input, options=self.run_options,
+                   counters={"comparisons": self.comparisons, "swaps": self.swaps})
+
+    def save_trace_dialog(self):
+        if self.trace is None or not len(self.trace):
+            QMessageBox.information(self, "No Trace", "Run a sort before saving its trace.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "trace.aqt", "Trace (*.aqt);;Compressed trace (*.aqtz)")
+        if not path:
+            return
+        try:
+            self.write_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Save Failed", str(e))
+
+    def load_trace_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Trace", "", "Traces (*.aqt *.aqtz);;All files (*)")
+        if not path:
+            return
+        try:
+            self.load_trace_file(path)
+        except (OSError, TraceFileError) as e:
+            QMessageBox.warning(self, "Load Failed", str(e))
+
+    def load_trace_file(self, path):
+        """Replay a saved trace: every step is already recorded, so play straight from it."""
+        trace = TraceFile(path)
+        if trace.kind != "sort":
+            trace.close()
+            raise TraceFileError(f"{path} is a {trace.kind} trace, not a sorting trace")
+        self.timer.stop()
+        self.close_stream()
+        self.clear_trace()
+        self.trace = trace
+        self.run_algo = trace.algorithm
+        self.run_input = trace.input.tolist()
+        self.run_options = trace.options
+        if trace.algorithm in SORTING_ALGORITHMS:
+            self.algo_combo.setCurrentText(trace.algorithm)
+        if "pivot" in trace.options:
+            self.pivot_combo.setCurrentText(trace.options["pivot"])
+        self.data = self.run_input.copy()
+        self.timeline = Timeline(self.data, trace)
+        self.played = len(trace)
+        self.steps = StepStream(iter(()))
+        self.step_index = 0
+        self.comparisons = 0
+        self.swaps = 0
+        self.progress_label.setText(f"Replaying {os.path.basename(path)}: {len(trace):,} steps")
+        self.summary_text.clear()
+        self.draw_bars()
+        self.start_time = time.time()
+        self.start_profile()
+        self.resume()
+
+    def close_stream(self):
+        """Stop any step producer (cancelling a background worker)."""
+        self.abort_cache()
+        if self.steps is not None:
+            self.steps.close()
+            self.steps = None
+
+    def clear_trace(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+        self.timeline = None
+        self.played = 0
+        self.replay = None
 
     def update_metrics(self, final=False):
-        self.comparisons_label.setText(f"Comparisons: {self.comparisons}")
-        self.swaps_label.setText(f"Swaps/Assignments: {self.swaps}")
+        first, second = counter_labels(self.run_algo)
+        self.comparisons_label.setText(f"{first}: {self.comparisons}")
+        self.swaps_label.setText(f"{second}: {self.swaps}")
         if final:
-            # keep elapsed time already set in play_step
+            # keep elapsed time already set in finish_sorting
             pass
 
     def go_back(self):
+        self.timer.stop()
+        if self.race is not None:
+            self.race.close()
+            self.race = None
+        self.close_stream()
+        self.close_profile()
+        self.frame_stats.close_log()
         # signal main to show home and close this window
         self.backToHomeSignal.emit()
         self.close()
 
-    # ---------------- Algorithms that produce step lists ----------------
-    # Each step is (arr_copy, highlight_indices, comparisons_so_far, swaps_so_far)
-
-    def _bubble_steps(self, arr):
-        steps = []
-        comps = 0
-        swaps = 0
-        n = len(arr)
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                comps += 1
-                steps.append((arr.copy(), [j, j + 1], comps, swaps))
-                if arr[j] > arr[j + 1]:
-                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                    swaps += 1
-                    steps.append((arr.copy(), [j, j + 1], comps, swaps))
-        # final state
-        steps.append((arr.copy(), [], comps, swaps))
-        return steps
-
-    def _selection_steps(self, arr):
-        steps = []
-        comps = 0
-        swaps = 0
-        n = len(arr)
-        for i in range(n):
-            min_idx = i
-            for j in range(i + 1, n):
-                comps += 1
-                steps.append((arr.copy(), [min_idx, j], comps, swaps))
-                if arr[j] < arr[min_idx]:
-                    min_idx = j
-                    # highlight new min as change (no swap yet)
-                    steps.append((arr.copy(), [min_idx], comps, swaps))
-            # swap minimum into position i
-            if min_idx != i:
-                arr[i], arr[min_idx] = arr[min_idx], arr[i]
-                swaps += 1
-                steps.append((arr.copy(), [i, min_idx], comps, swaps))
-        steps.append((arr.copy(), [], comps, swaps))
-        return steps
-
-    def _insertion_steps(self, arr):
-        steps = []
-        comps = 0
-        swaps = 0  # here count assignments/shifts as swaps for demonstration
-        n = len(arr)
-        for i in range(1, n):
-            key = arr[i]
-            j = i - 1
-            # show initial key
-            steps.append((arr.copy(), [i], comps, swaps))
-            while j >= 0:
-                comps += 1
-                steps.append((arr.copy(), [j, j + 1], comps, swaps))
-                if arr[j] > key:
-                    arr[j + 1] = arr[j]
-                    swaps += 1
-                    steps.append((arr.copy(), [j, j + 1], comps, swaps))
-                    j -= 1
-                else:
-                    break
-            arr[j + 1] = key
-            swaps += 1
-            steps.append((arr.copy(), [j + 1], comps, swaps))
-        steps.append((arr.copy(), [], comps, swaps))
-        return steps
-
-    def _quick_steps(self, arr):
-        steps = []
-        comps = 0
-        swaps = 0
-
-        def partition(a, low, high):
-            nonlocal comps, swaps, steps
-            pivot = a[high]
-            i = low - 1
-            for j in range(low, high):
-                comps += 1
-                steps.append((a.copy(), [j, high], comps, swaps))
-                if a[j] < pivot:
-                    i += 1
-                    a[i], a[j] = a[j], a[i]
-                    swaps += 1
-                    steps.append((a.copy(), [i, j], comps, swaps))
-            a[i + 1], a[high] = a[high], a[i + 1]
-            swaps += 1
-            steps.append((a.copy(), [i + 1, high], comps, swaps))
-            return i + 1
-
-        def quicksort(a, low, high):
-            if low < high:
-                p = partition(a, low, high)
-                quicksort(a, low, p - 1)
-                quicksort(a, p + 1, high)
-
-        quicksort(arr, 0, len(arr) - 1)
-        steps.append((arr.copy(), [], comps, swaps))
-        return steps
-
-    def _merge_steps(self, arr):
-        steps = []
-        comps = 0
-        swaps = 0  # count assignments into main array as swaps/assignments
-
-        def merge(a, l, m, r):
-            nonlocal comps, swaps, steps
-            L = a[l:m+1]
-            R = a[m+1:r+1]
-            i = j = 0
-            k = l
-            while i < len(L) and j < len(R):
-                comps += 1
-                steps.append((a.copy(), [k], comps, swaps))
-                if L[i] <= R[j]:
-                    a[k] = L[i]
-                    i += 1
-                    swaps += 1
-                else:
-                    a[k] = R[j]
-                    j += 1
-                    swaps += 1
-                steps.append((a.copy(), [k], comps, swaps))
-                k += 1
-            while i < len(L):
-                a[k] = L[i]
-                i += 1
-                k += 1
-                swaps += 1
-                steps.append((a.copy(), [k-1], comps, swaps))
-            while j < len(R):
-                a[k] = R[j]
-                j += 1
-                k += 1
-                swaps += 1
-                steps.append((a.copy(), [k-1], comps, swaps))
-
-        def mergesort(a, l, r):
-            if l < r:
-                m = (l + r) // 2
-                mergesort(a, l, m)
-                mergesort(a, m+1, r)
-                merge(a, l, m, r)
-
-        mergesort(arr, 0, len(arr) - 1)
-        steps.append((arr.copy(), [], comps, swaps))
-        return steps
-
     # ---------------- Execution summary (post-run) ----------------
 
     def show_algorithm_info(self):
         algo = self.algo_combo.currentText()
+        self.pivot_combo.setEnabled(algo == "Introsort")
         text = ""
         if algo == "Bubble Sort":
             text = ("Bubble Sort:\n"
@@ -442,10 +864,36 @@ class SortingVisualizer(QWidget):
             text = ("Merge Sort:\n"
                     "- Recursively divides and merges sorted halves.\n"
                     "- Best/Average/Worst: O(n log n). Space: O(n). Stable.\n")
+        elif algo == "Merge Sort (Bottom-up)":
+            text = ("Merge Sort (Bottom-up):\n"
+                    "- Finds the ascending runs already present, then merges neighbouring runs pass by pass.\n"
+                    "- Passes alternate between the array and one preallocated buffer; nothing else is allocated.\n"
+                    "- Best: O(n) (already sorted or reversed). Average/Worst: O(n log n). Space: O(n). Stable.\n")
+        elif algo == "Introsort":
+            text = ("Introsort (iterative Quick Sort):\n"
+                    "- Hoare partitioning around a random, median-of-three or ninther pivot, using an explicit stack.\n"
+                    "- Small partitions finish with insertion sort; too-deep partitions fall back to heapsort.\n"
+                    "- Best/Average/Worst: O(n log n). Space: O(log n). Not stable.\n")
+        elif algo == "Counting Sort":
+            text = ("Counting Sort:\n"
+                    "- Counts how often each integer key occurs, then writes the keys back in order.\n"
+                    "- Best/Average/Worst: O(n + k) for key range k. Space: O(k). No comparisons.\n")
+        elif algo == "LSD Radix Sort":
+            text = ("LSD Radix Sort:\n"
+                    "- Distributes by each decimal digit, least significant first, into 10 buckets.\n"
+                    "- Best/Average/Worst: O(d·(n + b)) for d digits, base b. Space: O(n + b). Stable.\n")
+        elif algo == "MSD Radix Sort":
+            text = ("MSD Radix Sort:\n"
+                    "- Splits by the most significant digit, then refines each bucket on the next digit.\n"
+                    "- Best/Average/Worst: O(d·(n + b)). Space: O(n + d·b). Stable.\n")
+        elif algo == "Bucket Sort":
+            text = ("Bucket Sort:\n"
+                    "- Spreads values over n equal-width buckets, keeps each bucket sorted, concatenates.\n"
+                    "- Average: O(n) for evenly spread keys. Worst: O(n²) (all in one bucket). Space: O(n). Stable.\n")
         self.info_box.setPlainText(text)
 
     def show_execution_summary(self):
-        algo = self.algo_combo.currentText()
+        algo = self.run_algo
         comps = self.comparisons
         swaps = self.swaps
         # time label already set
@@ -475,10 +923,46 @@ class SortingVisualizer(QWidget):
         elif algo == "Merge Sort":
             best = avg = worst = "O(n log n) — divides and merges consistently."
             reason_best = reason_avg = reason_worst = "Always divides array in halves, merging cost O(n) at each level; depth log n."
+        elif algo == "Merge Sort (Bottom-up)":
+            best = "O(n) — one run-detection pass when the input is already a single run."
+            avg = worst = "O(n log n) — each merge pass halves the number of runs."
+            reason_best = "Sorted (or strictly reversed) input is one natural run, so no merge pass is needed."
+            reason_avg = "r runs need log2(r) passes of n writes each, all through the same reusable buffer."
+        elif algo == "Introsort":
+            best = avg = worst = "O(n log n) — heapsort fallback caps the partition depth at 2·log2(n)."
+            reason_best = "Sampled pivots split most partitions near the middle, and Hoare partitioning swaps only misplaced pairs."
+            reason_worst = "If pivots keep splitting badly, the depth limit switches that range to heapsort instead of degrading to O(n²)."
+        elif algo == "Counting Sort":
+            best = avg = worst = "O(n + k) — one counting pass plus one write per element, k = key range."
+            reason_best = "No comparisons: each key indexes its own counter, so cost depends on n and the key range only."
+        elif algo in ("LSD Radix Sort", "MSD Radix Sort"):
+            best = avg = worst = "O(d·(n + b)) — one distribution pass per digit (d digits, base b)."
+            reason_best = "Each pass moves every element once into a digit bucket and back; no element comparisons."
+        elif algo == "Bucket Sort":
+            best = avg = "O(n) — keys spread evenly, about one element per bucket."
+            worst = "O(n²) — all keys land in one bucket and are inserted one by one."
+            reason_best = "Even keys keep buckets tiny, so inserting into a bucket is constant time."
+            reason_worst = "Clustered keys overload a few buckets, making the in-bucket insertions quadratic."
 
         summary = f"Algorithm: {algo}\n\n"
-        summary += f"Comparisons performed: {comps}\n"
-        summary += f"Swaps/Assignments performed: {swaps}\n\n"
+        first, second = counter_labels(algo)
+        summary += f"{first} performed: {comps}\n"
+        summary += f"{second} performed: {swaps}\n"
+        if algo in DISTRIBUTION_SORTS and self.trace is not None:
+            summary += f"Distribution passes: {trace_passes(self.trace, algo)}\n"
+        aux = aux_cells(algo, self.run_input)
+        if aux:
+            summary += f"Auxiliary memory (peak): {aux:,} elements\n"
+        if algo == "Introsort" and self.trace is not None:
+            quality = pivot_quality(self.trace)
+            if quality is not None:
+                summary += (f"Pivot quality ({self.run_options.get('pivot', '')}): {quality['partitions']:,} partitions, "
+                            f"smaller side {quality['mean']:.0%} on average, {quality['worst']:.0%} at worst\n")
+        if self.trace is not None:
+            where = "spilled to disk" if self.trace.spilled else "in memory"
+            summary += f"Trace: {len(self.trace)} steps, {self.trace.nbytes() / 1e6:.2f} MB ({where})\n"
+        summary += self.profile_text()
+        summary += "\n"
         summary += "Complexities:\n"
         if algo == "Bubble Sort":
             summary += f"- Best: {best}\n- Average: {avg}\n- Worst: {worst}\n"
@@ -490,6 +974,14 @@ class SortingVisualizer(QWidget):
             summary += f"- Best: {best}\n- Average: {avg}\n- Worst: {worst}\n"
         elif algo == "Merge Sort":
             summary += f"- Best/Average/Worst: {best}\n"
+        elif algo == "Merge Sort (Bottom-up)":
+            summary += f"- Best: {best}\n- Average/Worst: {avg}\n"
+        elif algo == "Introsort":
+            summary += f"- Best/Average/Worst: {best}\n"
+        elif algo == "Bucket Sort":
+            summary += f"- Best/Average: {best}\n- Worst: {worst}\n"
+        elif algo in DISTRIBUTION_SORTS:
+            summary += f"- Best/Average/Worst: {best}\n"
         summary += "\nWhy (short explanation):\n"
         if algo == "Bubble Sort":
             summary += reason_best + "\n" + reason_avg
@@ -501,6 +993,12 @@ class SortingVisualizer(QWidget):
             summary += reason_best + "\n" + reason_worst
         elif algo == "Merge Sort":
             summary += reason_best
+        elif algo == "Merge Sort (Bottom-up)":
+            summary += reason_best + "\n" + reason_avg
+        elif algo in ("Introsort", "Bucket Sort"):
+            summary += reason_best + "\n" + reason_worst
+        elif algo in DISTRIBUTION_SORTS:
+            summary += reason_best
 
         self.summary_text.setPlainText(summary)
 
@@ -0,0 +1,47 @@
+"""Startup timing for the hub: phase marks and an -X importtime breakdown."""
+import sys
+import time
+
+_START = time.perf_counter()
+_PHASES = []
+
+
+def mark(phase):
+    """Record the time elapsed since this module was imported."""
+    _PHASES.append((phase, time.perf_counter() - _START))
+
+
+def phase_report():
+    lines = ["Startup phases (ms since main.py started):"]
+    for phase, t in _PHASES:
+        lines.append(f"  {t * 1000:9.1f}  {phase}")
+    return "\n".join(lines)
+
+
+def import_breakdown(module, top=15):
+    """Import module in a fresh interpreter with -X importtime and return the
+    slowest imports by self time, formatted like the interpreter's own report."""
+    import subprocess   # only needed for the report, keep it off the startup path
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        except ValueError:
+            continue
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1:] or ["import failed"]
+        return f"{module}: {error[0]}"
+    total = max((cumulative for _, cumulative, name in rows if name.strip() == module), default=0)
+    rows.sort(reverse=True)
+    lines = [f"{module}: {total / 1000:.1f} ms cumulative",
+             "   self [ms] | cumulative [ms] | imported package"]
+    for self_us, cumulative_us, name in rows[:top]:
+        lines.append(f"  {self_us / 1000:10.1f} | {cumulative_us / 1000:15.1f} | {name}")
+    return "\n".join(lines)
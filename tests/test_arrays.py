@@ -0,0 +1,26 @@
+"""parse_values reads separated integers and rejects anything it cannot hold exactly."""
+import numpy as np
+import pytest
+
+from engine import parse_values
+
+
+def test_commas_and_whitespace():
+    assert parse_values("3, 1\n-4\t1,5").tolist() == [3, 1, -4, 1, 5]
+    assert parse_values("  ").dtype == np.int64
+
+
+def test_int64_limits_are_kept():
+    text = f"{2 ** 63 - 1}, {-(2 ** 63)}"
+    assert parse_values(text).tolist() == [2 ** 63 - 1, -(2 ** 63)]
+
+
+@pytest.mark.parametrize("token", ["99999999999999999999", str(2 ** 63), str(-(2 ** 63) - 1)])
+def test_out_of_range_values_are_rejected(token):
+    with pytest.raises(ValueError, match=token):
+        parse_values(f"1, {token}, 2")
+
+
+def test_non_integers_are_rejected():
+    with pytest.raises(ValueError):
+        parse_values("1, 2.5, 3")
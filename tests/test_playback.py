@@ -0,0 +1,11 @@
+"""Race places rank finishers by total steps."""
+from engine import finish_places
+
+
+def test_fewer_steps_finish_first():
+    assert finish_places([900, 120, 4500]) == [2, 1, 3]
+
+
+def test_ties_share_a_place():
+    assert finish_places([50, 10, 50, 70]) == [2, 1, 2, 4]
+    assert finish_places([]) == []
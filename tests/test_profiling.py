@@ -0,0 +1,25 @@
+"""profile_run stays bounded on long runs and never reports a negative overhead."""
+from engine import generate, profile_lines, profile_run
+
+
+def test_long_runs_are_cut_short():
+    data = generate("reversed", 400, seed=1).tolist()
+    result = profile_run("sort", "Bubble Sort", (data,), max_steps=5000, min_ns=0)
+    assert (result["steps"], result["complete"]) == (5000, False)
+    assert "first 5,000 steps" in profile_lines(result)[0]
+
+
+def test_complete_run():
+    data = generate("random", 200, seed=2).tolist()
+    result = profile_run("sort", "Merge Sort", (data,), min_ns=0)
+    assert result["complete"]
+    assert result["steps"] > 200
+    # a run this short is below MIN_OVERHEAD_NS, so no overhead is claimed
+    assert result["overhead"] is None
+    assert "too short" in profile_lines(result)[1]
+
+
+def test_overhead_is_never_negative():
+    data = generate("random", 3000, seed=3).tolist()
+    result = profile_run("sort", "Quick Sort", (data,), min_ns=0)
+    assert result["overhead"] is None or result["overhead"] >= 0
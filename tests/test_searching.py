@@ -0,0 +1,91 @@
+"""Every search generator agrees with the vectorized batch_search and keeps a valid window."""
+import numpy as np
+import pytest
+
+from engine import (
+    BATCH_SEARCHES, OP_DONE, OP_PROBE, SEARCH_ALGORITHMS, SEARCH_COLUMNS, SEARCH_LAYOUTS, UNSORTED_SEARCHES,
+    TraceBuffer, batch_search, generate, search_input, search_metrics, trace_search_metrics,
+)
+
+
+def targets_for(data):
+    """Present values plus misses below, above and between the elements."""
+    values = np.unique(np.asarray(data))
+    misses = [-5, 10_000, 7]
+    if len(values):
+        misses += [int(values[0]) - 1, int(values[-1]) + 1]
+    present = [int(v) for v in np.asarray(data)[:: max(1, len(data) // 25)]]
+    return np.array(present + misses, dtype=np.int64)
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 7, 100, 1000])
+@pytest.mark.parametrize("algorithm", SEARCH_ALGORITHMS)
+def test_generators_match_batch(algorithm, size):
+    # even values only, so odd targets always miss
+    arr = generate("random", size, seed=size, low=0, high=2000) * 2
+    data = np.asarray(search_input(algorithm, arr))
+    targets = targets_for(data)
+    itemsize = data.dtype.itemsize
+    found, probes, lines = batch_search(algorithm, data, targets, itemsize)
+    for k, target in enumerate(targets):
+        metrics = search_metrics(SEARCH_ALGORITHMS[algorithm](data, int(target)), itemsize)
+        assert (found[k], probes[k], lines[k]) == (
+            metrics["found_index"], metrics["probes"], metrics["cache_lines"]), int(target)
+        if found[k] >= 0:
+            assert data[found[k]] == target
+        else:
+            assert target not in data
+
+
+@pytest.mark.parametrize("algorithm", SEARCH_ALGORITHMS)
+def test_trace_metrics_match_step_metrics(algorithm):
+    arr = generate("random", 500, seed=9, low=0, high=2000) * 2
+    data = np.asarray(search_input(algorithm, arr))
+    for target in targets_for(data):
+        trace = TraceBuffer(SEARCH_COLUMNS, chunk_size=4)
+        trace.extend(SEARCH_ALGORITHMS[algorithm](data, int(target)))
+        assert trace_search_metrics(trace, 4) == search_metrics(trace, 4), int(target)
+        trace.close()
+    empty = TraceBuffer(SEARCH_COLUMNS)
+    assert trace_search_metrics(empty) == search_metrics(empty)
+    empty.close()
+
+
+def test_every_search_is_vectorized():
+    assert set(BATCH_SEARCHES) == set(SEARCH_ALGORITHMS)
+
+
+@pytest.mark.parametrize("algorithm", SEARCH_ALGORITHMS)
+def test_values_near_int64_limits(algorithm):
+    # interpolation's (target - low) * (high - low) no longer fits in int64 here
+    rng = np.random.default_rng(9)
+    arr = np.concatenate([rng.integers(-2 ** 63, -2 ** 62, 200), rng.integers(2 ** 62, 2 ** 63 - 1, 200)])
+    data = np.asarray(search_input(algorithm, arr))
+    targets = np.concatenate([data[::7], rng.integers(-2 ** 63, 2 ** 63 - 1, 20)])
+    found, probes, lines = batch_search(algorithm, data, targets)
+    for k, target in enumerate(targets):
+        metrics = search_metrics(SEARCH_ALGORITHMS[algorithm](data, int(target)))
+        assert (found[k], probes[k], lines[k]) == (
+            metrics["found_index"], metrics["probes"], metrics["cache_lines"]), int(target)
+
+
+@pytest.mark.parametrize("algorithm", sorted(UNSORTED_SEARCHES))
+def test_unsorted_search_finds_first_occurrence(algorithm):
+    data = np.array([4, 9, 4, 1, 9], dtype=np.int64)
+    found, _, _ = batch_search(algorithm, data, np.array([9, 4, 1, 2]))
+    assert found.tolist() == [1, 0, 3, -1]
+
+
+@pytest.mark.parametrize("algorithm", sorted(set(SEARCH_ALGORITHMS) - set(SEARCH_LAYOUTS)))
+def test_window_holds_the_target(algorithm):
+    arr = generate("random", 300, seed=6, low=0, high=2000) * 2
+    data = np.asarray(search_input(algorithm, arr))
+    for target in targets_for(data):
+        for op, index, _, low, high in SEARCH_ALGORITHMS[algorithm](data, int(target)):
+            if op == OP_PROBE:
+                assert low <= index <= high
+            if target in data:
+                # the window never drops every copy of the target
+                assert target in data[low:high + 1]
+            elif op == OP_DONE:
+                assert low > high
@@ -0,0 +1,71 @@
+"""Every sort, replayed step by step through apply_step, leaves its input sorted."""
+import sys
+
+import pytest
+
+from engine import (
+    DISTRIBUTION_SORTS, DISTRIBUTIONS, OP_DONE, PIVOT_STRATEGIES, SORTING_ALGORITHMS, apply_step,
+    generate, sort_metrics,
+)
+
+
+def replay(steps, data):
+    """Apply every step to a copy of data; return the copy and the last step."""
+    arr = list(data)
+    last = None
+    for step in steps:
+        apply_step(arr, step)
+        last = step
+    return arr, last
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+@pytest.mark.parametrize("algorithm", SORTING_ALGORITHMS)
+def test_replay_sorts(algorithm, distribution):
+    data = generate(distribution, 150, seed=3, low=0, high=400).tolist()
+    arr, last = replay(SORTING_ALGORITHMS[algorithm](list(data)), data)
+    assert arr == sorted(data)
+    assert last[0] == OP_DONE
+
+
+@pytest.mark.parametrize("algorithm", SORTING_ALGORITHMS)
+@pytest.mark.parametrize("data", [[], [5], [2, 1], [7, 7, 7], [3, 1, 2, 3, 0]])
+def test_tiny_inputs(algorithm, data):
+    arr, _ = replay(SORTING_ALGORITHMS[algorithm](list(data)), data)
+    assert arr == sorted(data)
+
+
+@pytest.mark.parametrize("algorithm", ["Quick Sort", "Merge Sort"])
+def test_sorted_input_deeper_than_recursion_limit(algorithm):
+    # sorted input drives Quick Sort's last-element pivot to depth n
+    data = list(range(sys.getrecursionlimit() + 200))
+    arr, last = replay(SORTING_ALGORITHMS[algorithm](list(data)), data)
+    assert arr == data
+    assert last[0] == OP_DONE
+
+
+def test_bubble_sort_stops_after_a_pass_without_swaps():
+    data = list(range(200))
+    arr, last = replay(SORTING_ALGORITHMS["Bubble Sort"](list(data)), data)
+    assert arr == data
+    assert (last[3], last[4]) == (len(data) - 1, 0)
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+@pytest.mark.parametrize("pivot", PIVOT_STRATEGIES)
+@pytest.mark.parametrize("cutoff", [1, 16])
+def test_introsort_pivots(pivot, cutoff, distribution):
+    data = generate(distribution, 600, seed=11, low=0, high=2000).tolist()
+    steps = SORTING_ALGORITHMS["Introsort"](list(data), pivot=pivot, cutoff=cutoff, seed=5)
+    arr, _ = replay(steps, data)
+    assert arr == sorted(data)
+
+
+@pytest.mark.parametrize("algorithm", SORTING_ALGORITHMS)
+def test_passes_only_for_distribution_sorts(algorithm):
+    data = generate("random", 300, seed=1, low=0, high=999).tolist()
+    passes = sort_metrics(SORTING_ALGORITHMS[algorithm](list(data)), algorithm)["passes"]
+    if algorithm in DISTRIBUTION_SORTS:
+        assert passes >= 1
+    else:
+        assert passes == 0
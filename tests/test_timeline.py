@@ -0,0 +1,83 @@
+"""Timeline.seek agrees with replaying the trace from the start."""
+import random
+
+import pytest
+
+from engine import (
+    KEYFRAME_MAX_INTERVAL, KEYFRAME_MIN_INTERVAL, SORTING_ALGORITHMS, Timeline, TraceBuffer, apply_step, step_highlight,
+)
+
+
+def random_values(n, seed):
+    rng = random.Random(seed)
+    return [rng.randint(0, 500) for _ in range(n)]
+
+
+def record(algorithm, data):
+    trace = TraceBuffer(chunk_size=256)
+    trace.extend(SORTING_ALGORITHMS[algorithm](list(data)))
+    return trace
+
+
+def linear_states(data, trace):
+    """The array after each prefix of the trace, as tuples (index k = k steps applied)."""
+    arr = list(data)
+    states = [tuple(arr)]
+    for step in trace:
+        apply_step(arr, step)
+        states.append(tuple(arr))
+    return states
+
+
+@pytest.mark.parametrize("algorithm", ["Quick Sort", "Merge Sort (Bottom-up)", "LSD Radix Sort"])
+def test_seek_matches_linear_replay(algorithm):
+    data = random_values(120, seed=4)
+    trace = record(algorithm, data)
+    states = linear_states(data, trace)
+    timeline = Timeline(data, trace, interval=97)
+    positions = list(range(len(trace) + 1))
+    random.Random(0).shuffle(positions)
+    # forwards, backwards and jumps past keyframes that were never recorded
+    for position in [len(trace), 0, 1] + positions[:300]:
+        arr, highlight, comparisons, swaps = timeline.seek(position)
+        assert tuple(arr) == states[position]
+        if position:
+            last = trace[position - 1]
+            assert highlight == step_highlight(last)
+            assert (comparisons, swaps) == (last[3], last[4])
+        else:
+            assert (highlight, comparisons, swaps) == ([], 0, 0)
+    trace.close()
+
+
+def test_record_and_clamp():
+    data = sorted(random_values(60, seed=2), reverse=True)
+    trace = record("Insertion Sort", data)
+    states = linear_states(data, trace)
+    timeline = Timeline(data, trace, interval=50)
+    arr = list(data)
+    # keyframes handed in by a player replaying forwards
+    for position, step in enumerate(trace, 1):
+        apply_step(arr, step)
+        timeline.record(position, arr)
+    assert len(timeline.keyframes) == len(trace) // 50 + 1
+    assert tuple(timeline.seek(len(trace) + 10)[0]) == states[-1]
+    assert tuple(timeline.seek(-5)[0]) == states[0]
+    trace.close()
+
+
+def test_default_interval_is_bounded_in_steps():
+    trace = TraceBuffer()
+    assert Timeline([0] * 100, trace).interval == KEYFRAME_MIN_INTERVAL
+    assert Timeline([0] * 100_000, trace).interval == 25_000
+    assert Timeline([0] * 10_000_000, trace).interval == KEYFRAME_MAX_INTERVAL
+    trace.close()
+
+
+def test_keyframes_hold_int64_values():
+    data = [2 ** 40, -(2 ** 62), 7, 2 ** 63 - 1]
+    trace = record("Insertion Sort", data)
+    timeline = Timeline(data, trace, interval=2)
+    assert timeline.seek(0)[0] == data
+    assert timeline.seek(len(trace))[0] == sorted(data)
+    trace.close()
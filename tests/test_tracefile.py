@@ -0,0 +1,120 @@
+"""TraceWriter/TraceFile round trips and rejection of damaged files."""
+import os
+
+import numpy as np
+import pytest
+
+from engine import (
+    SEARCH_ALGORITHMS, SEARCH_COLUMNS, SORT_COLUMNS, SORTING_ALGORITHMS, TraceBuffer, TraceFile, TraceFileError,
+    TraceWriter, cache_path, prune_cache, save_trace,
+)
+
+
+def random_array(n, seed):
+    return np.random.default_rng(seed).integers(0, 1000, size=n, dtype=np.int64)
+
+
+def sort_trace(n=300):
+    data = random_array(n, seed=8)
+    trace = TraceBuffer(chunk_size=1000)
+    trace.extend(SORTING_ALGORITHMS["Quick Sort"](data.tolist()))
+    return data, trace
+
+
+@pytest.mark.parametrize("extension", [".aqt", ".aqtz"])
+def test_sort_round_trip(tmp_path, extension):
+    data, trace = sort_trace()
+    path = str(tmp_path / ("run" + extension))
+    save_trace(path, trace, "sort", "Quick Sort", data, options={"x": 1}, counters={"swaps": 3})
+    saved = TraceFile(path)
+    try:
+        assert (saved.kind, saved.algorithm, saved.options, saved.counters) == (
+            "sort", "Quick Sort", {"x": 1}, {"swaps": 3})
+        assert saved.input.tolist() == data.tolist()
+        assert len(saved) == len(trace)
+        assert list(saved) == list(trace)
+        assert list(saved.iter_from(1234)) == list(trace.iter_from(1234))
+        assert saved[-1] == trace[len(trace) - 1]
+        assert saved.column("a").tolist() == trace.column("a").tolist()
+        # compressed chunks must decompress back to the same rows
+        assert len(saved.index) > 1
+    finally:
+        saved.close()
+        trace.close()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_writer_appends_search_steps(tmp_path, compress):
+    data = np.sort(random_array(500, seed=2))
+    steps = list(SEARCH_ALGORITHMS["Binary Search"](data, int(data[17])))
+    path = str(tmp_path / "search.aqt")
+    writer = TraceWriter(path, "search", "Binary Search", data, SEARCH_COLUMNS, target=int(data[17]),
+                         compress=compress, chunk_size=3)
+    for step in steps:
+        writer.append(step)
+    writer.close()
+    saved = TraceFile(path)
+    try:
+        assert saved.target == int(data[17])
+        assert list(saved) == [tuple(step) for step in steps]
+    finally:
+        saved.close()
+
+
+def test_rejects_empty_truncated_and_foreign_files(tmp_path):
+    data, trace = sort_trace(100)
+    path = tmp_path / "run.aqtz"
+    save_trace(str(path), trace, "sort", "Quick Sort", data)
+    trace.close()
+    whole = path.read_bytes()
+    damaged = {
+        "empty": b"",
+        "preamble only": whole[:10],
+        "truncated": whole[: len(whole) // 2],
+        "no footer offset": whole[:-8],
+        "foreign": b"not a trace file at all, just some text" * 4,
+    }
+    for name, content in damaged.items():
+        bad = tmp_path / (name.replace(" ", "_") + ".aqt")
+        bad.write_bytes(content)
+        with pytest.raises(TraceFileError):
+            TraceFile(str(bad))
+
+
+def test_cache_key_includes_versions(monkeypatch):
+    data = random_array(50, seed=1)
+    before = cache_path("sort", "Quick Sort", data)
+    assert cache_path("sort", "Quick Sort", data) == before
+    monkeypatch.setattr("engine.tracefile.STEPS_VERSION", 10 ** 6)
+    assert cache_path("sort", "Quick Sort", data) != before
+
+
+def write_cached(path, n, mtime):
+    data, trace = sort_trace(n)
+    save_trace(str(path), trace, "sort", "Quick Sort", data)
+    trace.close()
+    os.utime(path, (mtime, mtime))
+    return os.path.getsize(path)
+
+
+def test_prune_cache_evicts_least_recently_used(tmp_path):
+    paths = [tmp_path / f"{k}.aqt" for k in range(4)]
+    sizes = [write_cached(path, 100 + k, mtime=1000 + k) for k, path in enumerate(paths)]
+    (tmp_path / "busy.aqt.part").write_bytes(b"x" * 10 ** 6)
+    # the two newest fit; a cache hit on the oldest makes it the most recent
+    os.utime(paths[0], (2000, 2000))
+    removed = prune_cache(sizes[0] + sizes[3] + 1, str(tmp_path))
+    assert sorted(removed) == sorted(str(p) for p in paths[1:3])
+    assert sorted(os.listdir(tmp_path)) == ["0.aqt", "3.aqt", "busy.aqt.part"]
+
+
+def test_writer_budget_keeps_the_new_file(tmp_path):
+    old = tmp_path / "old.aqt"
+    write_cached(old, 100, mtime=1000)
+    data, trace = sort_trace(100)
+    writer = TraceWriter(str(tmp_path / "new.aqt"), "sort", "Quick Sort", data, SORT_COLUMNS, budget=1)
+    for step in trace:
+        writer.append(step)
+    writer.close()
+    trace.close()
+    assert os.listdir(tmp_path) == ["new.aqt"]
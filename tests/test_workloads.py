@@ -0,0 +1,34 @@
+"""generate() is deterministic per seed and stays inside [low, high]."""
+import numpy as np
+import pytest
+
+from engine import DISTRIBUTIONS, generate
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+def test_same_seed_same_array(distribution):
+    first = generate(distribution, 2000, seed=42, low=-50, high=5000)
+    again = generate(distribution, 2000, seed=42, low=-50, high=5000)
+    assert first.dtype == np.int64
+    assert len(first) == 2000
+    assert np.array_equal(first, again)
+    assert first.min() >= -50 and first.max() <= 5000
+
+
+@pytest.mark.parametrize("distribution", ["random", "nearly-sorted", "few-unique", "gaussian", "zipf"])
+def test_seed_changes_random_shapes(distribution):
+    assert not np.array_equal(generate(distribution, 2000, seed=1), generate(distribution, 2000, seed=2))
+
+
+def test_wide_ranges():
+    low, high = -(2 ** 31), 2 ** 31 - 1
+    for distribution in ("few-unique", "zipf", "random"):
+        values = generate(distribution, 1000, seed=0, low=low, high=high)
+        assert values.min() >= low and values.max() <= high
+    assert len(np.unique(generate("few-unique", 1000, seed=0, low=low, high=high, unique=5))) <= 5
+
+
+def test_empty_and_unknown():
+    assert len(generate("sorted", 0, seed=1)) == 0
+    with pytest.raises(ValueError):
+        generate("spiral", 10)